@@ -0,0 +1,88 @@
+"""
+Runs the VortexKit benchmarks.
+
+    python -m benchmarks                                  run every case
+    python -m benchmarks -k routing                       run the cases whose name contains 'routing'
+    python -m benchmarks --output baseline.json           save the results as JSON
+    python -m benchmarks --compare baseline.json          exit with status 1 if a case is slower than the baseline
+
+Compare results taken on the same machine and interpreter only.
+"""
+import argparse
+import sys
+from . import bench_middleware, bench_parsing, bench_responses, bench_routing  # noqa: F401, registers the cases
+from .harness import compare, load_report, registered, run_benchmarks, save_report
+
+def format_time(nanoseconds: float) -> str:
+    """
+    Formats a duration with a readable unit.
+
+    Args:
+        nanoseconds (float): The duration in nanoseconds.
+
+    Returns:
+        str: The duration in ns, µs or ms.
+    """
+    if nanoseconds < 1e3:
+        return f"{nanoseconds:.0f} ns"
+    if nanoseconds < 1e6:
+        return f"{nanoseconds / 1e3:.2f} µs"
+    return f"{nanoseconds / 1e6:.2f} ms"
+
+def main(argv: list = None) -> int:
+    """
+    Parses the command line, runs the benchmarks and reports regressions.
+
+    Args:
+        argv (list, optional): The arguments. Defaults to sys.argv.
+
+    Returns:
+        int: The exit status, 1 if a case regressed past the threshold.
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Runs the VortexKit benchmarks.")
+    parser.add_argument("-k", "--filter", help="only run cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per timed round (default: 0.2)")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed rounds per case (default: 5)")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare the results with a JSON file written by --output")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown failing --compare (default: 0.10)")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(registered(args.filter)))
+        return 0
+
+    baseline = load_report(args.compare) if args.compare else None
+
+    def progress(name, result):
+        print(f"{name:<32} {format_time(result['median_ns']):>12} ±{format_time(result['stdev_ns']):>10}  {result['ops_per_sec']:>12,.0f} ops/s", flush=True)
+
+    report = run_benchmarks(args.filter, args.min_time, args.repeat, progress)
+    if args.output:
+        save_report(report, args.output)
+
+    if baseline is None:
+        return 0
+
+    regressions = []
+    print(f"\nCompared with {args.compare} ({baseline.get('meta', {}).get('python', 'unknown interpreter')}):")
+    for name, before, after, change in compare(report["results"], baseline):
+        marker = ""
+        if change > args.threshold:
+            marker = "  REGRESSION"
+            regressions.append(name)
+        elif change < -args.threshold:
+            marker = "  faster"
+        print(f"{name:<32} {format_time(before):>12} -> {format_time(after):>12} {change:>+8.1%}{marker}")
+
+    missing = sorted(set(baseline.get("results", {})) - set(report["results"]))
+    if missing and args.filter is None:
+        print(f"Missing from this run: {', '.join(missing)}")
+    if regressions:
+        print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
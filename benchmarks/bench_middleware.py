@@ -0,0 +1,39 @@
+from vortexkit import App, Middleware, PlainTextResponse
+from .harness import benchmark, request_runner
+
+DEPTHS = (0, 1, 4, 16)
+
+class PassThrough(Middleware):
+    """
+    Middleware doing nothing in both directions, so only the cost of the layer is timed.
+    """
+
+    def process_request(self, request):
+        return None
+
+    def process_response(self, request, response):
+        return response
+
+def layered_app(depth: int) -> App:
+    """
+    Builds an application whose only route is wrapped in 'depth' middleware.
+
+    Args:
+        depth (int): The number of middleware.
+
+    Returns:
+        App: The application.
+    """
+    app = App()
+    for _ in range(depth):
+        app.register_middleware(PassThrough())
+    app.add_route("/", lambda request: PlainTextResponse("ok"))
+    return app
+
+def _register(depth: int) -> None:
+    @benchmark(f"middleware.depth.{depth}")
+    def chain():
+        return request_runner(layered_app(depth))
+
+for depth in DEPTHS:
+    _register(depth)
@@ -0,0 +1,76 @@
+import io
+import json
+from urllib.parse import urlencode
+from vortexkit.context import Context
+from vortexkit.request import ParseRequestInput
+from .harness import benchmark, make_environ
+
+BOUNDARY = "vortexkitbenchmarkboundary"
+
+def parser_runner(body: bytes, content_type: str) -> callable:
+    """
+    Returns a callable parsing a request body with ParseRequestInput.
+
+    Args:
+        body (bytes): The request body.
+        content_type (str): The Content-Type of the body.
+
+    Returns:
+        callable: A callable taking no arguments.
+    """
+    template = make_environ("POST", "/", body, content_type)
+    context = Context()
+
+    def run():
+        environ = template.copy()
+        environ["wsgi.input"] = io.BytesIO(body)
+        return ParseRequestInput(environ, context).parse_body()
+
+    return run
+
+def multipart_body(fields: dict, files: dict) -> bytes:
+    """
+    Encodes form fields and files as a multipart/form-data body.
+
+    Args:
+        fields (dict): The text fields by name.
+        files (dict): (filename, content) tuples by field name.
+
+    Returns:
+        bytes: The body, delimited by BOUNDARY.
+    """
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, content) in files.items():
+        parts.append(
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'.encode() + content + b"\r\n"
+        )
+    parts.append(f"--{BOUNDARY}--\r\n".encode())
+    return b"".join(parts)
+
+@benchmark("parsing.json.small")
+def json_small():
+    body = json.dumps({"id": 1, "name": "widget", "tags": ["a", "b"], "active": True}).encode()
+    return parser_runner(body, "application/json")
+
+@benchmark("parsing.json.large")
+def json_large():
+    rows = [{"id": index, "name": f"item {index}", "price": index * 1.5, "tags": ["x", "y", "z"]} for index in range(500)]
+    return parser_runner(json.dumps({"rows": rows}).encode(), "application/json")
+
+@benchmark("parsing.form")
+def form():
+    body = urlencode({f"field{index}": f"value {index}" for index in range(20)}).encode()
+    return parser_runner(body, "application/x-www-form-urlencoded")
+
+@benchmark("parsing.multipart.fields")
+def multipart_fields():
+    body = multipart_body({f"field{index}": f"value {index}" for index in range(10)}, {})
+    return parser_runner(body, f"multipart/form-data; boundary={BOUNDARY}")
+
+@benchmark("parsing.multipart.file")
+def multipart_file():
+    body = multipart_body({"title": "report"}, {"upload": ("report.bin", bytes(range(256)) * 256)})
+    return parser_runner(body, f"multipart/form-data; boundary={BOUNDARY}")
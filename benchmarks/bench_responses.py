@@ -0,0 +1,86 @@
+import atexit
+import os
+import shutil
+import tempfile
+from vortexkit import App, PlainTextResponse, HtmlResponse, JSONResponse, RedirectResponse, TemplateResponse, FileResponse, FileStreamResponse, StreamingResponse
+from .harness import benchmark, request_runner
+
+PAYLOAD = {"id": 1, "name": "widget", "price": 9.99, "tags": ["a", "b", "c"], "stock": {"warehouse": 12, "store": 3}}
+
+_directory = None
+
+def data_file(name: str, content: bytes) -> str:
+    """
+    Writes a file into a temporary directory removed at exit.
+
+    Args:
+        name (str): The file name.
+        content (bytes): The file content.
+
+    Returns:
+        str: The path of the file.
+    """
+    global _directory
+    if _directory is None:
+        _directory = tempfile.mkdtemp(prefix="vortexkit-bench-")
+        atexit.register(shutil.rmtree, _directory, True)
+    path = os.path.join(_directory, name)
+    with open(path, "wb") as file:
+        file.write(content)
+    return path
+
+def response_runner(make_response: callable) -> callable:
+    """
+    Returns a callable serving a response built by 'make_response' through App.handler.
+
+    Args:
+        make_response (callable): Builds the response, called once per request.
+
+    Returns:
+        callable: A callable taking no arguments.
+    """
+    app = App()
+    app.add_route("/", lambda request: make_response())
+    return request_runner(app)
+
+@benchmark("responses.plain_text")
+def plain_text():
+    return response_runner(lambda: PlainTextResponse("Hello, World!"))
+
+@benchmark("responses.html")
+def html():
+    return response_runner(lambda: HtmlResponse("<html><body><h1>Hello, World!</h1></body></html>"))
+
+@benchmark("responses.json")
+def json_response():
+    return response_runner(lambda: JSONResponse(PAYLOAD))
+
+@benchmark("responses.redirect")
+def redirect():
+    return response_runner(lambda: RedirectResponse("/elsewhere"))
+
+@benchmark("responses.template")
+def template():
+    path = data_file("page.html", b"<html><head><title>{{title}}</title></head><body><p>{{body}}</p></body></html>")
+    return response_runner(lambda: TemplateResponse(path, {"title": "Hello", "body": "World"}))
+
+@benchmark("responses.file")
+def file():
+    path = data_file("file.bin", bytes(range(256)) * 64)
+    return response_runner(lambda: FileResponse(path))
+
+@benchmark("responses.file_stream")
+def file_stream():
+    path = data_file("stream.bin", bytes(range(256)) * 64)
+    return response_runner(lambda: FileStreamResponse(path, chunk_size=4096))
+
+@benchmark("responses.streaming")
+def streaming():
+    chunks = [b"x" * 256] * 16
+    return response_runner(lambda: StreamingResponse(iter(chunks)))
+
+@benchmark("responses.json.cached")
+def json_cached():
+    app = App()
+    app.add_route("/", lambda: JSONResponse(PAYLOAD), ["GET"], cache=True)
+    return request_runner(app, query={"page": "1"})
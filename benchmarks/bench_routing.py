@@ -0,0 +1,40 @@
+from vortexkit import App, PlainTextResponse
+from .harness import benchmark, request_runner
+
+SIZES = {"10": 10, "1k": 1000, "10k": 10000}
+
+def routed_app(count: int) -> App:
+    """
+    Builds an application with 'count' static and 'count' dynamic routes.
+
+    Args:
+        count (int): Number of routes of each kind.
+
+    Returns:
+        App: The application.
+    """
+    app = App()
+
+    def page(request):
+        return PlainTextResponse("ok")
+
+    def item(request, item_id):
+        return PlainTextResponse("ok")
+
+    for index in range(count):
+        app.add_route(f"/section{index}/page", page)
+        app.add_route(f"/section{index}/items/<int:item_id>", item)
+    return app
+
+def _register(label: str, count: int) -> None:
+    # The last routes registered are looked up, so linear scans pay their worst case.
+    @benchmark(f"routing.static.{label}")
+    def static_route():
+        return request_runner(routed_app(count), path=f"/section{count - 1}/page")
+
+    @benchmark(f"routing.dynamic.{label}")
+    def dynamic_route():
+        return request_runner(routed_app(count), path=f"/section{count - 1}/items/42")
+
+for label, count in SIZES.items():
+    _register(label, count)
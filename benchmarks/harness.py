@@ -0,0 +1,252 @@
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from urllib.parse import urlencode
+
+_benchmarks = {}
+
+def benchmark(name: str) -> callable:
+    """
+    Registers a benchmark case.
+
+    The decorated function is a setup function: it builds everything the case needs and
+    returns a callable taking no arguments, which is the operation being timed.
+
+    Args:
+        name (str): The dotted name of the case, such as 'routing.static.1k'.
+
+    Returns:
+        callable: The decorator.
+
+    Raises:
+        ValueError: If a case with the same name is already registered.
+    """
+    def inner(setup):
+        if name in _benchmarks:
+            raise ValueError(f"Benchmark '{name}' is already registered")
+        _benchmarks[name] = setup
+        return setup
+    return inner
+
+def registered(pattern: str = None) -> dict:
+    """
+    Returns the registered cases, optionally only those whose name contains a pattern.
+
+    Args:
+        pattern (str, optional): A substring the names must contain. Defaults to every case.
+
+    Returns:
+        dict: The setup functions by case name, in registration order.
+    """
+    return {name: setup for name, setup in _benchmarks.items() if pattern is None or pattern in name}
+
+def make_environ(method: str = "GET", path: str = "/", body: bytes = b"", content_type: str = None, query: dict = None, headers: dict = None) -> dict:
+    """
+    Builds a WSGI environment for a synthetic request.
+
+    Args:
+        method (str, optional): The request method. Defaults to 'GET'.
+        path (str, optional): The request path. Defaults to '/'.
+        body (bytes, optional): The request body. Defaults to no body.
+        content_type (str, optional): The Content-Type of the body. Defaults to none.
+        query (dict, optional): The query parameters. Defaults to none.
+        headers (dict, optional): Extra request headers. Defaults to none.
+
+    Returns:
+        dict: The WSGI environment. Its 'wsgi.input' can only be read once.
+    """
+    environ = {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": urlencode(query, doseq=True) if query else "",
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "8080",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "REMOTE_ADDR": "127.0.0.1",
+        "CONTENT_LENGTH": str(len(body)) if body else "",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": False,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    if content_type is not None:
+        environ["CONTENT_TYPE"] = content_type
+    for name, value in (headers or {}).items():
+        environ["HTTP_" + name.upper().replace("-", "_")] = value
+    return environ
+
+def request_runner(app, method: str = "GET", path: str = "/", body: bytes = b"", content_type: str = None, query: dict = None, headers: dict = None) -> callable:
+    """
+    Returns a callable serving one synthetic request through App.handler.
+
+    The environment is built once and copied for each call, with a fresh input stream,
+    so only the application's work is timed. The response body is consumed and closed
+    as a server would.
+
+    Args:
+        app (App): The application.
+        method (str, optional): The request method. Defaults to 'GET'.
+        path (str, optional): The request path. Defaults to '/'.
+        body (bytes, optional): The request body. Defaults to no body.
+        content_type (str, optional): The Content-Type of the body. Defaults to none.
+        query (dict, optional): The query parameters. Defaults to none.
+        headers (dict, optional): Extra request headers. Defaults to none.
+
+    Returns:
+        callable: A callable taking no arguments.
+
+    Raises:
+        ValueError: If the request fails, so broken cases stop the run instead of timing an error page.
+    """
+    template = make_environ(method, path, body, content_type, query, headers)
+    handler = app.handler
+    statuses = []
+
+    def start_response(status, headers, exc_info=None):
+        statuses.append(status)
+
+    def run():
+        environ = template.copy()
+        environ["wsgi.input"] = io.BytesIO(body)
+        result = handler(environ, start_response)
+        for _ in result:
+            pass
+        close = getattr(result, "close", None)
+        if close is not None:
+            close()
+
+    run()
+    if not statuses or statuses[0][0] not in "23":
+        raise ValueError(f"{method} {path} answered {statuses[0] if statuses else 'nothing'}")
+    return run
+
+def measure(operation: callable, min_time: float = 0.2, repeat: int = 5) -> dict:
+    """
+    Times an operation.
+
+    The number of calls per round is calibrated so a round takes at least 'min_time'
+    seconds, then 'repeat' rounds are timed with the garbage collector left enabled,
+    as it is when serving.
+
+    Args:
+        operation (callable): The callable to time.
+        min_time (float, optional): Minimum duration of a round in seconds. Defaults to 0.2.
+        repeat (int, optional): Number of timed rounds. Defaults to 5.
+
+    Returns:
+        dict: The nanoseconds per call of the fastest, median and mean rounds, their
+        standard deviation, the calls per round and the calls per second at the median.
+    """
+    perf_counter = time.perf_counter
+    loops = 1
+    while True:
+        start = perf_counter()
+        for _ in range(loops):
+            operation()
+        elapsed = perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * min_time / elapsed * 1.2)) if elapsed > 0 else loops * 10
+
+    rounds = []
+    for _ in range(repeat):
+        start = perf_counter()
+        for _ in range(loops):
+            operation()
+        rounds.append((perf_counter() - start) / loops * 1e9)
+
+    median = statistics.median(rounds)
+    return {
+        "min_ns": round(min(rounds), 1),
+        "median_ns": round(median, 1),
+        "mean_ns": round(statistics.fmean(rounds), 1),
+        "stdev_ns": round(statistics.stdev(rounds), 1) if len(rounds) > 1 else 0.0,
+        "loops": loops,
+        "ops_per_sec": round(1e9 / median, 1),
+    }
+
+def run_benchmarks(pattern: str = None, min_time: float = 0.2, repeat: int = 5, progress: callable = None) -> dict:
+    """
+    Runs the registered cases.
+
+    Args:
+        pattern (str, optional): A substring the case names must contain. Defaults to every case.
+        min_time (float, optional): Minimum duration of a round in seconds. Defaults to 0.2.
+        repeat (int, optional): Number of timed rounds per case. Defaults to 5.
+        progress (callable, optional): Called with each case's name and result as it finishes.
+
+    Returns:
+        dict: A report holding the environment in 'meta' and the results by case name in 'results'.
+    """
+    results = {}
+    for name, setup in registered(pattern).items():
+        results[name] = measure(setup(), min_time, repeat)
+        if progress is not None:
+            progress(name, results[name])
+    return {"meta": environment(), "results": results}
+
+def environment() -> dict:
+    """
+    Describes the interpreter and machine the benchmarks run on.
+
+    Returns:
+        dict: The Python implementation and version, the platform and the date.
+    """
+    return {
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+def compare(results: dict, baseline: dict) -> list:
+    """
+    Compares results with a baseline report on the median time per call.
+
+    Args:
+        results (dict): The results by case name.
+        baseline (dict): The baseline report, as returned by run_benchmarks.
+
+    Returns:
+        list: (name, baseline_ns, current_ns, change) tuples for every case present in
+        both, where change is the relative difference and positive means slower.
+    """
+    previous = baseline.get("results", {})
+    rows = []
+    for name, result in results.items():
+        if name in previous:
+            before = previous[name]["median_ns"]
+            after = result["median_ns"]
+            rows.append((name, before, after, (after - before) / before if before else 0.0))
+    return rows
+
+def load_report(path: str) -> dict:
+    """
+    Reads a report written with save_report.
+
+    Args:
+        path (str): The JSON file.
+
+    Returns:
+        dict: The report.
+    """
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+def save_report(report: dict, path: str) -> None:
+    """
+    Writes a report as JSON.
+
+    Args:
+        report (dict): The report, as returned by run_benchmarks.
+        path (str): The JSON file.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+        file.write("\n")
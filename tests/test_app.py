@@ -0,0 +1,141 @@
+import asyncio
+from vortexkit import App, PlainTextResponse, StatusCode
+from vortexkit.testing import TestClient
+
+def call_asgi(app, method, path, body=b"", headers=()):
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers] + [(b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 1234),
+        "server": ("127.0.0.1", 80),
+    }
+    asyncio.run(app.asgi(scope, receive, send))
+    return sent[0]["status"], b"".join(message.get("body", b"") for message in sent[1:])
+
+def upload_app():
+    app = App()
+
+    @app.route("/upload", methods=["POST"])
+    def upload(request):
+        return PlainTextResponse(",".join(sorted(request.body)))
+
+    return app
+
+TRUNCATED_MULTIPART = {"body": b"--XyZ\r\ngarbage", "headers": {"Content-Type": "multipart/form-data; boundary=XyZ"}}
+
+def test_multipart_fields_and_files():
+    response = TestClient(upload_app()).post("/upload", data={"name": "alice"}, files={"avatar": ("a.png", b"\x89PNG")})
+    assert response.status_code == 200
+    assert response.body == b"avatar,name"
+
+def test_malformed_multipart_is_bad_request():
+    response = TestClient(upload_app()).post("/upload", **TRUNCATED_MULTIPART)
+    assert response.status_code == 400
+
+def test_malformed_multipart_is_bad_request_over_asgi():
+    status, _ = call_asgi(upload_app(), "POST", "/upload", TRUNCATED_MULTIPART["body"], TRUNCATED_MULTIPART["headers"].items())
+    assert status == 400
+
+def test_malformed_multipart_uses_400_handler():
+    app = upload_app()
+
+    @app.error_handler(StatusCode.BAD_REQUEST)
+    def bad_request(request):
+        return PlainTextResponse("bad upload", StatusCode.BAD_REQUEST)
+
+    response = TestClient(app).post("/upload", **TRUNCATED_MULTIPART)
+    assert response.status_code == 400
+    assert response.body == b"bad upload"
+
+def test_path_converters():
+    app = App()
+
+    @app.route("/users/<int:user_id>")
+    def user(request, user_id):
+        return PlainTextResponse(f"{type(user_id).__name__} {user_id}")
+
+    @app.route("/files/<path:rest>")
+    def files(request, rest):
+        return PlainTextResponse(rest)
+
+    @app.route("/prices/<float:amount>")
+    def price(request, amount):
+        return PlainTextResponse(repr(amount))
+
+    client = TestClient(app)
+    assert client.get("/users/42").body == b"int 42"
+    assert client.get("/users/abc").status_code == 404
+    assert client.get("/files/a/b/c.txt").body == b"a/b/c.txt"
+    assert client.get("/prices/9.5").body == b"9.5"
+
+def method_app():
+    app = App()
+    calls = []
+
+    @app.route("/items", methods=["GET", "POST"])
+    def items(request):
+        calls.append(request.method)
+        return PlainTextResponse("items")
+
+    return app, calls
+
+def test_other_methods_get_405_with_allow():
+    app, calls = method_app()
+    response = TestClient(app).request("DELETE", "/items")
+    assert response.status_code == 405
+    assert response.header("Allow") == "GET, HEAD, OPTIONS, POST"
+    assert calls == []
+
+def test_options_is_answered_without_handler():
+    app, calls = method_app()
+    response = TestClient(app).request("OPTIONS", "/items")
+    assert response.status_code == 204
+    assert response.header("Allow") == "GET, HEAD, OPTIONS, POST"
+    assert calls == []
+
+def test_head_is_answered_by_get_route_without_body():
+    app, calls = method_app()
+    response = TestClient(app).head("/items")
+    assert response.status_code == 200
+    assert response.body == b""
+    assert response.header("Content-Length") == "5"
+
+def limited_app():
+    app = App(max_body_size=10)
+
+    @app.route("/small", methods=["POST"])
+    def small(request):
+        return PlainTextResponse(str(len(request.body)))
+
+    @app.route("/large", methods=["POST"], max_body_size=100)
+    def large(request):
+        return PlainTextResponse(str(len(request.body)))
+
+    return app
+
+def test_oversized_body_is_rejected_with_413():
+    client = TestClient(limited_app())
+    assert client.post("/small", body=b"x" * 10).body == b"10"
+    assert client.post("/small", body=b"x" * 11).status_code == 413
+    assert client.post("/large", body=b"x" * 50).body == b"50"
+    assert client.post("/large", body=b"x" * 101).status_code == 413
+
+def test_oversized_body_is_rejected_with_413_over_asgi():
+    status, _ = call_asgi(limited_app(), "POST", "/small", b"x" * 11)
+    assert status == 413
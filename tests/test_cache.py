@@ -0,0 +1,131 @@
+from vortexkit import App, CacheRule, Middleware, PlainTextResponse
+from vortexkit.testing import TestClient
+
+def make_app(**options):
+    app = App()
+    app.enable_response_cache(**options)
+    calls = []
+
+    @app.route("/", methods=["GET"], cache=True)
+    def index(request):
+        calls.append(request.path)
+        return PlainTextResponse(f"call {len(calls)}")
+
+    return app, calls
+
+def test_hit_skips_handler():
+    app, calls = make_app()
+    client = TestClient(app)
+    first = client.get("/")
+    second = client.get("/")
+    assert second.body == first.body
+    assert second.header("Age") == "0"
+    assert len(calls) == 1
+
+def test_query_string_is_part_of_key():
+    app, calls = make_app()
+    client = TestClient(app)
+    assert client.get("/?page=1").body != client.get("/?page=2").body
+
+def test_no_store_request_bypasses_cache():
+    app, calls = make_app()
+    client = TestClient(app)
+    client.get("/")
+    client.get("/", headers={"Cache-Control": "no-store"})
+    assert len(calls) == 2
+
+def test_cookie_and_authorization_bypass_cache():
+    app, calls = make_app()
+    client = TestClient(app)
+    client.get("/", headers={"Cookie": "session=alice"})
+    client.get("/", headers={"Cookie": "session=bob"})
+    client.get("/", headers={"Authorization": "Bearer x"})
+    assert len(calls) == 3
+    assert len(app.response_cache) == 0
+
+def test_vary_on_cookie():
+    app = App()
+
+    @app.route("/", methods=["GET"], cache=CacheRule(vary=["Cookie"]))
+    def index(request):
+        return PlainTextResponse(f"hello {request.cookies.get('session')}")
+
+    client = TestClient(app)
+    assert client.get("/", headers={"Cookie": "session=alice"}).body == b"hello alice"
+    assert client.get("/", headers={"Cookie": "session=bob"}).body == b"hello bob"
+    assert client.get("/", headers={"Cookie": "session=alice"}).header("Age") == "0"
+
+def test_if_none_match_answers_304():
+    app, calls = make_app()
+    client = TestClient(app)
+    etag = client.get("/").header("ETag")
+    assert etag
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.header("ETag") == etag
+    assert client.get("/", headers={"If-None-Match": '"other"'}).status_code == 200
+
+def test_middleware_request_hooks_run_on_hits():
+    class RequireUser(Middleware):
+        def process_request(self, request):
+            if "HTTP_X_USER" not in request.environ:
+                return PlainTextResponse("Forbidden", 403)
+
+    app, calls = make_app()
+    app.register_middleware(RequireUser())
+    client = TestClient(app)
+    assert client.get("/", headers={"X-User": "1"}).status_code == 200
+    assert client.get("/").status_code == 403
+    assert len(calls) == 1
+
+def test_tag_invalidation():
+    app = App()
+
+    @app.route("/users/<int:user_id>", methods=["GET"], cache=CacheRule(tags=["user:{user_id}"]))
+    def user(user_id):
+        return PlainTextResponse(str(user_id))
+
+    client = TestClient(app)
+    client.get("/users/1")
+    client.get("/users/2")
+    assert app.response_cache.invalidate_tag("user:1") == 1
+    assert len(app.response_cache) == 1
+
+def test_lru_eviction():
+    app, calls = make_app(max_entries=2)
+    client = TestClient(app)
+    for page in (1, 2, 1, 3):
+        client.get(f"/?page={page}")
+    assert len(app.response_cache) == 2
+    assert app.response_cache.invalidate("/", "page=2") == 0
+
+def test_responses_setting_cookies_are_not_stored():
+    app = App()
+
+    @app.route("/", methods=["GET"], cache=True)
+    def index():
+        response = PlainTextResponse("hi")
+        response.set_cookie("a", "b")
+        return response
+
+    TestClient(app).get("/")
+    assert len(app.response_cache) == 0
+
+def test_admin_routes_are_never_cached():
+    app = App()
+    app.enable_response_cache(every_route=True)
+    app.enable_profiler("/_profile", secret="s3cret", every=1)
+    app.enable_metrics("/metrics")
+
+    @app.route("/", methods=["GET"])
+    def index():
+        return PlainTextResponse("hi")
+
+    client = TestClient(app)
+    client.get("/")
+    assert client.get("/_profile", headers={"X-Profile": "s3cret"}).status_code == 200
+    assert client.get("/_profile").status_code == 403
+    first = client.get("/metrics").body
+    client.get("/")
+    assert client.get("/metrics").body != first
@@ -0,0 +1,10 @@
+from vortexkit.request import Headers
+
+def test_headers_are_case_insensitive():
+    headers = Headers({"HTTP_X_REQUEST_ID": "abc", "CONTENT_TYPE": "text/plain", "CONTENT_LENGTH": "", "PATH_INFO": "/"})
+    assert headers["x-request-id"] == headers["X-Request-Id"] == "abc"
+    assert "content-type" in headers
+    assert "Content-Length" not in headers
+    assert sorted(headers) == ["Content-Type", "X-Request-Id"]
+    assert len(headers) == 2
+    assert headers.get("missing") is None
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import threading
+import time
+import pytest
+from vortexkit import App, FileResponse, SSEResponse, ServerSentEvent
+from vortexkit.responses import FileRangeIterator
+from vortexkit.testing import TestClient
+
+DATA = bytes(range(256)) * 4
+
+def slow_events():
+    time.sleep(0.15)
+    yield "done"
+
+async def slow_async_events():
+    await asyncio.sleep(0.15)
+    yield "done"
+
+def test_sse_sync_iterable_runs_inline_by_default():
+    threads = threading.active_count()
+    body = iter(SSEResponse(slow_events(), heartbeat=0.05).iter_content())
+    assert next(body) == b"data: done\n\n"
+    assert threading.active_count() == threads
+
+def test_sse_sync_iterable_gets_heartbeats_with_thread():
+    body = list(SSEResponse(slow_events(), heartbeat=0.05, heartbeat_thread=True).iter_content())
+    assert b": heartbeat\n\n" in body
+    assert body[-1] == b"data: done\n\n"
+
+def test_sse_async_iterable_gets_heartbeats():
+    body = list(SSEResponse(slow_async_events(), heartbeat=0.05).iter_content())
+    assert b": heartbeat\n\n" in body
+    assert body[-1] == b"data: done\n\n"
+
+def test_sse_event_fields_and_retry():
+    body = b"".join(SSEResponse([ServerSentEvent("a\nb", event="update", id="7")], retry=5000).iter_content())
+    assert body == b"retry: 5000\n\nevent: update\nid: 7\ndata: a\ndata: b\n\n"
+
+def read_ranges(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(DATA)
+    with open(path, "rb") as file:
+        return b"".join(FileRangeIterator(file, [(10, 19), b"--", (1000, 2000)], chunk_size=7))
+
+def test_file_range_iterator_reads_ranges(tmp_path):
+    assert read_ranges(tmp_path) == DATA[10:20] + b"--" + DATA[1000:]
+
+def test_file_range_iterator_without_pread(tmp_path, monkeypatch):
+    expected = read_ranges(tmp_path)
+    monkeypatch.delattr(os, "pread", raising=False)
+    assert read_ranges(tmp_path) == expected
+
+@pytest.fixture(params=["memory", "streamed"])
+def file_client(request, tmp_path, monkeypatch):
+    path = tmp_path / "data.bin"
+    path.write_bytes(DATA)
+    if request.param == "streamed":
+        monkeypatch.setattr(FileResponse, "stream_threshold", 100)
+    app = App()
+
+    @app.route("/file")
+    def file(request):
+        return FileResponse(str(path))
+
+    return TestClient(app)
+
+def test_single_range(file_client):
+    response = file_client.get("/file", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.header("Content-Range") == "bytes 10-19/1024"
+    assert response.body == DATA[10:20]
+
+def test_suffix_range(file_client):
+    response = file_client.get("/file", headers={"Range": "bytes=-24"})
+    assert response.status_code == 206
+    assert response.body == DATA[-24:]
+
+def test_multiple_ranges(file_client):
+    response = file_client.get("/file", headers={"Range": "bytes=0-1,100-101"})
+    assert response.status_code == 206
+    assert response.header("Content-Type").startswith("multipart/byteranges; boundary=")
+    assert int(response.header("Content-Length")) == len(response.body)
+    assert b"Content-Range: bytes 100-101/1024\r\n\r\n" + DATA[100:102] in response.body
+
+def test_unsatisfiable_range(file_client):
+    response = file_client.get("/file", headers={"Range": "bytes=5000-"})
+    assert response.status_code == 416
+    assert response.header("Content-Range") == "bytes */1024"
+    assert response.body == b""
+
+def test_stale_if_range_sends_whole_file(file_client):
+    response = file_client.get("/file", headers={"Range": "bytes=0-9", "If-Range": "Thu, 01 Jan 1970 00:00:00 GMT"})
+    assert response.status_code == 200
+    assert response.body == DATA
@@ -0,0 +1,97 @@
+import http.client
+import socket
+import threading
+import time
+import pytest
+from vortexkit import App, PlainTextResponse, StreamingResponse
+from vortexkit.server import AsyncHTTPServer, ThreadPoolWSGIServer
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(app, **options):
+        server = ThreadPoolWSGIServer(("127.0.0.1", 0), app, **options)
+        threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def test_streaming_response_records_progress(serve):
+    app = App()
+
+    @app.route("/stream")
+    def stream():
+        def chunks():
+            for _ in range(5):
+                time.sleep(0.05)
+                yield b"x"
+        return StreamingResponse(chunks())
+
+    server = serve(app, threads=1)
+    connection = http.client.HTTPConnection(*server.server_address)
+    connection.request("GET", "/stream")
+    response = connection.getresponse()
+    marks = []
+    while response.read(1):
+        marks.append(server.last_progress)
+    connection.close()
+    # Progress moves on while the only pool thread is busy with the response
+    assert len(set(marks)) > 1
+    assert not server.writers
+
+@pytest.fixture(params=["wsgi", "async"])
+def echo_server(request, serve):
+    app = App()
+
+    @app.route("/echo", methods=["POST"])
+    def echo(request):
+        return PlainTextResponse(str(len(request.body)))
+
+    if request.param == "wsgi":
+        yield serve(app)
+        return
+    server = AsyncHTTPServer(("127.0.0.1", 0), app.asgi)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+def exchange(server, data):
+    with socket.create_connection(server.server_address, timeout=5) as sock:
+        sock.sendall(data)
+        response = b""
+        while chunk := sock.recv(65536):
+            response += chunk
+    return response
+
+@pytest.mark.parametrize("size", [b"-1", b"0x5", b"+5", b"0_5", b" 5", b"", b"1" * 17])
+def test_malformed_chunk_size_is_rejected(echo_server, size):
+    response = exchange(echo_server, b"POST /echo HTTP/1.1\r\nHost: x\r\nTransfer-Encoding: chunked\r\n\r\n%b\r\nhello\r\n0\r\n\r\n" % size)
+    assert response.startswith(b"HTTP/1.1 400 ")
+    assert b"\r\nConnection: close\r\n" in response
+
+def test_chunked_body_with_extensions_is_accepted(echo_server):
+    response = exchange(echo_server, b"POST /echo HTTP/1.1\r\nHost: x\r\nConnection: close\r\nTransfer-Encoding: chunked\r\n\r\n5;name=value\r\nhello\r\nA\r\n0123456789\r\n0\r\n\r\n")
+    assert response.startswith(b"HTTP/1.1 200 ")
+    assert response.endswith(b"15")
+
+@pytest.mark.parametrize("headers", [
+    b"Content-Length: 5\r\nTransfer-Encoding: chunked\r\n",
+    b"Transfer-Encoding: chunked\r\nContent-Length: 5\r\n",
+    b"Content-Length: 5\r\nContent-Length: 5\r\n",
+    b"Content-Length: 5\r\nContent-Length: 6\r\n",
+    b"Content-Length : 5\r\n",
+    b"Content-Length\t: 5\r\n",
+])
+def test_ambiguous_framing_is_rejected(echo_server, headers):
+    response = exchange(echo_server, b"POST /echo HTTP/1.1\r\nHost: x\r\n%b\r\n5\r\nhello\r\n0\r\n\r\n" % headers)
+    assert response.startswith(b"HTTP/1.1 400 ")
+    assert b"\r\nConnection: close\r\n" in response
+    assert response.count(b"HTTP/1.1 ") == 1
@@ -0,0 +1,33 @@
+from vortexkit import App, PlainTextResponse, StatusCode
+from vortexkit.testing import TestClient
+
+def static_client(tmp_path):
+    (tmp_path / "public" / "css").mkdir(parents=True)
+    (tmp_path / "public" / "css" / "site.css").write_text("body { color: red }")
+    app = App()
+    app.serve_static("/static", str(tmp_path / "public"))
+
+    @app.error_handler(StatusCode.NOT_FOUND)
+    def not_found(request):
+        return PlainTextResponse("custom 404", StatusCode.NOT_FOUND)
+
+    return TestClient(app)
+
+def test_static_file_and_revalidation(tmp_path):
+    client = static_client(tmp_path)
+    response = client.get("/static/css/site.css")
+    assert response.status_code == 200
+    assert response.body == b"body { color: red }"
+    revalidated = client.get("/static/css/site.css", headers={"If-None-Match": response.header("ETag")})
+    assert revalidated.status_code == 304
+    assert revalidated.body == b""
+
+def test_missing_static_file_uses_404_handler(tmp_path):
+    response = static_client(tmp_path).get("/static/missing.css")
+    assert response.status_code == 404
+    assert response.body == b"custom 404"
+
+def test_static_path_cannot_escape_folder(tmp_path):
+    (tmp_path / "secret.txt").write_text("secret")
+    response = static_client(tmp_path).get("/static/../secret.txt")
+    assert response.status_code == 404
@@ -1,6 +1,17 @@
 from .app import App
-from .responses import FileResponse, PlainTextResponse, HtmlResponse, JSONResponse, RedirectResponse, TemplateResponse
-from .request import Request
+from .responses import FileResponse, PlainTextResponse, HtmlResponse, JSONResponse, RedirectResponse, TemplateResponse, FileStreamResponse, StreamingResponse, NDJSONResponse, JSONArrayStreamResponse, SSEResponse, ServerSentEvent
+from .request import Request, NotFound
 from .enums import StatusCode
 from .middleware import Middleware
-from .objects import Route
\ No newline at end of file
+from .objects import Route
+from .routing import Router, Converter
+from .multipart import UploadFile
+from .static import StaticFiles
+from .templating import Template, TemplateCache
+from .websocket import WebSocket, WebSocketDisconnect
+from .context import Context, current_request
+from .accesslog import AccessLog
+from .metrics import Metrics
+from .profiling import Profiler
+from .cache import ResponseCache, CacheRule
+from .jsoncodec import JSONBackend, set_json_backend
@@ -0,0 +1,310 @@
+import atexit
+import json
+import os
+import random
+import sys
+import threading
+import time
+import weakref
+from collections import deque
+
+_logs = weakref.WeakSet()
+
+class AccessLog:
+    """
+    Access log written in batches by a background thread.
+
+    Recording a request only appends a tuple to a bounded queue, which is lock-free in
+    CPython; formatting and writing happen on the writer thread, which drains the queue
+    every 'flush_interval' seconds or as soon as 'batch_size' records are waiting. When
+    the queue is full, records are dropped and counted rather than blocking requests.
+
+    Records are written as Combined Log Format lines followed by the response time in
+    seconds, or as JSON lines. With 'sample_rate' below 1, only that fraction of
+    requests is logged, though server errors are always kept. Log files are rotated
+    when they reach 'max_bytes', keeping 'backup_count' old files.
+
+    Attributes:
+        path (str): The log file, or None to write to standard output.
+        format (str): 'text' or 'json'.
+        sample_rate (float): Fraction of requests logged, between 0 and 1.
+        max_bytes (int): Size in bytes at which the file is rotated, or 0 to never rotate.
+        backup_count (int): Number of rotated files kept.
+        batch_size (int): Number of waiting records that wakes the writer early.
+        flush_interval (float): Seconds between writes.
+        queue_size (int): Maximum number of records waiting to be written.
+        dropped (int): Number of records dropped because the queue was full.
+
+    Methods:
+        log(environ, status, length, duration):
+            Records a request served through WSGI.
+
+        log_scope(scope, status, length, duration):
+            Records a request served through ASGI.
+
+        flush():
+            Writes every waiting record.
+
+        close():
+            Stops the writer thread, writing the remaining records.
+    """
+
+    def __init__(self, path: str = None, format: str = "text", sample_rate: float = 1.0, max_bytes: int = 0, backup_count: int = 5, batch_size: int = 256, flush_interval: float = 0.5, queue_size: int = 65536) -> None:
+        """
+        Initializes an AccessLog. The file is opened and the writer started on the first record.
+
+        Args:
+            path (str, optional): The log file. Defaults to standard output.
+            format (str, optional): 'text' or 'json'. Defaults to 'text'.
+            sample_rate (float, optional): Fraction of requests logged. Defaults to every request.
+            max_bytes (int, optional): Size in bytes at which the file is rotated. Defaults to never.
+            backup_count (int, optional): Number of rotated files kept. Defaults to 5.
+            batch_size (int, optional): Number of waiting records that wakes the writer early. Defaults to 256.
+            flush_interval (float, optional): Seconds between writes. Defaults to 0.5.
+            queue_size (int, optional): Maximum number of records waiting to be written. Defaults to 65536.
+
+        Raises:
+            ValueError: If the format is unknown, the sample rate is out of range or rotation is requested without a file.
+        """
+        if format not in ("text", "json"):
+            raise ValueError(f"Unknown access log format '{format}', expected 'text' or 'json'")
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("Access log sample rate must be between 0 and 1")
+        if max_bytes and path is None:
+            raise ValueError("Access log rotation requires a file path")
+        self.path = path
+        self.format = format
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._queue = deque()
+        self._wakeup = threading.Event()
+        self._write_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._stream = None
+        self._closing = False
+        self._format_record = self._format_json if format == "json" else self._format_text
+        _logs.add(self)
+
+    def log(self, environ: dict, status: int, length: int, duration: float) -> None:
+        """
+        Records a request served through WSGI.
+
+        Args:
+            environ (dict): The WSGI environment of the request.
+            status (int): The response status code.
+            length (int): The body size in bytes, or None if unknown.
+            duration (float): Seconds spent serving the request.
+        """
+        if self.sample_rate < 1 and status < 500 and random.random() >= self.sample_rate:
+            return
+        self._push((
+            time.time(), environ.get("REMOTE_ADDR"), environ.get("REQUEST_METHOD"), environ.get("PATH_INFO"),
+            environ.get("QUERY_STRING"), environ.get("SERVER_PROTOCOL"), status, length, duration,
+            environ.get("HTTP_REFERER"), environ.get("HTTP_USER_AGENT"),
+        ))
+
+    def log_scope(self, scope: dict, status: int, length: int, duration: float) -> None:
+        """
+        Records a request served through ASGI.
+
+        Args:
+            scope (dict): The ASGI connection scope of the request.
+            status (int): The response status code.
+            length (int): The body size in bytes.
+            duration (float): Seconds spent serving the request.
+        """
+        if self.sample_rate < 1 and status < 500 and random.random() >= self.sample_rate:
+            return
+        referer = user_agent = None
+        for name, value in scope.get("headers", ()):
+            if name == b"referer":
+                referer = value.decode("latin-1")
+            elif name == b"user-agent":
+                user_agent = value.decode("latin-1")
+        client = scope.get("client")
+        self._push((
+            time.time(), client[0] if client else None, scope.get("method"), scope.get("path"),
+            scope.get("query_string", b"").decode("latin-1"), f"HTTP/{scope.get('http_version', '1.1')}",
+            status, length, duration, referer, user_agent,
+        ))
+
+    def _push(self, record: tuple) -> None:
+        """
+        Queues a record for the writer thread, starting it if needed.
+
+        Args:
+            record (tuple): The request's fields.
+        """
+        queue = self._queue
+        if len(queue) >= self.queue_size:
+            self.dropped += 1
+            return
+        queue.append(record)
+        if self._thread is None:
+            self._start()
+        if len(queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def _start(self) -> None:
+        """
+        Starts the writer thread.
+        """
+        with self._start_lock:
+            if self._thread is None and not self._closing:
+                self._thread = threading.Thread(target=self._run, name="vortexkit-accesslog", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        """
+        Writes the queued records in batches until the log is closed.
+        """
+        while not self._closing:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes every waiting record.
+        """
+        with self._write_lock:
+            queue = self._queue
+            if not queue:
+                return
+            lines = []
+            format_record = self._format_record
+            while queue:
+                lines.append(format_record(queue.popleft()))
+
+            stream = self._stream
+            if stream is None:
+                stream = self._stream = self._open()
+            stream.write("".join(lines))
+            stream.flush()
+            if self.max_bytes and stream.tell() >= self.max_bytes:
+                self._rotate()
+
+    def _open(self):
+        """
+        Opens the log file for appending, or returns standard output.
+
+        Returns:
+            TextIO: The stream records are written to.
+        """
+        if self.path is None:
+            return sys.stdout
+        return open(self.path, "a", encoding="utf-8")
+
+    def _rotate(self) -> None:
+        """
+        Renames the full log file to '<path>.1', shifting older files up to 'backup_count'.
+
+        If another process has already rotated the file, it is only reopened.
+        """
+        try:
+            rotated = os.stat(self.path).st_ino != os.fstat(self._stream.fileno()).st_ino
+        except FileNotFoundError:
+            rotated = True
+        self._stream.close()
+        if not rotated:
+            if self.backup_count:
+                for index in range(self.backup_count - 1, 0, -1):
+                    source = f"{self.path}.{index}"
+                    if os.path.exists(source):
+                        os.replace(source, f"{self.path}.{index + 1}")
+                os.replace(self.path, f"{self.path}.1")
+            else:
+                os.remove(self.path)
+        self._stream = self._open()
+
+    def _format_text(self, record: tuple) -> str:
+        """
+        Formats a record as a Combined Log Format line followed by the response time.
+
+        Args:
+            record (tuple): The request's fields.
+
+        Returns:
+            str: The log line.
+        """
+        timestamp, remote_addr, method, path, query, protocol, status, length, duration, referer, user_agent = record
+        target = f"{path}?{query}" if query else path
+        when = time.strftime("%d/%b/%Y:%H:%M:%S %z", time.localtime(timestamp))
+        return (
+            f'{remote_addr or "-"} - - [{when}] "{method} {target} {protocol}" {status} '
+            f'{"-" if length is None else length} "{referer or "-"}" "{user_agent or "-"}" {duration:.6f}\n'
+        )
+
+    def _format_json(self, record: tuple) -> str:
+        """
+        Formats a record as a JSON line.
+
+        Args:
+            record (tuple): The request's fields.
+
+        Returns:
+            str: The log line.
+        """
+        timestamp, remote_addr, method, path, query, protocol, status, length, duration, referer, user_agent = record
+        return json.dumps({
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(timestamp)) + f".{int(timestamp % 1 * 1000):03d}Z",
+            "remote_addr": remote_addr,
+            "method": method,
+            "path": path,
+            "query": query or None,
+            "protocol": protocol,
+            "status": status,
+            "length": length,
+            "duration": round(duration, 6),
+            "referer": referer,
+            "user_agent": user_agent,
+        }) + "\n"
+
+    def close(self) -> None:
+        """
+        Stops the writer thread, writing the remaining records.
+        """
+        self._closing = True
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
+        if self._stream is not None and self._stream is not sys.stdout:
+            self._stream.close()
+        self._stream = None
+
+    def _after_fork(self) -> None:
+        """
+        Resets the log in a forked child, which inherits neither the writer thread nor the parent's records.
+        """
+        self._queue.clear()
+        self._wakeup = threading.Event()
+        self._write_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        if self._stream is not None and self._stream is not sys.stdout:
+            self._stream = None
+
+def close_all() -> None:
+    """
+    Closes every open access log, writing their remaining records.
+
+    Called at interpreter exit, and by worker processes before they exit.
+    """
+    for access_log in list(_logs):
+        access_log.close()
+
+def _after_fork_in_child() -> None:
+    for access_log in list(_logs):
+        access_log._after_fork()
+
+atexit.register(close_all)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
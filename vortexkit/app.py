@@ -1,45 +1,102 @@
-import os
-import threading
+import asyncio
+import time
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 from wsgiref import simple_server
 from urllib.parse import parse_qs
-from .responses import FileResponse
-from .request import ParseRequestInput
-from .enums import StatusCode
+from .responses import BaseResponse, FileIterator, PlainTextResponse
+from .static import StaticFiles
+from .templating import templates
+from .server import ThreadPoolWSGIServer, AsyncHTTPServer, Arbiter
+from .request import ParseRequestInput, PayloadTooLarge, NotFound
+from .multipart import DEFAULT_SPOOL_SIZE, MultipartError
+from .enums import StatusCode, status_line
+from .objects import Route
+from .context import Context, bind_request, unbind_request, run_in_executor
+from .accesslog import AccessLog
+from .metrics import Metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .profiling import Profiler
+from .cache import ResponseCache
+from .middleware import HOOKS, middleware_hooks
+from .dispatch import Dispatcher, compile_call, is_async_callable, serialize_response
+from .asgi import ClientDisconnect, build_environ, receive_body, send_response
+from .routing import Router, MethodTable
+from .websocket import WebSocket, ASGIWebSocket, WebSocketHub, WebSocketDisconnect, CONNECTING, OPEN
 
 class App:
     """
     Represents a web application using VortexKit framework.
 
+    The application is both a WSGI and an ASGI callable. Under ASGI, 'async def'
+    handlers and middleware are awaited on the event loop, while synchronous ones run
+    on a bounded pool of 'thread_pool_size' threads.
+
     Attributes:
-        _routes (dict): Dictionary mapping routes to handler functions.
+        _routes (dict): Dictionary mapping path templates to MethodTable objects.
+        router (Router): Compiled router used to resolve request paths to routes.
+        _websocket_routes (dict): Dictionary mapping path templates to WebSocket Route objects.
+        websocket_router (Router): Compiled router used to resolve WebSocket paths to routes.
+        websockets (WebSocketHub): Open WebSocket connections and their broadcast groups.
         errors (dict): Dictionary mapping error status codes to handler functions.
-        context (threading.local): Thread-local storage for request context.
-        middleware (list): List of middleware functions to be applied to requests.
+        context (Context): Application-wide state, shared by every request and thread.
+        middleware (list): List of middleware wrapping the handlers, the first registered outermost.
+        upload_spool_size (int): Size in bytes above which uploaded files are written to temporary files.
+        max_body_size (int): Default maximum request body size in bytes, or None for no limit.
+        thread_pool_size (int): Number of threads running synchronous handlers under ASGI.
+        access_log (AccessLog): The access log, or None when requests are not logged.
+        metrics (Metrics): The request metrics, or None when they are not collected.
+        profiler (Profiler): The live request profiler, or None when profiling is off.
+        _compiled (bool): Whether the dispatch pipelines reflect the registered routes and middleware.
+        _error_dispatchers (dict): Dictionary mapping error status codes to compiled Dispatcher objects.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, upload_spool_size: int = DEFAULT_SPOOL_SIZE, max_body_size: int = None, thread_pool_size: int = 32) -> None:
         """
         Initializes a new instance of the App class.
+
+        Args:
+            upload_spool_size (int, optional): Size in bytes above which uploaded files are written to temporary files. Defaults to 1 MiB.
+            max_body_size (int, optional): Default maximum request body size in bytes. Defaults to no limit.
+            thread_pool_size (int, optional): Number of threads running synchronous handlers under ASGI. Defaults to 32.
         """
         self._routes = {}
+        self.router = Router()
+        self._websocket_routes = {}
+        self.websocket_router = Router()
+        self.websockets = WebSocketHub()
         self.errors = {}
-        self.context = threading.local()
+        self.context = Context()
         self.middleware = []
+        self.upload_spool_size = upload_spool_size
+        self.max_body_size = max_body_size
+        self.thread_pool_size = thread_pool_size
+        self._compiled = False
+        self._error_dispatchers = {}
+        self._cache_guard = None
+        self._executor = None
+        self.access_log = None
+        self.metrics = None
+        self.profiler = None
+        self.response_cache = None
 
     def register_middleware(self, middleware: callable) -> None:
         """
-        Registers a middleware function to be applied to incoming requests.
+        Registers a middleware to wrap the route and error handlers.
+
+        Middleware registered first is the outermost layer: it sees the request first and
+        the response last. See Middleware for the hooks.
 
         Args:
-            middleware (callable): Callable middleware function with a 'process_request' method.
+            middleware (callable): Middleware with 'process_request', 'process_response' and/or 'process_exception' methods.
         
         Raises:
-            ValueError: If the provided middleware does not have a 'process_request' method.
+            ValueError: If the provided middleware has none of the middleware methods.
         """
-        if not hasattr(middleware, "process_request"):
-            raise ValueError("Middleware must have a 'process_request' method")
+        if not any(hasattr(middleware, name) for name in HOOKS):
+            raise ValueError("Middleware must have a 'process_request', 'process_response' or 'process_exception' method")
 
         self.middleware.append(middleware)
+        self._compiled = False
 
     def register_class(self, cls: any) -> None:
         """
@@ -50,22 +107,168 @@ class App:
         """
         self.add_route("/", cls.__call__)
 
-    def serve_static(self, path: str, folder: str) -> None:
+    def serve_static(self, path: str, folder: str, **options) -> StaticFiles:
         """
-        Serves static files from a specified folder.
+        Serves static files from a specified folder and its subfolders.
+
+        Files are looked up on request, cached in memory and sent with ETag,
+        Last-Modified and Cache-Control headers, and conditional requests are
+        answered with '304 Not Modified'.
 
         Args:
             path (str): URL path prefix for serving static files.
             folder (str): Local folder path containing static files.
+            **options: Options passed to StaticFiles, such as max_cache_size or cache_control.
+
+        Returns:
+            StaticFiles: The handler serving the folder.
+        """
+        static_files = StaticFiles(folder, **options)
+        self._add_route(f"{path.rstrip('/')}/<path:filename>", static_files, ["GET"])
+        return static_files
+
+    def enable_access_log(self, path: str = None, **options) -> AccessLog:
+        """
+        Logs every request, or a sample of them, to a file or standard output.
+
+        Records are queued on the request path and formatted and written in batches by a
+        background thread. Production servers log nothing until this is called.
+
+        Args:
+            path (str, optional): The log file. Defaults to standard output.
+            **options: Options passed to AccessLog, such as format, sample_rate or max_bytes.
+
+        Returns:
+            AccessLog: The access log.
+        """
+        if self.access_log is not None:
+            self.access_log.close()
+        self.access_log = AccessLog(path, **options)
+        return self.access_log
+
+    def enable_metrics(self, path: str = "/metrics", **options) -> Metrics:
+        """
+        Collects per-route request counts, in-flight gauges and latency histograms.
+
+        Requests are recorded under the path template of the route they matched. With
+        'path', the metrics are served there in the Prometheus text format. Pass
+        'multiprocess_dir' when running several workers, so every worker reports the
+        totals of all of them.
+
+        Args:
+            path (str, optional): URL path serving the metrics, or None to not serve them. Defaults to '/metrics'.
+            **options: Options passed to Metrics, such as buckets or multiprocess_dir.
+
+        Returns:
+            Metrics: The metrics.
         """
-        for file in os.listdir(folder):
-            if os.path.isfile(os.path.join(folder, file)):
-                self._routes[f"{path}/{file}"] = [lambda file=file: FileResponse(os.path.join(folder, file)), True]
+        metrics = Metrics(**options)
+
+        def serve_metrics():
+            response = PlainTextResponse(metrics.render())
+            response.content_type = METRICS_CONTENT_TYPE
+            return response
+
+        if path is not None:
+            self._add_route(path, serve_metrics, ["GET"], cache=False)
+        self.metrics = metrics
+        self._compiled = False
+        return metrics
+
+    def enable_profiler(self, path: str = None, **options) -> Profiler:
+        """
+        Profiles a sample of live requests, aggregating the profiles per route template.
+
+        Requests are profiled one in 'every', or when they carry the profiler's header
+        with its 'secret' value. With 'path', the aggregated report is served there to
+        requests carrying the secret header; the 'route', 'sort' and 'limit' query
+        parameters select what it shows, and invalid values are answered with
+        '400 Bad Request'. See Profiler for the options.
+
+        Args:
+            path (str, optional): URL path serving the report. Defaults to not serving it.
+            **options: Options passed to Profiler, such as every, secret or mode.
+
+        Returns:
+            Profiler: The profiler.
+
+        Raises:
+            ValueError: If a report path is given without a secret.
+        """
+        profiler = Profiler(**options)
+        if path is not None:
+            if profiler.secret is None:
+                raise ValueError("Serving the profiler report requires a 'secret'")
+
+            def serve_profile(request):
+                if not profiler.requested(request.environ):
+                    return PlainTextResponse("Forbidden", StatusCode.FORBIDDEN)
+                query = request.query_params
+                limit = query.get("limit", ["40"])[0]
+                try:
+                    report = profiler.report(
+                        query.get("route", [None])[0],
+                        query.get("sort", ["cumulative"])[0],
+                        int(limit) if limit.isdigit() else limit,
+                    )
+                except ValueError as error:
+                    return PlainTextResponse(str(error), StatusCode.BAD_REQUEST)
+                return PlainTextResponse(report)
+
+            self._add_route(path, serve_profile, ["GET"], cache=False)
+        self.profiler = profiler
+        self._compiled = False
+        return profiler
+
+    def enable_response_cache(self, **options) -> ResponseCache:
+        """
+        Caches the complete responses of GET and HEAD requests in memory.
+
+        Routes opt in with their 'cache' argument, or all of them with 'every_route'.
+        Routes with a 'cache' argument get a cache with the default settings if this is
+        not called. See ResponseCache for the options and the rules deciding what is stored.
+
+        Warning: a hit is answered without reading the request body or calling the
+        handler, and the 'process_response' and 'process_exception' hooks of the
+        middleware do not run. The 'process_request' hooks do run first, so middleware
+        refusing a request, such as a login check, still answers it. Anything else a
+        handler derives from the request must be part of the key: requests with an
+        Authorization or Cookie header bypass the cache unless the rule's 'vary' names
+        that header, and only routes whose response depends on nothing but the path,
+        the query string and the 'vary' headers should be cached.
+
+        Args:
+            **options: Options passed to ResponseCache, such as ttl, vary, max_entries or every_route.
+
+        Returns:
+            ResponseCache: The cache, whose 'invalidate' and 'invalidate_tag' methods remove stored responses.
+        """
+        self.response_cache = ResponseCache(**options)
+        self._compiled = False
+        return self.response_cache
+
+    def precompile_templates(self, folder: str, extensions: tuple = (".html", ".htm", ".txt", ".xml")) -> int:
+        """
+        Compiles every template in a folder ahead of the first request.
+
+        Args:
+            folder (str): Local folder path containing templates.
+            extensions (tuple, optional): File extensions treated as templates.
+
+        Returns:
+            int: The number of templates compiled.
+        """
+        return templates.precompile(folder, extensions)
 
     def websocket(self, path: str) -> callable:
         """
         Decorator to define a WebSocket route.
 
+        The handler must be an 'async def' function. It receives a WebSocket and the
+        path parameters, and calls 'accept' to complete the handshake; returning without
+        accepting refuses the connection with '403 Forbidden'. WebSocket routes are
+        served under ASGI only, such as with 'App.run(mode="async")'.
+
         Args:
             path (str): URL path for the WebSocket route.
 
@@ -73,23 +276,51 @@ class App:
             callable: Decorated function handling the WebSocket route.
         
         Raises:
-            ValueError: If the path does not start with '/' or if the route already exists.
+            ValueError: If the path does not start with '/', if the route already exists or
+                if the handler is not a coroutine function.
         """
         def inner(func, *args, **kwargs):
             if not path.startswith("/") and path != "*":
                 raise ValueError("Path must start with a /")
-            if self._routes.get(path):
-                raise ValueError("Route already exists")
-            self._routes[path] = [func]
+            self._add_websocket_route(path, func)
             return func
         return inner
 
-    def route(self, path: str) -> callable:
+    def broadcast(self, group: str, message: any, exclude: WebSocket = None) -> int:
+        """
+        Sends a message to every WebSocket in a broadcast group.
+
+        The message is serialized and compressed once for all recipients. Groups are
+        local to the process.
+
+        Args:
+            group (str): The name of the group joined with 'WebSocket.join'.
+            message (any): The message, as str for text, bytes for binary or any JSON-serializable object.
+            exclude (WebSocket, optional): A connection to skip, such as the sender.
+
+        Returns:
+            int: The number of connections the message was queued on.
+        """
+        return self.websockets.broadcast(group, message, exclude)
+
+    def route(self, path: str, methods: list = None, max_body_size: int = None, cache: any = None) -> callable:
         """
         Decorator to define a new HTTP route.
 
+        Path segments of the form '<name>' or '<converter:name>' capture part of the
+        request path and are passed to the handler as keyword arguments. The built-in
+        converters are 'str', 'int', 'float', 'uuid' and 'path'.
+
+        When methods are given, requests using any other method are answered with
+        '405 Method Not Allowed', OPTIONS requests are answered with the 'Allow' header
+        and GET routes also answer HEAD, all without calling the handler.
+
         Args:
-            path (str): URL path for the route.
+            path (str): URL path for the route, e.g. '/users/<int:id>'.
+            methods (list, optional): HTTP methods the route accepts. Defaults to every method.
+            max_body_size (int, optional): Maximum request body size in bytes. Defaults to the application limit.
+            cache (any, optional): True, a TTL in seconds or a CacheRule to cache the route's GET and HEAD responses,
+                or False to never cache them. Defaults to the response cache's 'every_route' setting.
 
         Returns:
             callable: Decorated function handling the HTTP route.
@@ -100,9 +331,7 @@ class App:
         def inner(func, *args, **kwargs):
             if not path.startswith("/") and path != "*":
                 raise ValueError("Path must start with a /")
-            if self._routes.get(path):
-                raise ValueError("Route already exists")
-            self._routes[path] = [func]
+            self._add_route(path, func, methods, max_body_size, cache)
             return func
         return inner
 
@@ -129,6 +358,7 @@ class App:
             if self.errors.get(status_code):
                 raise ValueError("Error handler for this status code already exists")
             self.errors[status_code] = [func]
+            self._compiled = False
             return func
         return inner
 
@@ -141,67 +371,652 @@ class App:
             start_response (callable): WSGI start_response function.
 
         Returns:
-            list: Response content as a list of bytes.
+            iterable: Response content as an iterable of bytes. Streamed bodies are returned
+            as-is, and files are handed to 'wsgi.file_wrapper' when the server provides one.
+        """
+        if not self._compiled:
+            self.compile()
+
+        method = environ.get("REQUEST_METHOD", "GET")
+        resolved = self._resolve(method, environ.get("PATH_INFO", "/"))
+        access_log = self.access_log
+        metrics = self.metrics
+        if access_log is None and metrics is None:
+            return self._handle(environ, start_response, method, resolved)
+
+        start = time.perf_counter()
+        row = metrics.start(resolved[5]) if metrics is not None else None
+        response = []
+
+        def recording_start_response(status, headers, exc_info=None):
+            response[:] = (status, headers)
+            return start_response(status, headers, exc_info)
+
+        try:
+            body = self._handle(environ, recording_start_response, method, resolved)
+        except BaseException:
+            duration = time.perf_counter() - start
+            if row is not None:
+                metrics.finish(row, 500, duration)
+            if access_log is not None:
+                access_log.log(environ, 500, None, duration)
+            raise
+
+        status, headers = response
+        status = int(status[:3])
+        duration = time.perf_counter() - start
+        if row is not None:
+            metrics.finish(row, status, duration)
+        if access_log is not None:
+            length = None
+            if isinstance(body, list):
+                length = sum(map(len, body))
+            else:
+                for name, value in headers:
+                    if name.lower() == "content-length":
+                        length = int(value)
+            access_log.log(environ, status, length, duration)
+        return body
+
+    def _handle(self, environ: dict, start_response: callable, method: str, resolved: tuple) -> list:
+        """
+        Runs the pipeline resolved for a WSGI request.
+
+        Args:
+            environ (dict): WSGI environment dictionary.
+            start_response (callable): WSGI start_response function.
+            method (str): The request method.
+            resolved (tuple): The request's resolution, as returned by '_resolve'.
+
+        Returns:
+            iterable: Response content as an iterable of bytes.
         """
-        current_request = ParseRequestInput(environ, self.context).parse()
-        print(current_request.__dict__())
+        dispatch, params, body_limit, extra_headers, early, template, cache_rule = resolved
+        if early is not None:
+            start_response(early[0], early[1])
+            return early[2]
 
-        # Invoke middleware and pass current request
-        for middleware in self.middleware:
-            middleware.process_request(current_request)
+        cache_key = None
+        if cache_rule is not None and (method == "GET" or method == "HEAD"):
+            cache_key, hit = self.response_cache.lookup(environ, cache_rule)
+            if hit is not None:
+                guard = self._cache_guard
+                if guard is not None:
+                    current_request = ParseRequestInput(environ, self.context, self.upload_spool_size, body_limit).parse()
+                    current_request.path_params = params
+                    token = bind_request(current_request)
+                    try:
+                        hit = guard(current_request, params) or hit
+                    finally:
+                        unbind_request(token)
+                start_response(hit[0], hit[1])
+                if method == "HEAD":
+                    if hasattr(hit[2], "close"):
+                        hit[2].close()
+                    return []
+                return hit[2]
 
-        route = self._routes.get(current_request.path, False)
+        # Reject oversized bodies from the declared length, before any of it is read
+        if body_limit is not None:
+            content_length = environ.get("CONTENT_LENGTH")
+            if content_length and content_length.isdigit() and int(content_length) > body_limit:
+                return self._error_response(environ, start_response, StatusCode.PAYLOAD_TOO_LARGE)
 
-        if not route:
-            if self._routes.get("*"):
-                route = self._routes["*"]
+        current_request = ParseRequestInput(environ, self.context, self.upload_spool_size, body_limit).parse()
+        current_request.path_params = params
+
+        profiler = self.profiler
+        token = bind_request(current_request)
+        try:
+            if profiler is not None and profiler.wants(environ):
+                status, headers, body = profiler.run(template, dispatch, current_request, params)
             else:
-                route = self.errors.get("404")
-                if not route:
-                    start_response("404 Not Found", [("Content-type", "text/html")])
-                    return [b"<h1>404 Not Found</h1>"]
+                status, headers, body = dispatch(current_request, params)
+        except NotFound:
+            cache_key = extra_headers = None
+            status, headers, body = self._not_found(method, template, current_request)
+        except PayloadTooLarge:
+            return self._error_response(environ, start_response, StatusCode.PAYLOAD_TOO_LARGE)
+        except MultipartError:
+            return self._error_response(environ, start_response, StatusCode.BAD_REQUEST)
+        finally:
+            unbind_request(token)
+        if extra_headers:
+            headers.extend(extra_headers)
+        if cache_key is not None:
+            body = self.response_cache.store(cache_key, cache_rule, params, status, headers, body)
+
+        start_response(status, headers)
+        if method == "HEAD":
+            if hasattr(body, "close"):
+                body.close()
+            return []
+        if body.__class__ is FileIterator:
+            file_wrapper = environ.get("wsgi.file_wrapper")
+            if file_wrapper is not None:
+                return file_wrapper(body.file, body.chunk_size)
+        return body
+
+    def _resolve(self, method: str, path: str) -> tuple:
+        """
+        Resolves a request method and path to the pipeline answering it.
+
+        Args:
+            method (str): The request method.
+            path (str): The request path.
+
+        Returns:
+            tuple: A (dispatch, params, body_limit, extra_headers, early, template, cache_rule) tuple,
+            where 'early' is a (status, headers, body) response to send without running a pipeline,
+            or None, 'template' is the matched path template, or '' if none matched, and
+            'cache_rule' is the matched route's CacheRule, or None if it is not cached.
+        """
+        table, params = self.router.match(path)
+        if table is None:
+            table = self._routes.get("*")
+        return self._resolve_table(method, table, params)
+
+    def _resolve_table(self, method: str, table: MethodTable, params: dict, not_found_handler: bool = True) -> tuple:
+        """
+        Resolves a request method to the pipeline of a path's method table, or of the 404 handling.
+
+        Args:
+            method (str): The request method.
+            table (MethodTable): The table of the matched path, or None if no path matched.
+            params (dict): The converted path parameters.
+            not_found_handler (bool, optional): Whether a registered 404 handler may answer. Defaults to True.
+
+        Returns:
+            tuple: The resolution, as returned by '_resolve'.
+        """
+        extra_headers = None
+        body_limit = self.max_body_size
+        if table is not None:
+            route = table.get(method)
+            if route is not None:
+                return route.dispatch, params, route.body_limit, None, None, table.path, route.cache_rule
+            if method == "OPTIONS":
+                return None, params, body_limit, None, ("204 No Content", table.allow_headers, []), table.path, None
+            dispatch = self._error_dispatchers.get("405")
+            if dispatch is None:
+                return None, params, body_limit, None, ("405 Method Not Allowed", table.allow_headers, []), table.path, None
+            extra_headers = [("Allow", table.allow)]
+            template = table.path
+        else:
+            dispatch = self._error_dispatchers.get("404") if not_found_handler else None
+            if dispatch is None:
+                return None, params, body_limit, None, ("404 Not Found", [("Content-type", "text/html")], [b"<h1>404 Not Found</h1>"]), "", None
+            template = ""
+        return dispatch, params, body_limit, extra_headers, None, template, None
+
+    def _resolve_not_found(self, method: str, template: str) -> tuple:
+        """
+        Resolves the pipeline answering a request whose handler raised NotFound.
+
+        The request falls through as if its path had not matched: to the '*' route, then
+        to the registered 404 handler, then to the default '404 Not Found' response.
+
+        Args:
+            method (str): The request method.
+            template (str): The template of the pipeline that raised, '*' for the catch-all or '' for the 404 handler.
+
+        Returns:
+            tuple: The resolution, as returned by '_resolve'.
+        """
+        table = self._routes.get("*") if template != "*" and template != "" else None
+        return self._resolve_table(method, table, {}, template != "")
 
+    def _not_found(self, method: str, template: str, request) -> tuple:
+        """
+        Runs the pipelines a request falls through to after its handler raised NotFound.
+
+        Args:
+            method (str): The request method.
+            template (str): The template of the pipeline that raised.
+            request (Request): The current request.
+
+        Returns:
+            tuple: A (status, headers, body) tuple.
+        """
+        while True:
+            dispatch, params, _, extra_headers, early, template, _ = self._resolve_not_found(method, template)
+            if early is not None:
+                return early
+            try:
+                status, headers, body = dispatch(request, params)
+            except NotFound:
+                continue
+            if extra_headers:
+                headers.extend(extra_headers)
+            return status, headers, body
+
+    async def _not_found_async(self, method: str, template: str, request, executor) -> tuple:
+        """
+        Runs the pipelines a request falls through to after its handler raised NotFound, from the event loop.
+
+        Args:
+            method (str): The request method.
+            template (str): The template of the pipeline that raised.
+            request (Request): The current request.
+            executor (Executor): The thread pool running synchronous steps.
+
+        Returns:
+            tuple: A (status, headers, body) tuple.
+        """
+        while True:
+            dispatch, params, _, extra_headers, early, template, _ = self._resolve_not_found(method, template)
+            if early is not None:
+                return early
+            try:
+                status, headers, body = await dispatch.run_async(request, params, executor)
+            except NotFound:
+                continue
+            if extra_headers:
+                headers.extend(extra_headers)
+            return status, headers, body
+
+    def __call__(self, environ_or_scope: dict, start_response_or_receive: callable, send: callable = None):
+        """
+        Entry point for both WSGI and ASGI servers, chosen by the number of arguments.
+
+        ASGI servers that detect the interface from the signature should be told to use
+        ASGI 3, or be given 'app.asgi' instead.
+
+        Args:
+            environ_or_scope (dict): WSGI environment or ASGI connection scope.
+            start_response_or_receive (callable): WSGI start_response or ASGI receive function.
+            send (callable, optional): ASGI send function.
+
+        Returns:
+            The WSGI response body, or the ASGI coroutine.
+        """
+        if send is None:
+            return self.handler(environ_or_scope, start_response_or_receive)
+        return self.asgi(environ_or_scope, start_response_or_receive, send)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        Returns the thread pool running synchronous handlers under ASGI, creating it on first use.
+
+        Returns:
+            ThreadPoolExecutor: The thread pool.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.thread_pool_size, thread_name_prefix="vortexkit")
+        return self._executor
+
+    async def asgi(self, scope: dict, receive: callable, send: callable) -> None:
+        """
+        ASGI 3 application handling HTTP and lifespan connections.
+
+        Routing, body limits and error handlers behave as in 'handler'. The body is
+        received once the route is known, so requests that are rejected early are never
+        read. Async pipelines are awaited on the event loop and synchronous ones are run
+        in the thread pool.
+
+        Args:
+            scope (dict): The ASGI connection scope.
+            receive (callable): The ASGI receive function.
+            send (callable): The ASGI send function.
+        """
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    self.compile()
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    if self._executor is not None:
+                        self._executor.shutdown(wait=False)
+                        self._executor = None
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] == "websocket":
+            await self._websocket(scope, receive, send)
+            return
+
+        if not self._compiled:
+            self.compile()
+
+        method = scope["method"]
+        resolved = self._resolve(method, scope["path"].encode("utf-8").decode("latin-1"))
+        access_log = self.access_log
+        metrics = self.metrics
+        if access_log is None and metrics is None:
+            await self._http(scope, receive, send, method, resolved)
+            return
+
+        start = time.perf_counter()
+        row = metrics.start(resolved[5]) if metrics is not None else None
+        response = [500, 0]
+
+        async def recording_send(message):
+            if message["type"] == "http.response.start":
+                response[0] = message["status"]
+            elif message["type"] == "http.response.body":
+                response[1] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self._http(scope, receive, recording_send, method, resolved)
+        finally:
+            duration = time.perf_counter() - start
+            if row is not None:
+                metrics.finish(row, response[0], duration)
+            if access_log is not None:
+                access_log.log_scope(scope, response[0], response[1], duration)
+
+    async def _http(self, scope: dict, receive: callable, send: callable, method: str, resolved: tuple) -> None:
+        """
+        Runs the pipeline resolved for an ASGI HTTP request.
+
+        Args:
+            scope (dict): The ASGI connection scope.
+            receive (callable): The ASGI receive function.
+            send (callable): The ASGI send function.
+            method (str): The request method.
+            resolved (tuple): The request's resolution, as returned by '_resolve'.
+        """
+        dispatch, params, body_limit, extra_headers, early, template, cache_rule = resolved
+        if early is not None:
+            await send_response(send, *early)
+            return
+
+        environ = build_environ(scope)
+        cache_key = None
+        if cache_rule is not None and (method == "GET" or method == "HEAD"):
+            cache_key, hit = self.response_cache.lookup(environ, cache_rule)
+            if hit is not None:
+                guard = self._cache_guard
+                executor = None
+                if guard is not None:
+                    executor = self._get_executor()
+                    current_request = ParseRequestInput(environ, self.context, self.upload_spool_size, body_limit).parse()
+                    current_request.path_params = params
+                    token = bind_request(current_request)
+                    try:
+                        hit = await guard.run_async(current_request, params, executor) or hit
+                    finally:
+                        unbind_request(token)
+                await send_response(send, hit[0], hit[1], hit[2], method == "HEAD", executor)
+                return
+        executor = self._get_executor()
+        if body_limit is not None:
+            content_length = environ.get("CONTENT_LENGTH")
+            if content_length and content_length.isdigit() and int(content_length) > body_limit:
+                await self._error_response_async(environ, send, executor, StatusCode.PAYLOAD_TOO_LARGE)
+                return
+
+        try:
+            try:
+                await receive_body(receive, environ, body_limit, self.upload_spool_size)
+            except PayloadTooLarge:
+                await self._error_response_async(environ, send, executor, StatusCode.PAYLOAD_TOO_LARGE)
+                return
+            except ClientDisconnect:
+                return
+
+            current_request = ParseRequestInput(environ, self.context, self.upload_spool_size, body_limit).parse()
+            current_request.path_params = params
+            profiler = self.profiler
+            token = bind_request(current_request)
+            try:
                 try:
-                    response = route[0](current_request)
-                except TypeError:
-                    response = route[0]()
-                if isinstance(response.status_code, StatusCode):
-                    response.status_code = response.status_code.value
+                    if profiler is not None and profiler.wants(environ):
+                        status, headers, body = await self._profile_async(profiler, template, dispatch, current_request, params, executor)
+                    else:
+                        status, headers, body = await dispatch.run_async(current_request, params, executor)
+                except NotFound:
+                    cache_key = extra_headers = None
+                    status, headers, body = await self._not_found_async(method, template, current_request, executor)
+                except PayloadTooLarge:
+                    await self._error_response_async(environ, send, executor, StatusCode.PAYLOAD_TOO_LARGE)
+                    return
+                except MultipartError:
+                    await self._error_response_async(environ, send, executor, StatusCode.BAD_REQUEST)
+                    return
+                if extra_headers:
+                    headers.extend(extra_headers)
+                if cache_key is not None:
+                    body = self.response_cache.store(cache_key, cache_rule, params, status, headers, body)
+                await send_response(send, status, headers, body, method == "HEAD", executor)
+            finally:
+                unbind_request(token)
+        finally:
+            environ["wsgi.input"].close()
+
+    async def _profile_async(self, profiler: Profiler, template: str, dispatch: Dispatcher, request, params: dict, executor) -> tuple:
+        """
+        Runs a pipeline from the event loop under the profiler.
 
-                start_response(response.status_code, [("Content-type", response.content_type)])
-                if isinstance(response.content, bytes):
-                    return [response.content]
-                return [response.content.encode('utf-8')]
+        Synchronous pipelines are profiled on the worker thread running them, and async
+        ones on the event loop.
 
+        Args:
+            profiler (Profiler): The profiler.
+            template (str): The matched route template.
+            dispatch (Dispatcher): The pipeline.
+            request (Request): The current request.
+            params (dict): The converted path parameters.
+            executor (Executor): The thread pool running synchronous steps.
+
+        Returns:
+            tuple: A (status, headers, body) tuple.
+        """
+        if dispatch.is_async:
+            return await profiler.run_async(template, dispatch.run_async(request, params, executor))
+        return await run_in_executor(asyncio.get_running_loop(), executor, profiler.run, template, dispatch, request, params)
+
+    async def _websocket(self, scope: dict, receive: callable, send: callable) -> None:
+        """
+        Serves an ASGI WebSocket connection with the matching WebSocket route.
+
+        Under the built-in asyncio server the connection's stream is taken over through
+        the 'vortexkit.websocket' scope extension, otherwise the ASGI server's WebSocket
+        messages are used. Middleware 'process_request' runs on the handshake request
+        before the handler, and a response it returns refuses the handshake.
+
+        Args:
+            scope (dict): The ASGI connection scope.
+            receive (callable): The ASGI receive function.
+            send (callable): The ASGI send function.
+        """
+        if not self._compiled:
+            self.compile()
+
+        path = scope["path"].encode("utf-8").decode("latin-1")
+        route, params = self.websocket_router.match(path)
+        if route is None:
+            route = self._websocket_routes.get("*")
+
+        environ = build_environ(scope)
+        current_request = ParseRequestInput(environ, self.context, self.upload_spool_size, 0).parse()
+        current_request.path_params = params
+        stream = scope.get("extensions", {}).get("vortexkit.websocket")
+        if stream is not None:
+            websocket = WebSocket(current_request, self.websockets, *stream)
+        else:
+            websocket = ASGIWebSocket(current_request, self.websockets, receive, send)
+
+        if route is None:
+            await websocket.reject("404 Not Found")
+            return
+        error = websocket.handshake_error()
+        if error is not None:
+            await websocket.reject(*error)
+            return
+
+        token = bind_request(current_request)
         try:
-            response = route[0](current_request)
-        except TypeError:
-            response = route[0]()
-        if isinstance(response.status_code, StatusCode):
-            response.status_code = response.status_code.value
+            response = await route.dispatch.run_async(websocket, params, self._get_executor())
+            if isinstance(response, BaseResponse) and websocket.state == CONNECTING:
+                await websocket.reject(status_line(response.status_code), response.header_list())
+        except WebSocketDisconnect:
+            pass
+        except asyncio.CancelledError:
+            await websocket.close(1001)
+            raise
+        except Exception:
+            if websocket.state == CONNECTING:
+                await websocket.reject("500 Internal Server Error")
+            else:
+                await websocket.close(1011)
+            raise
+        finally:
+            unbind_request(token)
+            if websocket.state == CONNECTING:
+                await websocket.reject()
+            elif websocket.state == OPEN:
+                await websocket.close()
+
+    async def _error_response_async(self, environ: dict, send: callable, executor, status: StatusCode) -> None:
+        """
+        Sends a client error response over ASGI, using the registered error handler if there is one.
+
+        Args:
+            environ (dict): The environment built from the ASGI scope.
+            send (callable): The ASGI send function.
+            executor (Executor): The thread pool running synchronous handlers.
+            status (StatusCode): The status, such as StatusCode.PAYLOAD_TOO_LARGE.
+        """
+        status = status.value
+        dispatch = self._error_dispatchers.get(status[:3])
+        if dispatch is None:
+            await send_response(send, status, [("Content-Length", "0")], [])
+            return
 
-        start_response(response.status_code, [("Content-type", response.content_type)])
-        if isinstance(response.content, bytes):
-            return [response.content]
-        return [response.content.encode('utf-8')]
+        environ["CONTENT_LENGTH"] = "0"
+        environ["wsgi.input"].close()
+        environ["wsgi.input"] = BytesIO()
+        current_request = ParseRequestInput(environ, self.context, self.upload_spool_size, 0).parse()
+        status, headers, body = await dispatch.run_async(current_request, {}, executor)
+        await send_response(send, status, headers, body, executor=executor)
 
-    def add_route(self, path: str, func: callable) -> None:
+    def _error_response(self, environ: dict, start_response: callable, status: StatusCode) -> list:
+        """
+        Responds with a client error, using the registered error handler if there is one.
+
+        Used when the request body is too large or malformed, so the body is not read again.
+
+        Args:
+            environ (dict): WSGI environment dictionary.
+            start_response (callable): WSGI start_response function.
+            status (StatusCode): The status, such as StatusCode.PAYLOAD_TOO_LARGE.
+
+        Returns:
+            list: Response content as a list of bytes.
+        """
+        status = status.value
+        dispatch = self._error_dispatchers.get(status[:3])
+        if dispatch is None:
+            start_response(status, [("Content-Length", "0")])
+            return []
+
+        current_request = ParseRequestInput(environ, self.context, self.upload_spool_size, 0).parse()
+        status, headers, body = dispatch(current_request, {})
+        start_response(status, headers)
+        return body
+
+    def add_route(self, path: str, func: callable, methods: list = None, max_body_size: int = None, cache: any = None) -> None:
         """
         Adds a new route to the application.
 
         Args:
             path (str): URL path for the route.
             func (callable): Function to be called when the route is accessed.
+            methods (list, optional): HTTP methods the route accepts. Defaults to every method.
+            max_body_size (int, optional): Maximum request body size in bytes. Defaults to the application limit.
+            cache (any, optional): True, a TTL in seconds, a CacheRule or False, as for 'route'. Defaults to the cache's 'every_route' setting.
         
         Raises:
             ValueError: If the path does not start with '/' or if the route already exists.
         """
         if not path.startswith("/"):
             raise ValueError("Path must start with a /")
-        if self._routes.get(path):
+
+        self._add_route(path, func, methods, max_body_size, cache)
+
+    def _add_route(self, path: str, func: callable, methods: list = None, max_body_size: int = None, cache: any = None) -> None:
+        """
+        Compiles a route into the router and records it in the path's method table.
+
+        Args:
+            path (str): URL path template for the route.
+            func (callable): Function to be called when the route is accessed.
+            methods (list, optional): HTTP methods the route accepts. Defaults to every method.
+            max_body_size (int, optional): Maximum request body size in bytes. Defaults to the application limit.
+            cache (any, optional): The route's response cache setting. Defaults to the cache's 'every_route' setting.
+
+        Raises:
+            ValueError: If the route already exists or the path template is malformed.
+        """
+        route = Route(path, func, methods, self.router.parameter_names(path), max_body_size, cache)
+        table = self._routes.get(path)
+        if table is None:
+            table = MethodTable(path)
+            if path != "*":
+                self.router.add(path, table)
+            self._routes[path] = table
+
+        table.add(route, methods)
+        self._compiled = False
+
+    def _add_websocket_route(self, path: str, func: callable) -> None:
+        """
+        Compiles a WebSocket route into the WebSocket router.
+
+        Args:
+            path (str): URL path template for the route.
+            func (callable): Coroutine function handling the connection.
+
+        Raises:
+            ValueError: If the route already exists, the path template is malformed or the handler is not a coroutine function.
+        """
+        if not is_async_callable(func):
+            raise ValueError("WebSocket handlers must be 'async def' functions")
+        if path in self._websocket_routes:
             raise ValueError("Route already exists")
+        route = Route(path, func, ["GET"], self.websocket_router.parameter_names(path))
+        if path != "*":
+            self.websocket_router.add(path, route)
+        self._websocket_routes[path] = route
+        self._compiled = False
 
-        self._routes[path] = [func]
+    def compile(self) -> None:
+        """
+        Compiles every route and error handler into its dispatch pipeline.
+
+        The middleware is composed around each handler and the response serializer bound
+        to it once, so the per-request work is limited to routing, running the chain and
+        serializing the response. Called automatically before the first request after any registration.
+        """
+        routes = set()
+        for table in self._routes.values():
+            routes.update(table.handlers.values())
+        if self.response_cache is None and any(route.cache not in (None, False) for route in routes):
+            self.response_cache = ResponseCache()
+        for route in routes:
+            route.body_limit = route.max_body_size if route.max_body_size is not None else self.max_body_size
+            route.cache_rule = self.response_cache.rule(route.cache) if self.response_cache is not None else None
+            route.dispatch = Dispatcher(route.call, self.middleware, is_async=route.is_async)
+        # Cache hits only run the 'process_request' hooks, answering with a response one of them returns
+        self._cache_guard = None
+        if self.response_cache is not None and any(middleware_hooks(item)[0] is not None for item in self.middleware):
+            self._cache_guard = Dispatcher(
+                lambda request, params: None, self.middleware,
+                serialize=lambda response, request: serialize_response(response, request) if response is not None else None,
+                request_hooks_only=True,
+            )
+        for route in self._websocket_routes.values():
+            route.dispatch = Dispatcher(route.call, self.middleware, serialize=lambda response, request: response, is_async=True, request_hooks_only=True)
+
+        self._error_dispatchers = {}
+        for status_code, handler in self.errors.items():
+            call = compile_call(handler[0])
+            if self.metrics is not None:
+                call = self.metrics.count_error(status_code, call)
+            self._error_dispatchers[status_code] = Dispatcher(call, self.middleware, is_async=is_async_callable(handler[0]))
+        self._compiled = True
 
     def add_error_handler(self, status_code: str|StatusCode, func: callable) -> None:
         """
@@ -222,17 +1037,42 @@ class App:
 
         if not self.errors.get(status_code):
             self.errors[status_code] = [func]
+            self._compiled = False
 
-    def run(self, host: str, port: int) -> None:
+    def run(self, host: str, port: int, workers: int = None, threads: int = None, max_requests: int = 0, reuse_port: bool = False, timeout: float = 30, mode: str = "wsgi", keepalive_timeout: float = 5, max_keepalive_requests: int = 100) -> None:
         """
         Runs the VortexKit application on the specified host and port.
 
+        Without 'workers' or 'threads', the single-threaded development server is used.
+        Otherwise the application runs in production mode on a pool of 'threads' threads.
+        With 'workers', that pool runs in each of several pre-forked worker processes,
+        which share the listening socket or, with 'reuse_port', each bind their own socket
+        with SO_REUSEPORT. Workers are supervised and replaced when they exit, reach
+        'max_requests' or hang, which is when none of their threads, or in 'async' mode
+        their event loop, has been free to answer a heartbeat for 'timeout' seconds.
+        Production servers keep connections open between requests, closing them after
+        'keepalive_timeout' idle seconds or 'max_keepalive_requests' requests, while the
+        development server closes each connection after one request.
+
+        With mode 'async', requests are served by an asyncio server calling the application
+        through ASGI, in the current process or in each of the 'workers'. 'async def'
+        handlers run on the event loop and synchronous handlers on a pool of 'threads'
+        threads, which defaults to 'thread_pool_size'.
+
         Args:
             host (str): Host address to run the application on.
             port (int): Port number to run the application on.
+            workers (int, optional): The number of pre-forked worker processes. Defaults to serving from the current process.
+            threads (int, optional): The number of threads per worker. Defaults to 8 in production mode.
+            max_requests (int, optional): Number of requests after which a worker process is replaced, bounding memory growth. Defaults to no limit.
+            reuse_port (bool, optional): Whether each worker binds its own socket with SO_REUSEPORT.
+            timeout (float, optional): Seconds without a heartbeat after which a worker is killed and replaced. Defaults to 30.
+            mode (str, optional): 'wsgi' or 'async', the interface the server calls the application through. Defaults to 'wsgi'.
+            keepalive_timeout (float, optional): Seconds an idle connection is kept open. Defaults to 5.
+            max_keepalive_requests (int, optional): Maximum number of requests served on one connection. Defaults to 100.
         
         Raises:
-            ValueError: If no host or port is specified.
+            ValueError: If no host or port is specified, or the mode is unknown.
         """
         if not host and not port:
             raise ValueError("No host and port were specified.")
@@ -240,8 +1080,48 @@ class App:
             raise ValueError("No host was specified.")
         if not port:
             raise ValueError("No port was specified.")
+        if mode not in ("wsgi", "async"):
+            raise ValueError(f"Unknown server mode '{mode}', expected 'wsgi' or 'async'.")
 
         assert self._routes.get("/") is not None, "Cannot find index route"
-        with simple_server.make_server(host, port, self.handler) as server:
-            print(f"[+] Development server running on http://{host}:{port}")
-            server.serve_forever()
+        self.compile()
+        if workers is not None and self.metrics is not None:
+            self.metrics.clear_directory()
+
+        if mode == "async":
+            if threads:
+                self.thread_pool_size = threads
+            if workers is None:
+                print(f"[+] Async server running on http://{host}:{port} ({self.thread_pool_size} threads for sync handlers)")
+                server = AsyncHTTPServer((host, port), self, reuse_port=reuse_port, keepalive_timeout=keepalive_timeout, max_keepalive_requests=max_keepalive_requests)
+                try:
+                    server.serve_forever()
+                except KeyboardInterrupt:
+                    pass
+                finally:
+                    server.server_close()
+                return
+            print(f"[+] Async server running on http://{host}:{port} ({workers} workers)")
+            Arbiter(self, host, port, workers, self.thread_pool_size, max_requests, reuse_port, timeout, "async", keepalive_timeout, max_keepalive_requests).run()
+            return
+
+        if workers is None and threads is None:
+            with simple_server.make_server(host, port, self.handler) as server:
+                print(f"[+] Development server running on http://{host}:{port}")
+                server.serve_forever()
+            return
+
+        threads = threads or 8
+        if workers is None:
+            print(f"[+] Production server running on http://{host}:{port} ({threads} threads)")
+            server = ThreadPoolWSGIServer((host, port), self.handler, threads, reuse_port=reuse_port, keepalive_timeout=keepalive_timeout, max_keepalive_requests=max_keepalive_requests)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                server.server_close()
+            return
+
+        print(f"[+] Production server running on http://{host}:{port} ({workers} workers, {threads} threads each)")
+        Arbiter(self.handler, host, port, workers, threads, max_requests, reuse_port, timeout, keepalive_timeout=keepalive_timeout, max_keepalive_requests=max_keepalive_requests).run()
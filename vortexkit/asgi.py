@@ -0,0 +1,152 @@
+import asyncio
+import sys
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+from .context import run_in_executor
+from .request import PayloadTooLarge
+from .responses import StreamingBody
+
+class ClientDisconnect(Exception):
+    """
+    Raised when the client disconnects before the request body has been received.
+    """
+
+def build_environ(scope: dict) -> dict:
+    """
+    Builds a WSGI-style environment from an ASGI HTTP or WebSocket connection scope.
+
+    Requests are views over a WSGI environment, so handlers and middleware see the same
+    keys under ASGI as under WSGI. Header names are mapped to 'HTTP_*' keys, repeated
+    headers are joined with commas, and the path is decoded as in PEP 3333.
+
+    Args:
+        scope (dict): The ASGI connection scope.
+
+    Returns:
+        dict: The environment, with an empty 'wsgi.input' until the body is received.
+    """
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client")
+    environ = {
+        "REQUEST_METHOD": scope.get("method", "GET"),
+        "SCRIPT_NAME": scope.get("root_path", ""),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]) if server[1] is not None else "",
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+        "asgi.scope": scope,
+    }
+    if client:
+        environ["REMOTE_ADDR"] = client[0]
+        environ["REMOTE_PORT"] = str(client[1])
+
+    for name, value in scope.get("headers", ()):
+        key = name.decode("latin-1").upper().replace("-", "_")
+        if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            key = "HTTP_" + key
+        value = value.decode("latin-1")
+        if key in environ:
+            value = f"{environ[key]},{value}"
+        environ[key] = value
+    return environ
+
+async def receive_body(receive: callable, environ: dict, max_body_size: int = None, spool_size: int = 1024 * 1024) -> None:
+    """
+    Receives the request body into the environment's 'wsgi.input'.
+
+    The body is held in memory up to the spool threshold and written to a temporary file
+    beyond it. 'CONTENT_LENGTH' is set to the number of bytes received.
+
+    Args:
+        receive (callable): The ASGI receive function.
+        environ (dict): The environment built by build_environ.
+        max_body_size (int, optional): Maximum accepted body size in bytes. Defaults to no limit.
+        spool_size (int, optional): Size in bytes above which the body is written to disk.
+
+    Raises:
+        PayloadTooLarge: If the body exceeds the maximum body size.
+        ClientDisconnect: If the client disconnects before the body is complete.
+    """
+    body = None
+    size = 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            if body is not None:
+                body.close()
+            raise ClientDisconnect()
+        chunk = message.get("body", b"")
+        if chunk:
+            size += len(chunk)
+            if max_body_size is not None and size > max_body_size:
+                if body is not None:
+                    body.close()
+                raise PayloadTooLarge(f"Request body exceeds {max_body_size} bytes")
+            if body is None:
+                body = SpooledTemporaryFile(max_size=spool_size)
+            body.write(chunk)
+        if not message.get("more_body", False):
+            break
+
+    if body is not None:
+        body.seek(0)
+        environ["wsgi.input"] = body
+    environ["CONTENT_LENGTH"] = str(size)
+
+async def send_response(send: callable, status: str, headers: list, body: any, head: bool = False, executor=None) -> None:
+    """
+    Sends a (status, headers, body) response over ASGI.
+
+    Lists of bytes are sent directly. Asynchronous streaming bodies are consumed on the
+    event loop, while other iterables, such as generators and files, are advanced in the
+    thread pool so blocking reads never stall the loop. The body is always closed.
+
+    Args:
+        send (callable): The ASGI send function.
+        status (str): The status line, such as '200 OK'.
+        headers (list): List of (name, value) header tuples.
+        body (any): Iterable of bytes chunks.
+        head (bool, optional): Whether to omit the body, for HEAD requests.
+        executor (Executor, optional): The thread pool advancing blocking iterables.
+    """
+    await send({
+        "type": "http.response.start",
+        "status": int(status[:3]),
+        "headers": [(name.encode("latin-1"), str(value).encode("latin-1")) for name, value in headers],
+    })
+
+    try:
+        if not head and isinstance(body, list):
+            for chunk in body[:-1]:
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": body[-1] if body else b"", "more_body": False})
+            return
+        if head:
+            pass
+        elif isinstance(body, StreamingBody) and body.is_async:
+            async for chunk in body.aiter_chunks():
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        else:
+            loop = asyncio.get_running_loop()
+            iterator = iter(body)
+            while True:
+                chunk = await run_in_executor(loop, executor, next, iterator, None)
+                if chunk is None:
+                    break
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    finally:
+        if isinstance(body, StreamingBody) and body.is_async:
+            await body.aclose()
+        elif hasattr(body, "close"):
+            body.close()
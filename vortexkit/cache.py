@@ -0,0 +1,394 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+NO_STORE = ("no-store", "private", "no-cache")
+
+# Stored headers repeated on a '304 Not Modified' answer
+VALIDATOR_HEADERS = frozenset(("etag", "cache-control", "vary", "expires", "last-modified"))
+
+class CacheRule:
+    """
+    Caching settings of a route, resolved against the ResponseCache defaults when the application is compiled.
+
+    Attributes:
+        ttl (float): Seconds a response is kept, unless it sets max-age or s-maxage itself.
+        vary (tuple): Names of the request headers whose values are part of the cache key.
+        tags (tuple): Tags attached to the stored responses, formatted with the path parameters, such as 'user:{user_id}'.
+    """
+
+    __slots__ = ("ttl", "vary", "tags", "vary_keys", "vary_names", "formatted_tags")
+
+    def __init__(self, ttl: float = None, vary: tuple = None, tags: tuple = ()) -> None:
+        """
+        Initializes a CacheRule.
+
+        Args:
+            ttl (float, optional): Seconds a response is kept. Defaults to the cache's TTL.
+            vary (tuple, optional): Request headers the responses vary on. Defaults to the cache's.
+            tags (tuple, optional): Tags for invalidation, may contain '{name}' path parameters. Defaults to none.
+        """
+        self.ttl = ttl
+        self.vary = tuple(vary) if vary is not None else None
+        self.tags = tuple(tags)
+        self.vary_keys = ()
+        self.vary_names = frozenset()
+        self.formatted_tags = any("{" in tag for tag in self.tags)
+
+    def resolve(self, ttl: float, vary: tuple) -> "CacheRule":
+        """
+        Returns a copy filling the unset settings from the cache's defaults.
+
+        Args:
+            ttl (float): The cache's default TTL.
+            vary (tuple): The cache's default Vary headers.
+
+        Returns:
+            CacheRule: The resolved rule.
+        """
+        rule = CacheRule(self.ttl if self.ttl is not None else ttl, self.vary if self.vary is not None else vary, self.tags)
+        rule.vary_keys = tuple("HTTP_" + name.upper().replace("-", "_") for name in rule.vary)
+        rule.vary_names = frozenset(name.lower() for name in rule.vary)
+        return rule
+
+    def tags_for(self, params: dict) -> tuple:
+        """
+        Returns the rule's tags with the path parameters filled in.
+
+        Args:
+            params (dict): The converted path parameters of the request.
+
+        Returns:
+            tuple: The tags.
+        """
+        if not self.formatted_tags:
+            return self.tags
+        return tuple(tag.format(**params) for tag in self.tags)
+
+class ResponseCache:
+    """
+    In-memory cache of complete responses, keyed on the path, the query string and chosen request headers.
+
+    Only GET and HEAD requests to routes with a cache rule are cached, and a hit is
+    answered from the stored status, headers and body bytes before the request body is
+    read. Entries expire after their TTL and the least recently
+    used ones are evicted beyond 'max_entries' or 'max_bytes'. The cache belongs to one
+    process; invalidations do not reach other workers.
+
+    Requests sending 'Cache-Control: no-store', or an Authorization or Cookie header
+    the rule does not vary on, bypass the cache, so responses personalised for a user
+    or a session are neither stored nor served to others. 'no-cache' or 'max-age=0'
+    skip the lookup but store the fresh response. Responses are not stored when their
+    status is not in 'statuses', their body is streamed, they set cookies, their
+    Cache-Control says no-store, private or no-cache, or they vary on headers outside
+    the rule. Their max-age or s-maxage, when present, replaces the rule's TTL.
+
+    Stored responses keep their ETag, or are given one derived from the body, and hits
+    whose If-None-Match matches it are answered with '304 Not Modified'.
+
+    Attributes:
+        ttl (float): Default seconds a response is kept.
+        vary (tuple): Default request headers the responses vary on.
+        max_entries (int): Maximum number of stored responses.
+        max_bytes (int): Maximum total size in bytes of the stored responses.
+        statuses (tuple): Status codes of the responses that may be stored.
+        every_route (bool): Whether routes without their own rule are cached with the defaults.
+        hits (int): Number of requests answered from the cache.
+        misses (int): Number of cacheable requests that ran the handler.
+        size (int): Total size in bytes of the stored responses.
+
+    Methods:
+        rule(spec):
+            Resolves a route's 'cache' argument into a CacheRule.
+
+        lookup(environ, rule):
+            Returns the cache key of a request and the stored response, if any.
+
+        store(key, rule, params, status, headers, body):
+            Stores a response if it may be cached.
+
+        invalidate(path, query_string=None):
+            Removes the responses stored for a path.
+
+        invalidate_tag(tag):
+            Removes the responses stored with a tag.
+
+        clear():
+            Removes every stored response.
+    """
+
+    def __init__(self, ttl: float = 60, vary: tuple = (), max_entries: int = 4096, max_bytes: int = 64 * 1024 * 1024, statuses: tuple = (200,), every_route: bool = False) -> None:
+        """
+        Initializes a ResponseCache.
+
+        Args:
+            ttl (float, optional): Default seconds a response is kept. Defaults to 60.
+            vary (tuple, optional): Default request headers the responses vary on. Defaults to none.
+            max_entries (int, optional): Maximum number of stored responses. Defaults to 4096.
+            max_bytes (int, optional): Maximum total size in bytes of the stored responses. Defaults to 64 MiB.
+            statuses (tuple, optional): Status codes of the responses that may be stored. Defaults to 200 only.
+            every_route (bool, optional): Cache routes without their own rule with the defaults. Defaults to False.
+
+        Raises:
+            ValueError: If the TTL or a limit is not positive.
+        """
+        if ttl <= 0 or max_entries <= 0 or max_bytes <= 0:
+            raise ValueError("Response cache TTL and limits must be positive")
+        self.ttl = ttl
+        self.vary = tuple(vary)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.statuses = frozenset(statuses)
+        self.every_route = every_route
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        self._entries = OrderedDict()
+        self._paths = {}
+        self._tags = {}
+        self._lock = threading.Lock()
+
+    def rule(self, spec: any) -> CacheRule:
+        """
+        Resolves a route's 'cache' argument into a CacheRule.
+
+        Args:
+            spec (any): None to follow 'every_route', False to never cache, True for the
+                defaults, a number of seconds, or a CacheRule.
+
+        Returns:
+            CacheRule: The resolved rule, or None if the route is not cached.
+
+        Raises:
+            ValueError: If the argument is not one of the accepted forms.
+        """
+        if spec is None:
+            spec = self.every_route
+        if spec is False:
+            return None
+        if spec is True:
+            spec = CacheRule()
+        elif isinstance(spec, (int, float)):
+            spec = CacheRule(ttl=spec)
+        elif not isinstance(spec, CacheRule):
+            raise ValueError(f"Invalid route cache setting {spec!r}, expected a boolean, a number of seconds or a CacheRule")
+        return spec.resolve(self.ttl, self.vary)
+
+    def lookup(self, environ: dict, rule: CacheRule) -> tuple:
+        """
+        Returns the cache key of a request and the stored response, if any.
+
+        Args:
+            environ (dict): The WSGI environment of the request.
+            rule (CacheRule): The route's rule.
+
+        Returns:
+            tuple: The key, or None if the request bypasses the cache, and a
+            (status, headers, body) response ready to send, or None on a miss. The
+            response is '304 Not Modified' when the request's If-None-Match matches.
+        """
+        lookup = True
+        cache_control = environ.get("HTTP_CACHE_CONTROL")
+        if cache_control is not None:
+            directives = parse_cache_control(cache_control)
+            if "no-store" in directives:
+                return None, None
+            lookup = "no-cache" not in directives and directives.get("max-age") != "0"
+        if environ.get("HTTP_PRAGMA") == "no-cache":
+            lookup = False
+        if "HTTP_AUTHORIZATION" in environ and "authorization" not in rule.vary_names:
+            return None, None
+        if "HTTP_COOKIE" in environ and "cookie" not in rule.vary_names:
+            return None, None
+
+        key = (environ.get("PATH_INFO", "/"), environ.get("QUERY_STRING", ""))
+        if rule.vary_keys:
+            key += tuple(environ.get(name) for name in rule.vary_keys)
+        if not lookup:
+            self.misses += 1
+            return key, None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                now = time.monotonic()
+                if entry[3] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    age = ("Age", str(int(now - entry[4])))
+                    if_none_match = environ.get("HTTP_IF_NONE_MATCH")
+                    if if_none_match and etag_matches(if_none_match, entry[7]):
+                        headers = [header for header in entry[1] if header[0].lower() in VALIDATOR_HEADERS]
+                        headers.append(age)
+                        return key, ("304 Not Modified", headers, [])
+                    headers = list(entry[1])
+                    headers.append(age)
+                    return key, (entry[0], headers, [entry[2]])
+                self._remove(key)
+            self.misses += 1
+        return key, None
+
+    def store(self, key: tuple, rule: CacheRule, params: dict, status: str, headers: list, body: any) -> any:
+        """
+        Stores a response if it may be cached.
+
+        A stored response without an ETag is given one, appended to 'headers'.
+
+        Args:
+            key (tuple): The key returned by lookup.
+            rule (CacheRule): The route's rule.
+            params (dict): The converted path parameters, used to format the tags.
+            status (str): The status line.
+            headers (list): The (name, value) header tuples.
+            body (any): The body as returned by the pipeline.
+
+        Returns:
+            any: The body to send, joined into a single chunk when the response was stored.
+        """
+        if body.__class__ is not list or int(status[:3]) not in self.statuses:
+            return body
+        ttl = rule.ttl
+        etag = None
+        for name, value in headers:
+            lower = name.lower()
+            if lower == "set-cookie":
+                return body
+            if lower == "etag":
+                etag = value
+            elif lower == "cache-control":
+                directives = parse_cache_control(value)
+                if any(directive in directives for directive in NO_STORE):
+                    return body
+                max_age = directives.get("s-maxage") or directives.get("max-age")
+                if max_age is not None:
+                    ttl = int(max_age) if max_age.isdigit() else 0
+            elif lower == "vary":
+                varies = {item.strip().lower() for item in value.split(",")}
+                if not varies <= rule.vary_names:
+                    return body
+        if ttl <= 0:
+            return body
+
+        content = b"".join(body)
+        if etag is None:
+            etag = f'"{hashlib.blake2b(content, digest_size=8).hexdigest()}"'
+            headers.append(("ETag", etag))
+        size = len(content) + sum(len(name) + len(value) for name, value in headers)
+        if size > self.max_bytes:
+            return [content]
+        now = time.monotonic()
+        tags = rule.tags_for(params) if rule.tags else ()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (status, tuple(headers), content, now + ttl, now, size, tags, etag)
+            self.size += size
+            self._paths.setdefault(key[0], set()).add(key)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+        return [content]
+
+    def _remove(self, key: tuple) -> None:
+        """
+        Removes an entry and its index references. Must be called with the lock held.
+
+        Args:
+            key (tuple): The entry's key.
+        """
+        entry = self._entries.pop(key)
+        self.size -= entry[5]
+        keys = self._paths.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._paths[key[0]]
+        for tag in entry[6]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate(self, path: str, query_string: str = None) -> int:
+        """
+        Removes the responses stored for a path.
+
+        Args:
+            path (str): The request path, such as '/users/42'.
+            query_string (str, optional): Only remove the responses for this query string. Defaults to every query string.
+
+        Returns:
+            int: The number of responses removed.
+        """
+        with self._lock:
+            keys = [key for key in self._paths.get(path, ()) if query_string is None or key[1] == query_string]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def invalidate_tag(self, tag: str) -> int:
+        """
+        Removes the responses stored with a tag.
+
+        Args:
+            tag (str): The tag, such as 'user:42'.
+
+        Returns:
+            int: The number of responses removed.
+        """
+        with self._lock:
+            keys = list(self._tags.get(tag, ()))
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        """
+        Removes every stored response.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._paths.clear()
+            self._tags.clear()
+            self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+def parse_cache_control(value: str) -> dict:
+    """
+    Parses a Cache-Control header into its directives.
+
+    Args:
+        value (str): The header value.
+
+    Returns:
+        dict: Lower-case directive names mapped to their value, or None for directives without one.
+    """
+    directives = {}
+    for part in value.split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+    return directives
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Checks an If-None-Match header against an entity tag with the weak comparison.
+
+    Args:
+        if_none_match (str): The header value.
+        etag (str): The entity tag of the stored response.
+
+    Returns:
+        bool: True if the client's copy is still valid.
+    """
+    etag = etag.removeprefix("W/")
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
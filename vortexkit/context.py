@@ -0,0 +1,72 @@
+from contextvars import ContextVar, copy_context
+
+class Context:
+    """
+    Attribute namespace for state shared by the code handling a request or an application.
+
+    Methods:
+        __json__():
+            Returns the attributes as a dictionary.
+    """
+
+    def __json__(self) -> dict:
+        """
+        Convert the Context to a JSON-compatible dictionary.
+
+        Returns:
+            dict: The attributes set on the context.
+        """
+        return dict(self.__dict__)
+
+    def __repr__(self):
+        return f"Context({self.__dict__})"
+
+_current_request = ContextVar("vortexkit.request", default=None)
+
+def current_request():
+    """
+    Returns the request being handled by the current thread or task.
+
+    The request is bound for the duration of the handler and middleware, and follows
+    them into the thread pool and into tasks they start.
+
+    Returns:
+        Request: The current request, or None outside of a request.
+    """
+    return _current_request.get()
+
+def bind_request(request) -> any:
+    """
+    Makes a request the current request of the running context.
+
+    Args:
+        request (Request): The request being handled.
+
+    Returns:
+        Token: The token restoring the previous value with unbind_request.
+    """
+    return _current_request.set(request)
+
+def unbind_request(token) -> None:
+    """
+    Restores the current request that was bound before bind_request.
+
+    Args:
+        token (Token): The token returned by bind_request.
+    """
+    _current_request.reset(token)
+
+def run_in_executor(loop, executor, func: callable, *args):
+    """
+    Runs a function in a thread pool with a copy of the caller's context variables.
+
+    Args:
+        loop (asyncio.AbstractEventLoop): The running event loop.
+        executor (Executor): The thread pool, or None for the loop's default executor.
+        func (callable): The function to call.
+        *args: The arguments to pass.
+
+    Returns:
+        asyncio.Future: The future of the call's result.
+    """
+    return loop.run_in_executor(executor, copy_context().run, func, *args)
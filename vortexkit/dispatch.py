@@ -0,0 +1,363 @@
+import asyncio
+import inspect
+from collections.abc import AsyncIterator, Iterator
+from .enums import status_line
+from .context import run_in_executor
+from .middleware import middleware_hooks
+from .responses import StreamingResponse
+
+NO_BODY_STATUSES = ("204", "304")
+
+CALL_NONE = "none"
+CALL_REQUEST = "request"
+CALL_PARAMS = "params"
+CALL_REQUEST_PARAMS = "request+params"
+
+def inspect_handler(func: callable, path_names: tuple = ()) -> str:
+    """
+    Determines how a handler expects to be called.
+
+    Args:
+        func (callable): The route or error handler.
+        path_names (tuple, optional): Names of the path parameters captured by the route.
+
+    Returns:
+        str: One of CALL_NONE, CALL_REQUEST, CALL_PARAMS or CALL_REQUEST_PARAMS.
+
+    Raises:
+        ValueError: If the handler cannot accept the route's path parameters.
+    """
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return CALL_REQUEST_PARAMS if path_names else CALL_REQUEST
+
+    positional = []
+    keywords = set()
+    var_positional = var_keyword = False
+    for parameter in parameters:
+        if parameter.kind is parameter.VAR_POSITIONAL:
+            var_positional = True
+        elif parameter.kind is parameter.VAR_KEYWORD:
+            var_keyword = True
+        elif parameter.kind is parameter.KEYWORD_ONLY:
+            keywords.add(parameter.name)
+        elif parameter.name in path_names:
+            keywords.add(parameter.name)
+        else:
+            positional.append(parameter.name)
+
+    if path_names and not var_keyword:
+        missing = [name for name in path_names if name not in keywords]
+        if missing:
+            raise ValueError(f"Handler {getattr(func, '__qualname__', func)!r} does not accept path parameters: {', '.join(missing)}")
+
+    wants_request = bool(positional) or var_positional
+    if path_names:
+        return CALL_REQUEST_PARAMS if wants_request else CALL_PARAMS
+    return CALL_REQUEST if wants_request else CALL_NONE
+
+def is_async_callable(func: callable) -> bool:
+    """
+    Checks whether calling an object returns an awaitable, as 'async def' functions do.
+
+    Args:
+        func (callable): The function, bound method or callable object.
+
+    Returns:
+        bool: True if the object is a coroutine function or has an 'async def __call__'.
+    """
+    return inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(getattr(func, "__call__", None))
+
+async def run_inline(func: callable, *args) -> any:
+    """
+    Calls a synchronous function on the current thread, for pipelines run without a thread pool.
+
+    Args:
+        func (callable): The function to call.
+        *args: The arguments to pass.
+
+    Returns:
+        any: The result of the call.
+    """
+    return func(*args)
+
+def compile_call(func: callable, path_names: tuple = ()) -> callable:
+    """
+    Builds a callable invoking the handler with exactly the arguments it accepts.
+
+    Args:
+        func (callable): The route or error handler.
+        path_names (tuple, optional): Names of the path parameters captured by the route.
+
+    Returns:
+        callable: A function taking (request, params) and returning the handler's response.
+    """
+    kind = inspect_handler(func, path_names)
+    if kind == CALL_NONE:
+        return lambda request, params: func()
+    if kind == CALL_REQUEST:
+        return lambda request, params: func(request)
+    if kind == CALL_PARAMS:
+        return lambda request, params: func(**params)
+    return lambda request, params: func(request, **params)
+
+def as_response(response) -> any:
+    """
+    Wraps generators and other iterators returned by a handler in a StreamingResponse.
+
+    Args:
+        response (any): The value returned by a handler.
+
+    Returns:
+        BaseResponse: The response.
+    """
+    if isinstance(response, (Iterator, AsyncIterator)):
+        return StreamingResponse(response)
+    return response
+
+def compose(call: callable, layers: list) -> callable:
+    """
+    Nests the middleware hooks around a synchronous handler, the first layer outermost.
+
+    Args:
+        call (callable): Function taking (request, params) and returning the handler's response.
+        layers (list): (process_request, process_response, process_exception) tuples, hooks possibly None.
+
+    Returns:
+        callable: A function taking (request, params) and returning the response.
+    """
+    def innermost(request, params):
+        return as_response(call(request, params))
+
+    handler = innermost if layers else call
+    for process_request, process_response, process_exception in reversed(layers):
+        handler = _layer(handler, process_request, process_response, process_exception)
+    return handler
+
+def _layer(inner: callable, process_request: callable, process_response: callable, process_exception: callable) -> callable:
+    """
+    Builds one synchronous middleware layer around the rest of the chain.
+
+    Args:
+        inner (callable): The rest of the chain, taking (request, params).
+        process_request (callable): The request hook, or None.
+        process_response (callable): The response hook, or None.
+        process_exception (callable): The exception hook, or None.
+
+    Returns:
+        callable: A function taking (request, params) and returning the response.
+    """
+    def layer(request, params):
+        response = process_request(request) if process_request is not None else None
+        if response is None:
+            if process_exception is None:
+                response = inner(request, params)
+            else:
+                try:
+                    response = inner(request, params)
+                except Exception as exception:
+                    response = process_exception(request, exception)
+                    if response is None:
+                        raise
+        if process_response is not None:
+            response = process_response(request, response)
+        return response
+    return layer
+
+def compose_async(call: callable, handler_is_async: bool, layers: list) -> callable:
+    """
+    Nests the middleware hooks around a handler as coroutines, the first layer outermost.
+
+    Async hooks are awaited and synchronous ones are handed to the 'offload' function
+    given with each request, so the same chain runs on the event loop under ASGI and on
+    a private loop under WSGI.
+
+    Args:
+        call (callable): Function taking (request, params) and returning the handler's response.
+        handler_is_async (bool): Whether the handler is a coroutine function.
+        layers (list): (process_request, process_response, process_exception) tuples, hooks possibly None.
+
+    Returns:
+        callable: A coroutine function taking (request, params, offload) and returning the response.
+    """
+    async def innermost(request, params, offload):
+        if handler_is_async:
+            return as_response(await call(request, params))
+        return as_response(await offload(call, request, params))
+
+    handler = innermost
+    for hooks in reversed(layers):
+        handler = _async_layer(handler, *(_awaitable(hook) for hook in hooks))
+    return handler
+
+def _awaitable(hook: callable) -> callable:
+    """
+    Adapts a middleware hook to be awaited, offloading it if it is synchronous.
+
+    Args:
+        hook (callable): The hook, or None.
+
+    Returns:
+        callable: A coroutine function taking (offload, *args), or None.
+    """
+    if hook is None:
+        return None
+    if is_async_callable(hook):
+        return lambda offload, *args: hook(*args)
+    return lambda offload, *args: offload(hook, *args)
+
+def _async_layer(inner: callable, process_request: callable, process_response: callable, process_exception: callable) -> callable:
+    """
+    Builds one middleware layer around the rest of a coroutine chain.
+
+    Args:
+        inner (callable): The rest of the chain, taking (request, params, offload).
+        process_request (callable): The adapted request hook, or None.
+        process_response (callable): The adapted response hook, or None.
+        process_exception (callable): The adapted exception hook, or None.
+
+    Returns:
+        callable: A coroutine function taking (request, params, offload) and returning the response.
+    """
+    async def layer(request, params, offload):
+        response = await process_request(offload, request) if process_request is not None else None
+        if response is None:
+            try:
+                response = await inner(request, params, offload)
+            except Exception as exception:
+                if process_exception is None:
+                    raise
+                response = await process_exception(offload, request, exception)
+                if response is None:
+                    raise
+        if process_response is not None:
+            response = await process_response(offload, request, response)
+        return response
+    return layer
+
+def serialize_response(response, request=None) -> tuple:
+    """
+    Converts a response object into WSGI status, headers and body.
+
+    Generators, async generators and other iterators returned by a handler are
+    streamed as a StreamingResponse. Responses supporting byte ranges are restricted to the
+    ranges in the request's Range header. The status line is looked up in the precomputed
+    STATUS_LINES, and bodies held in memory get a Content-Length header.
+
+    Args:
+        response (BaseResponse): The response returned by a handler.
+        request (Request, optional): The request being answered.
+
+    Returns:
+        tuple: A (status, headers, body) tuple where body is an iterable of bytes.
+    """
+    response = as_response(response)
+
+    if response.accepts_ranges and request is not None:
+        range_header = request.environ.get("HTTP_RANGE")
+        if range_header:
+            response.apply_range(range_header, request.environ.get("HTTP_IF_RANGE"))
+
+    status = status_line(response.status_code)
+    body = response.iter_content()
+    length = None
+    if body.__class__ is list and status[:3] not in NO_BODY_STATUSES and status[0] != "1":
+        length = sum(map(len, body))
+    return status, response.header_list(length), body
+
+class Dispatcher:
+    """
+    Precompiled request pipeline for a single route or error handler.
+
+    The handler signature is inspected once, and the middleware is composed into nested
+    layers around the handler when the pipeline is built, so dispatching a request is a
+    straight sequence of calls. Middleware hooks a class does not override are left
+    out of the chain.
+
+    Handlers and middleware may be 'async def'. A pipeline made only of synchronous
+    steps runs in a single call, on a worker thread under ASGI. A pipeline with async
+    steps awaits them on the event loop and hands each synchronous step to the thread
+    pool; called from WSGI, it runs to completion on a private event loop.
+
+    Attributes:
+        call (callable): Function invoking the handler with the arguments it accepts.
+        middleware (tuple): (process_request, process_response, process_exception) hooks of each layer.
+        serialize (callable): Function taking (response, request) and returning status, headers and body.
+        handler_is_async (bool): Whether the handler is a coroutine function.
+        is_async (bool): Whether the handler or any middleware hook is a coroutine function.
+        chain (callable): The composed chain, taking (request, params), or taking (request, params, offload) if async.
+
+    Methods:
+        __call__(request, params):
+            Runs the pipeline for a request.
+
+        run_async(request, params, executor=None):
+            Runs the pipeline for a request from an event loop.
+    """
+
+    __slots__ = ("call", "middleware", "serialize", "handler_is_async", "is_async", "chain")
+
+    def __init__(self, call: callable, middleware: list = (), serialize: callable = serialize_response, is_async: bool = False, request_hooks_only: bool = False) -> None:
+        """
+        Initializes a Dispatcher for a handler.
+
+        Args:
+            call (callable): Function invoking the handler, as returned by compile_call.
+            middleware (list, optional): Middleware instances, the first registered outermost.
+            serialize (callable, optional): Function converting the response into status, headers and body.
+            is_async (bool, optional): Whether the handler is a coroutine function.
+            request_hooks_only (bool, optional): Whether to run only 'process_request', for handlers without a response.
+        """
+        layers = []
+        for item in middleware:
+            hooks = middleware_hooks(item)
+            if request_hooks_only:
+                hooks = (hooks[0], None, None)
+            if any(hooks):
+                layers.append(hooks)
+
+        self.call = call
+        self.middleware = tuple(layers)
+        self.serialize = serialize
+        self.handler_is_async = is_async
+        self.is_async = is_async or any(is_async_callable(hook) for hooks in layers for hook in hooks if hook is not None)
+        if self.is_async:
+            self.chain = compose_async(call, is_async, layers)
+        else:
+            self.chain = compose(call, layers)
+
+    def __call__(self, request, params: dict) -> tuple:
+        """
+        Runs the pipeline for a request.
+
+        Args:
+            request (Request): The current request.
+            params (dict): The converted path parameters.
+
+        Returns:
+            tuple: A (status, headers, body) tuple.
+        """
+        if self.is_async:
+            return self.serialize(asyncio.run(self.chain(request, params, run_inline)), request)
+        return self.serialize(self.chain(request, params), request)
+
+    async def run_async(self, request, params: dict, executor=None) -> tuple:
+        """
+        Runs the pipeline for a request from an event loop.
+
+        Args:
+            request (Request): The current request.
+            params (dict): The converted path parameters.
+            executor (Executor, optional): The thread pool running synchronous steps. Defaults to the loop's default executor.
+
+        Returns:
+            tuple: A (status, headers, body) tuple.
+        """
+        loop = asyncio.get_running_loop()
+        if not self.is_async:
+            return await run_in_executor(loop, executor, self.__call__, request, params)
+
+        def offload(func, *args):
+            return run_in_executor(loop, executor, func, *args)
+        return self.serialize(await self.chain(request, params, offload), request)
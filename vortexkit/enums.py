@@ -1,4 +1,5 @@
 from enum import Enum
+from http import HTTPStatus
 
 class StatusCode(Enum):
     """
@@ -6,10 +7,16 @@ class StatusCode(Enum):
 
     Attributes:
         OK (str): 200 OK - The request has succeeded.
+        NO_CONTENT (str): 204 No Content - The request has succeeded and there is no content to send.
+        PARTIAL_CONTENT (str): 206 Partial Content - The response contains only the requested ranges of the resource.
+        NOT_MODIFIED (str): 304 Not Modified - The cached copy held by the client is still valid.
         BAD_REQUEST (str): 400 Bad Request - The server could not understand the request due to invalid syntax.
         UNAUTHORIZED (str): 401 Unauthorized - The request requires user authentication.
         FORBIDDEN (str): 403 Forbidden - The server understood the request, but refuses to authorize it.
         NOT_FOUND (str): 404 Not Found - The requested resource could not be found on the server.
+        METHOD_NOT_ALLOWED (str): 405 Method Not Allowed - The request method is not supported by the target resource.
+        PAYLOAD_TOO_LARGE (str): 413 Payload Too Large - The request body is larger than the server is willing to process.
+        RANGE_NOT_SATISFIABLE (str): 416 Range Not Satisfiable - None of the requested ranges overlap the resource.
         INTERNAL_SERVER_ERROR (str): 500 Internal Server Error - A generic error message, typically for unexpected conditions.
         NOT_IMPLEMENTED (str): 501 Not Implemented - The server does not support the functionality required to fulfill the request.
         BAD_GATEWAY (str): 502 Bad Gateway - The server received an invalid response from an inbound server.
@@ -30,10 +37,16 @@ class StatusCode(Enum):
     """
 
     OK = "200 OK"
+    NO_CONTENT = "204 No Content"
+    PARTIAL_CONTENT = "206 Partial Content"
+    NOT_MODIFIED = "304 Not Modified"
     BAD_REQUEST = "400 Bad Request"
     UNAUTHORIZED = "401 Unauthorized"
     FORBIDDEN = "403 Forbidden"
     NOT_FOUND = "404 Not Found"
+    METHOD_NOT_ALLOWED = "405 Method Not Allowed"
+    PAYLOAD_TOO_LARGE = "413 Payload Too Large"
+    RANGE_NOT_SATISFIABLE = "416 Range Not Satisfiable"
     INTERNAL_SERVER_ERROR = "500 Internal Server Error"
     NOT_IMPLEMENTED = "501 Not Implemented"
     BAD_GATEWAY = "502 Bad Gateway"
@@ -48,3 +61,23 @@ class StatusCode(Enum):
     A_TIMEOUT_OCCURRED = "524 A Timeout Occurred"
     SSL_HANDSHAKE_FAILED = "525 SSL Handshake Failed"
     INVALID_SSL_CERTIFICATE = "526 Invalid SSL Certificate"
+
+STATUS_LINES = {status.value: f"{status.value} {status.phrase}" for status in HTTPStatus}
+STATUS_LINES.update((status, status.value) for status in StatusCode)
+
+def status_line(status: str | int | StatusCode) -> str:
+    """
+    Returns the WSGI status line of a status, looked up in STATUS_LINES when possible.
+
+    Args:
+        status (str | int | StatusCode): A status line such as '200 OK', a status code or a StatusCode.
+
+    Returns:
+        str: The status line, such as '200 OK'.
+    """
+    line = STATUS_LINES.get(status)
+    if line is not None:
+        return line
+    if isinstance(status, int):
+        return f"{status} Unknown"
+    return status
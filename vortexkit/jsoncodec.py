@@ -0,0 +1,262 @@
+import dataclasses
+import datetime
+import decimal
+import enum
+import json
+import math
+import uuid
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class JSONBackend:
+    """
+    Base class for the JSON codecs used by JSONResponse, request bodies and WebSocket messages.
+
+    Besides the types JSON supports natively, backends encode dataclasses from their
+    fields, enums as their value, dates and times in ISO 8601, UUIDs and decimals as
+    strings, sets as lists and any other object defining '__json__' as what that method
+    returns. The converter for each class is resolved once and cached. NaN and infinite
+    floats are encoded as null, and circular structures raise ValueError.
+
+    The built-in backends decode to the same values and encode the same documents, but
+    not always byte for byte: orjson writes some floats in a shorter form, such as
+    '1e16' where the standard library writes '1e+16'.
+
+    Attributes:
+        name (str): The name of the backend.
+
+    Methods:
+        dumps(value):
+            Encodes a value as compact UTF-8 JSON bytes.
+
+        loads(data):
+            Decodes JSON from bytes or str.
+    """
+
+    name = None
+
+    def dumps(self, value: any) -> bytes:
+        """
+        Encodes a value as compact UTF-8 JSON bytes.
+
+        Args:
+            value (any): The value to encode.
+
+        Returns:
+            bytes: The encoded JSON.
+
+        Raises:
+            TypeError: If the value contains an object that cannot be encoded.
+        """
+        raise NotImplementedError
+
+    def loads(self, data: bytes | str) -> any:
+        """
+        Decodes JSON from bytes or str.
+
+        Args:
+            data (bytes | str): The JSON document.
+
+        Returns:
+            any: The decoded value.
+
+        Raises:
+            ValueError: If the document is not valid JSON.
+        """
+        raise NotImplementedError
+
+class StdlibBackend(JSONBackend):
+    """
+    JSON backend built on the standard library's json module.
+
+    A single compact encoder is reused for every call and its output is encoded to bytes
+    once. Values holding NaN or infinite floats, which the encoder refuses, are encoded
+    again with those floats replaced by null. Bytes are decoded directly by json.loads,
+    which detects their encoding.
+    """
+
+    name = "stdlib"
+
+    def __init__(self) -> None:
+        """
+        Initializes a StdlibBackend.
+        """
+        self._encode = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=convert).encode
+        self.loads = json.loads
+
+    def dumps(self, value: any) -> bytes:
+        try:
+            return self._encode(value).encode("utf-8")
+        except ValueError:
+            return self._encode(finite(value)).encode("utf-8")
+
+class OrjsonBackend(JSONBackend):
+    """
+    JSON backend built on orjson, which encodes dataclasses, enums, datetimes and UUIDs natively.
+
+    Values orjson refuses, such as integers beyond 64 bits or circular structures, are
+    encoded by the standard library backend instead, which encodes the integers and
+    raises ValueError for the structures.
+
+    Raises:
+        ValueError: If orjson is not installed.
+    """
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        """
+        Initializes an OrjsonBackend.
+
+        Raises:
+            ValueError: If orjson is not installed.
+        """
+        if orjson is None:
+            raise ValueError("The 'orjson' JSON backend requires the orjson package")
+        self.loads = orjson.loads
+        self._fallback = StdlibBackend()
+
+    def dumps(self, value: any) -> bytes:
+        try:
+            return orjson.dumps(value, default=convert, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            return self._fallback.dumps(value)
+
+_converters = {}
+
+def convert(value: any) -> any:
+    """
+    Converts an object JSON does not support into one it does, with a converter cached per class.
+
+    Used as the 'default' hook of the backends.
+
+    Args:
+        value (any): The object.
+
+    Returns:
+        any: A JSON-compatible replacement for the object.
+
+    Raises:
+        TypeError: If there is no conversion for the object's class.
+    """
+    cls = value.__class__
+    converter = _converters.get(cls)
+    if converter is None:
+        converter = _converters[cls] = _converter_for(cls)
+    return converter(value)
+
+def _converter_for(cls: type) -> callable:
+    """
+    Chooses how instances of a class are converted.
+
+    Args:
+        cls (type): The class.
+
+    Returns:
+        callable: A function converting an instance.
+
+    Raises:
+        TypeError: If there is no conversion for the class.
+    """
+    if dataclasses.is_dataclass(cls):
+        names = tuple(field.name for field in dataclasses.fields(cls))
+        return lambda value: {name: getattr(value, name) for name in names}
+    if issubclass(cls, enum.Enum):
+        return lambda value: value.value
+    if issubclass(cls, (datetime.date, datetime.time)):
+        return cls.isoformat
+    if issubclass(cls, (uuid.UUID, decimal.Decimal)):
+        return str
+    if issubclass(cls, (set, frozenset)):
+        return list
+    if hasattr(cls, "__json__"):
+        return lambda value: value.__json__()
+    raise TypeError(f"Object of type {cls.__name__} is not JSON serializable")
+
+def finite(value: any, active: set = None) -> any:
+    """
+    Copies a value with its NaN and infinite floats replaced by None.
+
+    Objects JSON does not support are converted first, so floats they hold are replaced too.
+
+    Args:
+        value (any): The value to encode.
+        active (set, optional): Identifiers of the containers being copied, to detect cycles.
+
+    Returns:
+        any: A JSON-compatible copy of the value.
+
+    Raises:
+        ValueError: If the value contains a circular reference.
+        TypeError: If the value contains an object that cannot be encoded.
+    """
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if value is None or isinstance(value, (str, int)):
+        return value
+    if active is None:
+        active = set()
+    marker = id(value)
+    if marker in active:
+        raise ValueError("Circular reference detected")
+    active.add(marker)
+    if isinstance(value, dict):
+        copy = {key: finite(item, active) for key, item in value.items()}
+    elif isinstance(value, (list, tuple)):
+        copy = [finite(item, active) for item in value]
+    else:
+        copy = finite(convert(value), active)
+    active.discard(marker)
+    return copy
+
+BACKENDS = {"stdlib": StdlibBackend, "orjson": OrjsonBackend}
+
+backend = OrjsonBackend() if orjson is not None else StdlibBackend()
+
+def set_json_backend(new_backend: str | JSONBackend) -> JSONBackend:
+    """
+    Replaces the JSON backend used across the framework.
+
+    Args:
+        new_backend (str | JSONBackend): 'orjson', 'stdlib', or an object with 'dumps' returning bytes and 'loads'.
+
+    Returns:
+        JSONBackend: The backend now in use.
+
+    Raises:
+        ValueError: If the backend name is unknown or its package is not installed.
+    """
+    global backend
+    if isinstance(new_backend, str):
+        if new_backend not in BACKENDS:
+            raise ValueError(f"Unknown JSON backend '{new_backend}', expected one of {', '.join(BACKENDS)}")
+        new_backend = BACKENDS[new_backend]()
+    backend = new_backend
+    return backend
+
+def dumps(value: any) -> bytes:
+    """
+    Encodes a value as compact UTF-8 JSON bytes with the current backend.
+
+    Args:
+        value (any): The value to encode.
+
+    Returns:
+        bytes: The encoded JSON.
+    """
+    return backend.dumps(value)
+
+def loads(data: bytes | str) -> any:
+    """
+    Decodes JSON from bytes or str with the current backend.
+
+    Args:
+        data (bytes | str): The JSON document.
+
+    Returns:
+        any: The decoded value.
+    """
+    return backend.loads(data)
@@ -0,0 +1,380 @@
+import atexit
+import json
+import os
+import threading
+import weakref
+from bisect import bisect_left
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Layout of a route's accumulator row: requests started, requests finished, total
+# seconds, one counter per status class, then one counter per histogram bucket and +Inf.
+STARTED = 0
+FINISHED = 1
+SECONDS = 2
+STATUS = 3
+BUCKETS = STATUS + len(STATUS_CLASSES)
+
+_instances = weakref.WeakSet()
+
+class Metrics:
+    """
+    Per-route request counters, in-flight gauges and latency histograms.
+
+    Each thread records into its own accumulators, so recording never takes a lock;
+    the accumulators of every thread are only read and summed when the metrics are
+    collected. Routes are labelled by their path template, so '/users/<int:id>' is a
+    single series however many users are requested. Calls to error handlers are counted
+    by status code.
+
+    With 'multiprocess_dir', each process also writes its totals to a file in that
+    directory every 'sync_interval' seconds and when it exits, and collecting merges the
+    files of every process, so a scrape answered by any pre-forked worker covers them all.
+
+    Attributes:
+        buckets (tuple): Upper bounds in seconds of the latency histogram buckets.
+        multiprocess_dir (str): Directory shared by the worker processes, or None.
+        sync_interval (float): Seconds between writes of this process's totals to the directory.
+
+    Methods:
+        start(route):
+            Records the start of a request and returns its route's accumulator.
+
+        finish(row, status, duration):
+            Records the end of a request.
+
+        count_error(status_code, call):
+            Wraps an error handler call so each invocation is counted.
+
+        collect():
+            Returns the merged totals of every thread, and every process in multiprocess mode.
+
+        render():
+            Returns the metrics in the Prometheus text exposition format.
+
+        clear_directory():
+            Removes the files left in the multiprocess directory by earlier runs.
+
+        close():
+            Writes this process's final totals to the multiprocess directory.
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS, multiprocess_dir: str = None, sync_interval: float = 1.0) -> None:
+        """
+        Initializes empty Metrics.
+
+        Args:
+            buckets (tuple, optional): Upper bounds in seconds of the latency histogram buckets.
+            multiprocess_dir (str, optional): Directory shared by the worker processes. Defaults to single-process mode.
+            sync_interval (float, optional): Seconds between writes to the directory. Defaults to 1 second.
+
+        Raises:
+            ValueError: If the buckets are empty or not in increasing order.
+        """
+        buckets = tuple(float(bound) for bound in buckets)
+        if not buckets or list(buckets) != sorted(set(buckets)):
+            raise ValueError("Histogram buckets must be a non-empty increasing sequence")
+        if multiprocess_dir is not None:
+            os.makedirs(multiprocess_dir, exist_ok=True)
+        self.buckets = buckets
+        self.multiprocess_dir = multiprocess_dir
+        self.sync_interval = sync_interval
+        self._row_size = BUCKETS + len(buckets) + 1
+        self._local = threading.local()
+        self._threads = []
+        self._retired = ({}, {})
+        self._lock = threading.Lock()
+        self._syncer = None
+        self._closing = threading.Event()
+        _instances.add(self)
+
+    def _accumulators(self) -> tuple:
+        """
+        Returns the calling thread's accumulators, creating them on its first request.
+
+        Returns:
+            tuple: The dictionaries mapping route templates to rows and error status codes to counts.
+        """
+        try:
+            return self._local.accumulators
+        except AttributeError:
+            accumulators = self._local.accumulators = ({}, {})
+            with self._lock:
+                self._threads.append((threading.current_thread(), accumulators))
+            if self.multiprocess_dir is not None and self._syncer is None:
+                self._start_syncer()
+            return accumulators
+
+    def start(self, route: str) -> list:
+        """
+        Records the start of a request.
+
+        Args:
+            route (str): The path template of the matched route, or '' if none matched.
+
+        Returns:
+            list: The route's accumulator row in the calling thread, to pass to 'finish'.
+        """
+        routes = self._accumulators()[0]
+        row = routes.get(route)
+        if row is None:
+            row = routes[route] = [0] * self._row_size
+            row[SECONDS] = 0.0
+        row[STARTED] += 1
+        return row
+
+    def finish(self, row: list, status: int, duration: float) -> None:
+        """
+        Records the end of a request, on the thread that started it.
+
+        Args:
+            row (list): The row returned by 'start'.
+            status (int): The response status code.
+            duration (float): Seconds spent serving the request.
+        """
+        row[FINISHED] += 1
+        row[SECONDS] += duration
+        row[STATUS + min(max(status // 100, 1), 5) - 1] += 1
+        row[BUCKETS + bisect_left(self.buckets, duration)] += 1
+
+    def count_error(self, status_code: str, call: callable) -> callable:
+        """
+        Wraps an error handler call so each invocation is counted.
+
+        Args:
+            status_code (str): The status code the handler answers, such as '404'.
+            call (callable): Function invoking the error handler.
+
+        Returns:
+            callable: A function with the same arguments counting then invoking the handler.
+        """
+        def counted(*args):
+            errors = self._accumulators()[1]
+            errors[status_code] = errors.get(status_code, 0) + 1
+            return call(*args)
+        return counted
+
+    def _snapshot(self) -> dict:
+        """
+        Sums the accumulators of every thread of this process.
+
+        Accumulators of threads that have exited are folded into a retired total.
+
+        Returns:
+            dict: A dictionary with 'routes', mapping templates to rows, and 'errors', mapping status codes to counts.
+        """
+        routes = {}
+        errors = {}
+        with self._lock:
+            alive = []
+            for thread, accumulators in self._threads:
+                if thread.is_alive():
+                    alive.append((thread, accumulators))
+                else:
+                    _merge(self._retired, accumulators)
+            self._threads = alive
+            sources = [self._retired] + [accumulators for _, accumulators in alive]
+        _merge((routes, errors), *sources)
+        return {"routes": routes, "errors": errors}
+
+    def collect(self) -> dict:
+        """
+        Returns the merged totals of every thread, and of every process in multiprocess mode.
+
+        Returns:
+            dict: A dictionary with 'routes', mapping templates to rows, and 'errors', mapping status codes to counts.
+        """
+        snapshot = self._snapshot()
+        if self.multiprocess_dir is None:
+            return snapshot
+
+        self._write(snapshot)
+        routes = {}
+        errors = {}
+        for name in os.listdir(self.multiprocess_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.multiprocess_dir, name), encoding="utf-8") as file:
+                    data = json.load(file)
+            except (OSError, ValueError):
+                continue
+            if not _is_running(int(name[:-5])):
+                for row in data["routes"].values():
+                    row[STARTED] = row[FINISHED]
+            _merge((routes, errors), (data["routes"], data["errors"]))
+        return {"routes": routes, "errors": errors}
+
+    def render(self) -> str:
+        """
+        Returns the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition text.
+        """
+        data = self.collect()
+        routes = sorted(data["routes"].items())
+        lines = [
+            "# HELP vortexkit_requests_total Requests served, by route template and status class.",
+            "# TYPE vortexkit_requests_total counter",
+        ]
+        for route, row in routes:
+            label = _escape(route)
+            for index, status_class in enumerate(STATUS_CLASSES):
+                if row[STATUS + index]:
+                    lines.append(f'vortexkit_requests_total{{route="{label}",status="{status_class}"}} {row[STATUS + index]}')
+
+        lines.append("# HELP vortexkit_requests_in_flight Requests being served, by route template.")
+        lines.append("# TYPE vortexkit_requests_in_flight gauge")
+        for route, row in routes:
+            lines.append(f'vortexkit_requests_in_flight{{route="{_escape(route)}"}} {row[STARTED] - row[FINISHED]}')
+
+        lines.append("# HELP vortexkit_request_duration_seconds Time spent serving requests, by route template.")
+        lines.append("# TYPE vortexkit_request_duration_seconds histogram")
+        for route, row in routes:
+            label = _escape(route)
+            cumulative = 0
+            for index, bound in enumerate(self.buckets):
+                cumulative += row[BUCKETS + index]
+                lines.append(f'vortexkit_request_duration_seconds_bucket{{route="{label}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'vortexkit_request_duration_seconds_bucket{{route="{label}",le="+Inf"}} {row[FINISHED]}')
+            lines.append(f'vortexkit_request_duration_seconds_sum{{route="{label}"}} {row[SECONDS]:.6f}')
+            lines.append(f'vortexkit_request_duration_seconds_count{{route="{label}"}} {row[FINISHED]}')
+
+        lines.append("# HELP vortexkit_error_handler_calls_total Calls to registered error handlers, by status code.")
+        lines.append("# TYPE vortexkit_error_handler_calls_total counter")
+        for status_code, count in sorted(data["errors"].items()):
+            lines.append(f'vortexkit_error_handler_calls_total{{status="{_escape(status_code)}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def _start_syncer(self) -> None:
+        """
+        Starts the thread writing this process's totals to the multiprocess directory.
+        """
+        with self._lock:
+            if self._syncer is not None:
+                return
+            self._syncer = threading.Thread(target=self._sync, name="vortexkit-metrics", daemon=True)
+            self._syncer.start()
+
+    def _sync(self) -> None:
+        """
+        Writes this process's totals every 'sync_interval' seconds until closed.
+        """
+        while not self._closing.wait(self.sync_interval):
+            self._write(self._snapshot())
+
+    def _write(self, snapshot: dict) -> None:
+        """
+        Atomically replaces this process's file in the multiprocess directory.
+
+        Args:
+            snapshot (dict): The totals of this process.
+        """
+        path = os.path.join(self.multiprocess_dir, f"{os.getpid()}.json")
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(snapshot, file)
+        os.replace(temporary, path)
+
+    def clear_directory(self) -> None:
+        """
+        Removes the files left in the multiprocess directory by earlier runs.
+
+        Called by the process supervising the workers before they start.
+        """
+        if self.multiprocess_dir is None:
+            return
+        for name in os.listdir(self.multiprocess_dir):
+            if name.endswith((".json", ".tmp")):
+                os.remove(os.path.join(self.multiprocess_dir, name))
+
+    def close(self) -> None:
+        """
+        Stops the writer thread and writes this process's final totals to the multiprocess directory.
+        """
+        self._closing.set()
+        if self.multiprocess_dir is not None and self._syncer is not None:
+            self._write(self._snapshot())
+
+    def _after_fork(self) -> None:
+        """
+        Resets the metrics in a forked child, which starts from zero with its own writer thread.
+        """
+        self._local = threading.local()
+        self._threads = []
+        self._retired = ({}, {})
+        self._lock = threading.Lock()
+        self._syncer = None
+        self._closing = threading.Event()
+
+def _merge(target: tuple, *sources: tuple) -> None:
+    """
+    Adds the route rows and error counts of the sources to the target.
+
+    Args:
+        target (tuple): The (routes, errors) dictionaries receiving the sums.
+        *sources (tuple): The (routes, errors) dictionaries to add.
+    """
+    routes, errors = target
+    for source_routes, source_errors in sources:
+        for route, row in list(source_routes.items()):
+            total = routes.get(route)
+            if total is None:
+                routes[route] = list(row)
+            else:
+                for index, value in enumerate(row):
+                    total[index] += value
+        for status_code, count in list(source_errors.items()):
+            errors[status_code] = errors.get(status_code, 0) + count
+
+def _escape(value: str) -> str:
+    """
+    Escapes a Prometheus label value.
+
+    Args:
+        value (str): The label value.
+
+    Returns:
+        str: The value with backslashes, quotes and newlines escaped.
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _is_running(pid: int) -> bool:
+    """
+    Checks whether a process is still running.
+
+    Args:
+        pid (int): The process id.
+
+    Returns:
+        bool: True if the process exists.
+    """
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def close_all() -> None:
+    """
+    Writes the final totals of every Metrics instance in multiprocess mode.
+
+    Called at interpreter exit, and by worker processes before they exit.
+    """
+    for metrics in list(_instances):
+        metrics.close()
+
+def _after_fork_in_child() -> None:
+    for metrics in list(_instances):
+        metrics._after_fork()
+
+atexit.register(close_all)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
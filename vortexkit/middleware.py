@@ -1,20 +1,84 @@
+HOOKS = ("process_request", "process_response", "process_exception")
+
 class Middleware:
     """
-    Base class for middleware components that process requests before route handling.
+    Base class for middleware components wrapping the route handlers.
+
+    Registered middleware is composed into layers around each handler, the first
+    registered being the outermost: requests pass through every 'process_request' on the
+    way in and responses through every 'process_response' on the way out, in reverse
+    order. Subclasses override only the hooks they need, and any hook may be 'async def'.
 
     Methods:
         process_request(request):
-            Process the request data before the route handler is called.
+            Process the request before the route handler is called.
 
-            Args:
-                request: The request object.
+        process_response(request, response):
+            Process the response on its way back to the client.
+
+        process_exception(request, exception):
+            Handle an exception raised by the handler or an inner middleware.
     """
 
     def process_request(self, request):
         """
-        Process the request data before the route handler is called.
+        Process the request before the route handler is called.
+
+        Returning a response short-circuits the chain: the handler and the inner
+        middleware are skipped, and the response goes back through 'process_response'
+        of this middleware and the outer ones.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            BaseResponse: A response to send instead of calling the handler, or None to continue.
+        """
+        pass
+
+    def process_response(self, request, response):
+        """
+        Process the response on its way back to the client.
+
+        Args:
+            request: The request object.
+            response (BaseResponse): The response from the handler or an inner middleware.
+
+        Returns:
+            BaseResponse: The response to pass on, either the given one or a replacement.
+        """
+        return response
+
+    def process_exception(self, request, exception: Exception):
+        """
+        Handle an exception raised by the handler or an inner middleware.
 
         Args:
             request: The request object.
+            exception (Exception): The exception raised.
+
+        Returns:
+            BaseResponse: A response to send instead, or None to let the exception propagate.
         """
         pass
+
+def middleware_hooks(middleware: any) -> tuple:
+    """
+    Returns the hooks a middleware actually implements.
+
+    Hooks inherited unchanged from Middleware are reported as None, so the composed
+    chain does not pay for calls that cannot change the outcome.
+
+    Args:
+        middleware (any): The middleware instance.
+
+    Returns:
+        tuple: The bound (process_request, process_response, process_exception) methods, each possibly None.
+    """
+    hooks = []
+    for name in HOOKS:
+        hook = getattr(middleware, name, None)
+        if hook is not None and getattr(type(middleware), name, None) is getattr(Middleware, name):
+            hook = None
+        hooks.append(hook)
+    return tuple(hooks)
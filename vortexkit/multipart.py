@@ -0,0 +1,299 @@
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+
+DEFAULT_SPOOL_SIZE = 1024 * 1024
+MAX_HEADER_SIZE = 16 * 1024
+
+class MultipartError(ValueError):
+    """
+    Raised when a multipart/form-data body is malformed.
+    """
+
+class UploadFile:
+    """
+    Represents a file uploaded as part of a multipart/form-data request.
+
+    The content is held in memory up to the spool threshold and written to a temporary
+    file beyond it, so large uploads never have to fit in memory.
+
+    Attributes:
+        name (str): The name of the form field.
+        filename (str): The filename supplied by the client.
+        content_type (str): The content type supplied by the client.
+        headers (dict): The headers of the part, keyed by lower-case name.
+        file (SpooledTemporaryFile): The file-like object holding the content.
+
+    Methods:
+        read(size=-1):
+            Reads from the uploaded file.
+
+        seek(offset, whence=0):
+            Moves the position within the uploaded file.
+
+        close():
+            Closes the uploaded file, removing any temporary file.
+    """
+
+    def __init__(self, name: str, filename: str, content_type: str, headers: dict, spool_size: int) -> None:
+        """
+        Initializes an empty UploadFile.
+
+        Args:
+            name (str): The name of the form field.
+            filename (str): The filename supplied by the client.
+            content_type (str): The content type supplied by the client.
+            headers (dict): The headers of the part, keyed by lower-case name.
+            spool_size (int): Size in bytes above which the content is written to disk.
+        """
+        self.name = name
+        self.filename = filename
+        self.content_type = content_type
+        self.headers = headers
+        self.file = SpooledTemporaryFile(max_size=spool_size)
+
+    @property
+    def value(self) -> bytes:
+        """
+        The full content of the file. Reads the whole upload into memory.
+        """
+        position = self.file.tell()
+        self.file.seek(0)
+        try:
+            return self.file.read()
+        finally:
+            self.file.seek(position)
+
+    def write(self, data: bytes) -> None:
+        """
+        Appends data to the uploaded file.
+
+        Args:
+            data (bytes): The data to append.
+        """
+        self.file.write(data)
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Reads from the uploaded file.
+
+        Args:
+            size (int, optional): The maximum number of bytes to read. Defaults to everything.
+
+        Returns:
+            bytes: The data read.
+        """
+        return self.file.read(size)
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        """
+        Moves the position within the uploaded file.
+
+        Args:
+            offset (int): The offset to move to.
+            whence (int, optional): The reference point for the offset. Defaults to the start.
+
+        Returns:
+            int: The new position.
+        """
+        return self.file.seek(offset, whence)
+
+    def close(self) -> None:
+        """
+        Closes the uploaded file, removing any temporary file.
+        """
+        self.file.close()
+
+    def __repr__(self):
+        return f"UploadFile(name={self.name!r}, filename={self.filename!r}, content_type={self.content_type!r})"
+
+def parse_options_header(value: str) -> tuple:
+    """
+    Splits a header such as 'form-data; name="file"' into its value and options.
+
+    Args:
+        value (str): The raw header value.
+
+    Returns:
+        tuple: The main value and a dictionary of options keyed by lower-case name.
+    """
+    value, _, rest = value.partition(";")
+    options = {}
+    while rest:
+        key, _, rest = rest.partition("=")
+        key = key.strip().lower()
+        rest = rest.lstrip()
+        if rest.startswith('"'):
+            end = 1
+            chars = []
+            while end < len(rest) and rest[end] != '"':
+                if rest[end] == "\\" and end + 1 < len(rest):
+                    end += 1
+                chars.append(rest[end])
+                end += 1
+            option = "".join(chars)
+            rest = rest[end + 1:].partition(";")[2]
+        else:
+            option, _, rest = rest.partition(";")
+            option = option.strip()
+        if key:
+            options[key] = option
+    return value.strip().lower(), options
+
+class MultipartParser:
+    """
+    Incremental multipart/form-data parser.
+
+    The body is consumed chunk by chunk and each part is written out as soon as it is
+    known not to contain the boundary, so memory use is bounded by the chunk size and
+    spool threshold rather than the size of the upload.
+
+    Attributes:
+        chunks (any): Iterable yielding the body as bytes chunks.
+        boundary (bytes): The multipart boundary.
+        spool_size (int): Size in bytes above which uploaded files are written to disk.
+
+    Methods:
+        parse():
+            Reads the whole body and returns the parsed fields.
+    """
+
+    def __init__(self, chunks: any, boundary: str, spool_size: int = DEFAULT_SPOOL_SIZE) -> None:
+        """
+        Initializes a MultipartParser.
+
+        Args:
+            chunks (any): Iterable yielding the body as bytes chunks.
+            boundary (str): The multipart boundary from the Content-Type header.
+            spool_size (int, optional): Size in bytes above which uploaded files are written to disk.
+
+        Raises:
+            MultipartError: If the boundary is missing.
+        """
+        if not boundary:
+            raise MultipartError("Missing multipart boundary")
+        self.chunks = chunks
+        self.boundary = boundary.encode("latin-1")
+        self.spool_size = spool_size
+
+    def _parse_headers(self, raw: bytes) -> dict:
+        """
+        Parses the header block of a part.
+
+        Args:
+            raw (bytes): The header block without the terminating blank line.
+
+        Returns:
+            dict: The headers keyed by lower-case name.
+        """
+        headers = {}
+        for line in raw.decode("utf-8", "replace").split("\r\n"):
+            if not line:
+                continue
+            key, separator, value = line.partition(":")
+            if not separator:
+                raise MultipartError("Malformed part header")
+            headers[key.strip().lower()] = value.strip()
+        return headers
+
+    def _open_part(self, headers: dict):
+        """
+        Creates the sink a part's content is written into.
+
+        Args:
+            headers (dict): The headers of the part.
+
+        Returns:
+            tuple: The field name and either an UploadFile or a BytesIO.
+        """
+        disposition, options = parse_options_header(headers.get("content-disposition", ""))
+        if disposition != "form-data" or "name" not in options:
+            raise MultipartError("Part is missing a form-data Content-Disposition")
+        if "filename" in options:
+            content_type = headers.get("content-type", "application/octet-stream")
+            return options["name"], UploadFile(options["name"], options["filename"], content_type, headers, self.spool_size)
+        return options["name"], BytesIO()
+
+    def parse(self) -> dict:
+        """
+        Reads the whole body and returns the parsed fields.
+
+        Repeated field names are collected into a list, matching the previous behaviour.
+
+        Returns:
+            dict: Dictionary mapping field names to strings or UploadFile objects.
+
+        Raises:
+            MultipartError: If the body is malformed.
+        """
+        delimiter = b"\r\n--" + self.boundary
+        fields = {}
+        buffer = bytearray(b"\r\n")
+        chunks = iter(self.chunks)
+        state = "preamble"
+        name = sink = None
+
+        def store(name, sink):
+            if isinstance(sink, UploadFile):
+                sink.seek(0)
+                value = sink
+            else:
+                value = sink.getvalue().decode("utf-8", "replace")
+            if name in fields:
+                if not isinstance(fields[name], list):
+                    fields[name] = [fields[name]]
+                fields[name].append(value)
+            else:
+                fields[name] = value
+
+        exhausted = False
+        while True:
+            if state == "preamble":
+                index = buffer.find(delimiter)
+                if index >= 0:
+                    del buffer[:index + len(delimiter)]
+                    state = "after_delimiter"
+                    continue
+                del buffer[:max(0, len(buffer) - len(delimiter))]
+            elif state == "after_delimiter":
+                if len(buffer) >= 2:
+                    if buffer[:2] == b"--":
+                        if name is not None:
+                            store(name, sink)
+                        return fields
+                    if buffer[:2] != b"\r\n":
+                        raise MultipartError("Malformed multipart delimiter")
+                    del buffer[:2]
+                    state = "headers"
+                    continue
+            elif state == "headers":
+                index = buffer.find(b"\r\n\r\n")
+                if index >= 0:
+                    headers = self._parse_headers(bytes(buffer[:index]))
+                    del buffer[:index + 4]
+                    name, sink = self._open_part(headers)
+                    state = "body"
+                    continue
+                if len(buffer) > MAX_HEADER_SIZE:
+                    raise MultipartError("Part headers too large")
+            elif state == "body":
+                index = buffer.find(delimiter)
+                if index >= 0:
+                    sink.write(buffer[:index])
+                    del buffer[:index + len(delimiter)]
+                    store(name, sink)
+                    name = sink = None
+                    state = "after_delimiter"
+                    continue
+                keep = len(delimiter) - 1
+                if len(buffer) > keep:
+                    flush = len(buffer) - keep
+                    sink.write(buffer[:flush])
+                    del buffer[:flush]
+
+            if exhausted:
+                raise MultipartError("Unexpected end of multipart body")
+            chunk = next(chunks, None)
+            if chunk is None:
+                exhausted = True
+            else:
+                buffer += chunk
@@ -1,3 +1,5 @@
+from .dispatch import compile_call, is_async_callable
+
 class Route:
     """
     Represents a route in the VortexKit object model.
@@ -5,18 +7,41 @@ class Route:
     Attributes:
         path (str): The path of the route.
         handler (callable): The callable object that handles requests to this route.
+        methods (list): The HTTP methods accepted by this route, or None for every method.
+        max_body_size (int): Maximum accepted body size in bytes for this route, or None to use the application default.
+        body_limit (int): The effective body size limit, resolved when the application is compiled.
+        cache (any): The response cache setting given for this route, or None to use the cache's default.
+        cache_rule (CacheRule): The effective cache rule, resolved when the application is compiled, or None if responses are not cached.
+        call (callable): Function invoking the handler with the arguments its signature accepts.
+        is_async (bool): Whether the handler is a coroutine function, awaited on the event loop.
+        dispatch (Dispatcher): The compiled request pipeline, set when the application is compiled.
     """
 
-    def __init__(self, path: str, handler: callable) -> None:
+    def __init__(self, path: str, handler: callable, methods: list = None, path_names: tuple = (), max_body_size: int = None, cache: any = None) -> None:
         """
         Initialize a Route object.
 
         Args:
             path (str): The path of the route.
             handler (callable): The callable object that handles requests to this route.
+            methods (list, optional): The HTTP methods accepted by this route. Defaults to every method.
+            path_names (tuple, optional): Names of the path parameters captured by the route.
+            max_body_size (int, optional): Maximum accepted body size in bytes. Defaults to the application limit.
+            cache (any, optional): True, a TTL in seconds, a CacheRule or False. Defaults to the cache's default.
+
+        Raises:
+            ValueError: If the handler cannot accept the route's path parameters.
         """
         self.path = path
         self.handler = handler
+        self.methods = [method.upper() for method in methods] if methods else None
+        self.max_body_size = max_body_size
+        self.body_limit = max_body_size
+        self.cache = cache
+        self.cache_rule = None
+        self.call = compile_call(handler, path_names)
+        self.is_async = is_async_callable(handler)
+        self.dispatch = None
     
     def __call__(self, *args, **kwargs):
         """
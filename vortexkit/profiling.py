@@ -0,0 +1,325 @@
+import cProfile
+import hmac
+import io
+import itertools
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+class Profiler:
+    """
+    Profiles a sample of live requests and aggregates the results per route template.
+
+    A request is profiled when it is the 'every'-th one, or when it carries 'header'
+    with the value 'secret'. Only the dispatch is profiled: middleware, the handler and
+    response serialization, but not routing or sending the body. One request is
+    profiled at a time per process; others arriving meanwhile run normally.
+
+    In 'cprofile' mode the dispatch runs under cProfile and the statistics of every
+    profiled request of a route are added up. In 'sampler' mode a background thread
+    records the stack of the thread serving the request every 'interval' seconds, and
+    the samples are kept as collapsed stacks, the input format of flame graph tools.
+    Async pipelines are profiled on the event loop thread, so their profiles also include
+    other tasks running at the same time.
+
+    Attributes:
+        every (int): Profile one request in this many, or 0 to only profile on request.
+        header (str): Name of the header requesting a profile.
+        secret (str): Value the header must carry, or None to disable on-demand profiling.
+        mode (str): 'cprofile' or 'sampler'.
+        interval (float): Seconds between stack samples in 'sampler' mode.
+        profiled (Counter): Number of profiled requests per route template.
+
+    Methods:
+        wants(environ):
+            Decides whether to profile a request.
+
+        requested(environ):
+            Checks whether a request carries the secret header.
+
+        run(route, func, *args):
+            Calls a function, profiling it if no other request is being profiled.
+
+        run_async(route, awaitable):
+            Awaits an awaitable, profiling it if no other request is being profiled.
+
+        report(route=None, sort='cumulative', limit=40):
+            Returns the aggregated profiles as text.
+
+        dump(directory):
+            Writes the aggregated profiles to files, one per route.
+
+        reset():
+            Discards the aggregated profiles.
+    """
+
+    def __init__(self, every: int = 0, header: str = "X-Profile", secret: str = None, mode: str = "cprofile", interval: float = 0.001) -> None:
+        """
+        Initializes a Profiler.
+
+        Args:
+            every (int, optional): Profile one request in this many. Defaults to only profiling on request.
+            header (str, optional): Name of the header requesting a profile. Defaults to 'X-Profile'.
+            secret (str, optional): Value the header must carry. Defaults to disabling on-demand profiling.
+            mode (str, optional): 'cprofile' or 'sampler'. Defaults to 'cprofile'.
+            interval (float, optional): Seconds between stack samples in 'sampler' mode. Defaults to 1 ms.
+
+        Raises:
+            ValueError: If the mode is unknown, or neither sampling nor a secret is configured.
+        """
+        if mode not in ("cprofile", "sampler"):
+            raise ValueError(f"Unknown profiler mode '{mode}', expected 'cprofile' or 'sampler'")
+        if not every and not secret:
+            raise ValueError("Profiler needs a sampling rate ('every') or a 'secret' header value")
+        self.every = every
+        self.header = header
+        self.secret = secret
+        self.mode = mode
+        self.interval = interval
+        self.profiled = Counter()
+        self._environ_key = "HTTP_" + header.upper().replace("-", "_")
+        self._counter = itertools.count(1)
+        self._busy = threading.Lock()
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._stacks = {}
+        self._target = None
+        self._wakeup = threading.Event()
+        self._sampler = None
+
+    def wants(self, environ: dict) -> bool:
+        """
+        Decides whether to profile a request.
+
+        Args:
+            environ (dict): The environment of the request.
+
+        Returns:
+            bool: True if the request is sampled or carries the secret header.
+        """
+        if self.requested(environ):
+            return True
+        return bool(self.every) and next(self._counter) % self.every == 0
+
+    def requested(self, environ: dict) -> bool:
+        """
+        Checks whether a request carries the secret header.
+
+        Args:
+            environ (dict): The environment of the request.
+
+        Returns:
+            bool: True if the header is present with the secret value.
+        """
+        if self.secret is None:
+            return False
+        value = environ.get(self._environ_key)
+        return value is not None and hmac.compare_digest(value.encode("latin-1"), self.secret.encode("latin-1"))
+
+    def run(self, route: str, func: callable, *args) -> any:
+        """
+        Calls a function, profiling it if no other request is being profiled.
+
+        Args:
+            route (str): The route template the profile is added to.
+            func (callable): The function to call.
+            *args: The arguments to pass.
+
+        Returns:
+            any: The result of the call.
+        """
+        if not self._busy.acquire(blocking=False):
+            return func(*args)
+        try:
+            if self.mode == "sampler":
+                self._start_sampling(route)
+                try:
+                    return func(*args)
+                finally:
+                    self._target = None
+            profile = cProfile.Profile()
+            try:
+                return profile.runcall(func, *args)
+            finally:
+                self._add_stats(route, profile)
+        finally:
+            self.profiled[route] += 1
+            self._busy.release()
+
+    async def run_async(self, route: str, awaitable) -> any:
+        """
+        Awaits an awaitable, profiling it if no other request is being profiled.
+
+        Args:
+            route (str): The route template the profile is added to.
+            awaitable: The awaitable to await.
+
+        Returns:
+            any: The result of the awaitable.
+        """
+        if not self._busy.acquire(blocking=False):
+            return await awaitable
+        try:
+            if self.mode == "sampler":
+                self._start_sampling(route)
+                try:
+                    return await awaitable
+                finally:
+                    self._target = None
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                return await awaitable
+            finally:
+                profile.disable()
+                self._add_stats(route, profile)
+        finally:
+            self.profiled[route] += 1
+            self._busy.release()
+
+    def _add_stats(self, route: str, profile: cProfile.Profile) -> None:
+        """
+        Adds a request's cProfile statistics to its route's total.
+
+        Args:
+            route (str): The route template.
+            profile (cProfile.Profile): The finished profile.
+        """
+        with self._lock:
+            stats = self._stats.get(route)
+            if stats is None:
+                self._stats[route] = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+
+    def _start_sampling(self, route: str) -> None:
+        """
+        Points the sampler thread at the calling thread, starting the sampler if needed.
+
+        Args:
+            route (str): The route template the samples are added to.
+        """
+        with self._lock:
+            self._stacks.setdefault(route, Counter())
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample, name="vortexkit-profiler", daemon=True)
+                self._sampler.start()
+        self._target = (threading.get_ident(), route)
+        self._wakeup.set()
+
+    def _sample(self) -> None:
+        """
+        Records the stack of the thread being profiled every 'interval' seconds.
+        """
+        while True:
+            target = self._target
+            if target is None:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            thread_id, route = target
+            frame = sys._current_frames().get(thread_id)
+            stacks = self._stacks.get(route)
+            if frame is not None and stacks is not None:
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stacks[";".join(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+    def report(self, route: str = None, sort: str = "cumulative", limit: int = 40) -> str:
+        """
+        Returns the aggregated profiles as text.
+
+        In 'cprofile' mode this is the pstats listing of each route, sorted by 'sort'.
+        In 'sampler' mode these are collapsed stacks, one 'route;frame;...;frame count'
+        line per distinct stack.
+
+        Args:
+            route (str, optional): The route template to report. Defaults to every route.
+            sort (str, optional): The pstats sort key. Defaults to 'cumulative'.
+            limit (int, optional): Maximum number of functions listed per route. Defaults to 40.
+
+        Returns:
+            str: The report.
+
+        Raises:
+            ValueError: If the sort key is not one of pstats' or the limit is not a positive integer.
+        """
+        if sort not in pstats.Stats.sort_arg_dict_default:
+            raise ValueError(f"Invalid sort key '{sort}', expected one of {', '.join(sorted(pstats.Stats.sort_arg_dict_default))}")
+        if not isinstance(limit, int) or limit <= 0:
+            raise ValueError(f"Invalid limit {limit!r}, expected a positive integer")
+        with self._lock:
+            if self.mode == "sampler":
+                lines = []
+                for name, stacks in sorted(self._stacks.items()):
+                    if route is None or name == route:
+                        lines.extend(f"{name or '<unmatched>'};{stack} {count}" for stack, count in stacks.most_common())
+                return "\n".join(lines) + "\n" if lines else ""
+
+            output = io.StringIO()
+            for name, stats in sorted(self._stats.items()):
+                if route is None or name == route:
+                    output.write(f"Route {name or '<unmatched>'}: {self.profiled[name]} profiled requests\n")
+                    stats.stream = output
+                    stats.sort_stats(sort).print_stats(limit)
+            return output.getvalue()
+
+    def dump(self, directory: str) -> list:
+        """
+        Writes the aggregated profiles to files, one per route.
+
+        cProfile statistics are written as '.prof' files, readable with pstats and
+        profile viewers, and samples as '.folded' collapsed stack files.
+
+        Args:
+            directory (str): The directory to write to, created if missing.
+
+        Returns:
+            list: The paths of the files written.
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        with self._lock:
+            if self.mode == "sampler":
+                for name, stacks in self._stacks.items():
+                    path = os.path.join(directory, _file_name(name) + ".folded")
+                    with open(path, "w", encoding="utf-8") as file:
+                        file.writelines(f"{stack} {count}\n" for stack, count in stacks.most_common())
+                    paths.append(path)
+            else:
+                for name, stats in self._stats.items():
+                    path = os.path.join(directory, _file_name(name) + ".prof")
+                    stats.dump_stats(path)
+                    paths.append(path)
+        return paths
+
+    def reset(self) -> None:
+        """
+        Discards the aggregated profiles.
+        """
+        with self._lock:
+            self._stats.clear()
+            self._stacks.clear()
+            self.profiled.clear()
+
+def _file_name(route: str) -> str:
+    """
+    Turns a route template into a file name.
+
+    Args:
+        route (str): The route template.
+
+    Returns:
+        str: A file name made of the template's letters, digits, dots and dashes.
+    """
+    if not route:
+        return "unmatched"
+    return re.sub(r"[^A-Za-z0-9.-]+", "_", route).strip("_") or "root"
@@ -1,10 +1,10 @@
+from collections.abc import Mapping
 from dataclasses import dataclass
-import json
-import threading
 from urllib.parse import parse_qs
-import cgi
 import xml.etree.ElementTree as ET
-from io import BytesIO
+from .multipart import MultipartParser, DEFAULT_SPOOL_SIZE, parse_options_header
+from .context import Context
+from . import jsoncodec
 
 @dataclass
 class App:
@@ -28,57 +28,298 @@ class App:
             "context": self.context.__dict__
         }
 
-@dataclass
+class Headers(Mapping):
+    """
+    Read-only, case-insensitive mapping of the request headers.
+
+    Built from the 'HTTP_*' keys of the WSGI environment, plus 'CONTENT_TYPE' and
+    'CONTENT_LENGTH', which WSGI stores without the prefix.
+
+    Methods:
+        get(key, default=None):
+            Returns the value of a header, or the default if it is missing.
+    """
+
+    __slots__ = ("_headers",)
+
+    def __init__(self, environ_data: dict) -> None:
+        """
+        Initializes the Headers mapping from a WSGI environment.
+
+        Args:
+            environ_data (dict): The WSGI environment data containing request information.
+        """
+        headers = {}
+        for key, value in environ_data.items():
+            if key.startswith("HTTP_"):
+                name = key[5:]
+            elif key in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                if not value:
+                    continue
+                name = key
+            else:
+                continue
+            headers[name.replace("_", "-").lower()] = (name.replace("_", "-").title(), value)
+        self._headers = headers
+
+    def __getitem__(self, key: str) -> str:
+        """
+        Returns the value of a header, matching its name case-insensitively.
+
+        Args:
+            key (str): The header name.
+
+        Returns:
+            str: The header value.
+
+        Raises:
+            KeyError: If the header is missing.
+        """
+        return self._headers[key.lower()][1]
+
+    def __contains__(self, key: object) -> bool:
+        """
+        Checks whether a header is present, matching its name case-insensitively.
+
+        Args:
+            key (object): The header name.
+
+        Returns:
+            bool: True if the header is present.
+        """
+        return isinstance(key, str) and key.lower() in self._headers
+
+    def __iter__(self):
+        """
+        Iterates over the header names.
+
+        Returns:
+            iterator: The names, in title case such as 'Content-Type'.
+        """
+        return (name for name, _ in self._headers.values())
+
+    def __len__(self) -> int:
+        """
+        Returns the number of headers.
+
+        Returns:
+            int: The number of headers.
+        """
+        return len(self._headers)
+
+    def __repr__(self):
+        """
+        Returns a representation of the headers.
+
+        Returns:
+            str: The headers as a dictionary, wrapped in 'Headers(...)'.
+        """
+        return f"Headers({dict(self.items())})"
+
+_MISSING = object()
+
+CHUNK_SIZE = 64 * 1024
+
+class PayloadTooLarge(ValueError):
+    """
+    Raised when a request body exceeds the maximum body size.
+    """
+
+class NotFound(LookupError):
+    """
+    Raised by a handler to answer as if its route had not matched the request path.
+
+    The request falls through to the '*' route, then to the registered 404 error
+    handler, then to the default '404 Not Found' response.
+    """
+
 class Request:
     """
     Represents an HTTP request.
 
+    The request is a thin view over the WSGI environment. Values are read from the
+    environment on access, and the body, query parameters, cookies and headers are
+    parsed on first access and cached, so handlers only pay for what they use.
+
     Attributes:
         app (App): The App object associated with the request.
+        environ (dict): The WSGI environment the request is backed by.
         path (str): The path of the request.
         method (str): The HTTP method of the request.
-        query_params (dict): The query parameters of the request.
-        body (any, optional): The body content of the request.
-        content_type (str, optional): The content type of the request body.
-        headers (str, optional): The headers of the request.
-        cookies (dict, optional): The cookies sent with the request.
-        real_ip (str, optional): The real IP address of the client.
-        user_agent (str, optional): The user agent string of the client.
-        accept (str, optional): The accept header of the request.
-        remote_host (str, optional): The remote host of the client.
-        remote_addr (str, optional): The remote address of the client.
-        remote_port (int, optional): The remote port of the client.
-        server_name (str, optional): The server name handling the request.
-        server_port (int, optional): The server port handling the request.
-        server_protocol (str, optional): The server protocol handling the request.
-        server_software (str, optional): The server software handling the request.
+        query_params (dict): The query parameters of the request, parsed on first access.
+        body (any): The body content of the request, read and parsed on first access.
+        content_type (str): The content type of the request body.
+        headers (Headers): Case-insensitive mapping of the request headers, built on first access.
+        cookies (dict): The cookies sent with the request, parsed on first access.
+        real_ip (str): The real IP address of the client.
+        user_agent (str): The user agent string of the client.
+        accept (str): The accept header of the request.
+        remote_host (str): The remote host of the client.
+        remote_addr (str): The remote address of the client.
+        remote_port (int): The remote port of the client.
+        server_name (str): The server name handling the request.
+        server_port (int): The server port handling the request.
+        server_protocol (str): The server protocol handling the request.
+        server_software (str): The server software handling the request.
+        path_params (dict): The converted parameters captured from the route path.
+        context (Context): State attached to this request, created on first access.
+
+    Methods:
+        stream(chunk_size=65536):
+            Iterates over the raw request body without buffering it.
     """
 
-    app: App
-    path: str
-    method: str
-    query_params: dict
-    body: any = None
-    content_type: str = None
-    headers: str = None
-    cookies: dict = None
-    real_ip: str = None
-    user_agent: str = None
-    accept: str = None
-    remote_host: str = None
-    remote_addr: str = None
-    remote_port: int = None
-    server_name: str = None
-    server_port: int = None
-    server_protocol: str = None
-    server_software: str = None
-
-    context = threading.local()
+    __slots__ = ("app", "environ", "path_params", "_parser", "_body", "_query_params", "_cookies", "_headers", "_context")
+
+    def __init__(self, app: App, environ: dict, parser: "ParseRequestInput" = None, path_params: dict = None) -> None:
+        """
+        Initializes a Request over a WSGI environment.
+
+        Args:
+            app (App): The App object associated with the request.
+            environ (dict): The WSGI environment data containing request information.
+            parser (ParseRequestInput, optional): The parser used for the body and cookies.
+            path_params (dict, optional): The converted parameters captured from the route path.
+        """
+        self.app = app
+        self.environ = environ
+        self.path_params = path_params
+        self._parser = parser if parser is not None else ParseRequestInput(environ, app.context)
+        self._body = _MISSING
+        self._query_params = None
+        self._cookies = None
+        self._headers = None
+        self._context = None
+
+    @property
+    def context(self) -> Context:
+        """
+        State attached to this request, such as values set by middleware for the handler.
+
+        Each request has its own context, created on first access and discarded with the
+        request, so nothing leaks between requests served by the same thread.
+        """
+        if self._context is None:
+            self._context = Context()
+        return self._context
+
+    @property
+    def path(self) -> str:
+        return self.environ.get("PATH_INFO")
+
+    @property
+    def method(self) -> str:
+        return self.environ.get("REQUEST_METHOD")
+
+    @property
+    def query_params(self) -> dict:
+        """
+        The query string parsed into a dictionary, cached after the first access.
+        """
+        if self._query_params is None:
+            self._query_params = parse_qs(self.environ.get("QUERY_STRING", ""))
+        return self._query_params
+
+    @property
+    def body(self) -> any:
+        """
+        The request body read and parsed by content type, cached after the first access.
+        """
+        if self._body is _MISSING:
+            self._body = self._parser.parse_body()
+        return self._body
+
+    @body.setter
+    def body(self, value: any) -> None:
+        self._body = value
+
+    def stream(self, chunk_size: int = CHUNK_SIZE):
+        """
+        Iterates over the raw request body without buffering it.
+
+        The body can only be consumed once, either through this method or through 'body'.
+
+        Args:
+            chunk_size (int, optional): Maximum number of bytes per chunk. Defaults to 64 KiB.
+
+        Returns:
+            iterator: An iterator yielding the body as bytes chunks.
+
+        Raises:
+            RuntimeError: If the body has already been consumed.
+            PayloadTooLarge: If the body exceeds the maximum body size.
+        """
+        return self._parser.stream_body(chunk_size)
+
+    @property
+    def content_type(self) -> str:
+        content_type = self.environ.get("CONTENT_TYPE")
+        return content_type.split("boundary=")[0] if content_type else None
+
+    @property
+    def headers(self) -> Headers:
+        """
+        Case-insensitive mapping of the request headers, built on first access.
+        """
+        if self._headers is None:
+            self._headers = Headers(self.environ)
+        return self._headers
+
+    @property
+    def cookies(self) -> dict:
+        """
+        The cookies sent with the request, parsed on first access.
+        """
+        if self._cookies is None:
+            self._cookies = self._parser._parse_cookies(self.environ.get("HTTP_COOKIE"))
+        return self._cookies
+
+    @property
+    def real_ip(self) -> str:
+        return self.environ.get("REMOTE_ADDR")
+
+    @property
+    def user_agent(self) -> str:
+        return self.environ.get("HTTP_USER_AGENT")
+
+    @property
+    def accept(self) -> str:
+        return self.environ.get("HTTP_ACCEPT")
+
+    @property
+    def remote_host(self) -> str:
+        return self.environ.get("REMOTE_HOST")
+
+    @property
+    def remote_addr(self) -> str:
+        return self.environ.get("REMOTE_ADDR")
+
+    @property
+    def remote_port(self) -> int:
+        return self.environ.get("REMOTE_PORT")
+
+    @property
+    def server_name(self) -> str:
+        return self.environ.get("SERVER_NAME")
+
+    @property
+    def server_port(self) -> int:
+        return self.environ.get("SERVER_PORT")
+
+    @property
+    def server_protocol(self) -> str:
+        return self.environ.get("SERVER_PROTOCOL")
+
+    @property
+    def server_software(self) -> str:
+        return self.environ.get("SERVER_SOFTWARE")
 
     def __dict__(self):
         """
         Convert the Request object to a dictionary representation.
 
+        Accessing this parses every lazy attribute, including the body.
+
         Returns:
             dict: A dictionary representation of the Request object.
         """
@@ -89,7 +330,7 @@ class Request:
             "query_params": self.query_params,
             "body": self.body,
             "content_type": self.content_type,
-            "headers": self.headers,
+            "headers": dict(self.headers),
             "cookies": self.cookies,
             "real_ip": self.real_ip,
             "user_agent": self.user_agent,
@@ -101,17 +342,20 @@ class Request:
             "server_port": self.server_port,
             "server_protocol": self.server_protocol,
             "server_software": self.server_software,
-            "context": self.context.__dict__
+            "path_params": self.path_params,
+            "context": self._context.__json__() if self._context is not None else {}
         }
 
     def __repr__(self):
         """
         Return a string representation of the Request object.
 
+        Only values that are available without parsing are included.
+
         Returns:
             str: A string representation of the Request object.
         """
-        return f"Request(path={self.path}, method={self.method}, query_params={self.query_params}, body={self.body}, content_type={self.content_type}, headers={self.headers}, cookies={self.cookies}, real_ip={self.real_ip}, user_agent={self.user_agent}, accept={self.accept}, remote_host={self.remote_host}, remote_addr={self.remote_addr}, remote_port={self.remote_port}, server_name={self.server_name}, server_port={self.server_port}, server_protocol={self.server_protocol}, server_software={self.server_software})"
+        return f"Request(path={self.path}, method={self.method}, content_type={self.content_type}, remote_addr={self.remote_addr}, path_params={self.path_params})"
 
 class ParseRequestInput:
     """
@@ -120,8 +364,20 @@ class ParseRequestInput:
     Attributes:
         environ_data (dict): The WSGI environment data containing request information.
         context: The context object associated with the request parsing.
+        spool_size (int): Size in bytes above which uploaded files are written to disk.
+        max_body_size (int): Maximum accepted body size in bytes, or None for no limit.
+        consumed (bool): Whether the body has been read from the WSGI input.
 
     Methods:
+        _content_length():
+            Returns the declared length of the request body.
+
+        _begin_read():
+            Marks the body as consumed and enforces the maximum body size.
+
+        stream_body(chunk_size):
+            Yields the request body from the WSGI environment in chunks.
+
         _fetch_body():
             Fetches and returns the request body from the WSGI environment.
 
@@ -131,42 +387,119 @@ class ParseRequestInput:
         _parse_body(body):
             Parses and returns the request body based on the content type.
 
+        parse_body():
+            Reads and parses the request body, streaming multipart bodies.
+
         parse():
-            Parses the WSGI environment data into a Request object.
+            Wraps the WSGI environment data in a lazily parsed Request object.
 
             Returns:
-                Request: The parsed Request object.
+                Request: The Request object.
     """
 
-    def __init__(self, environ_data: dict, context):
+    def __init__(self, environ_data: dict, context, spool_size: int = DEFAULT_SPOOL_SIZE, max_body_size: int = None):
         """
         Initialize ParseRequestInput with WSGI environment data and context.
 
         Args:
             environ_data (dict): The WSGI environment data containing request information.
             context: The context object associated with the request parsing.
+            spool_size (int, optional): Size in bytes above which uploaded files are written to disk.
+            max_body_size (int, optional): Maximum accepted body size in bytes. Defaults to no limit.
         """
         self.environ_data = environ_data
         self.context = context
+        self.spool_size = spool_size
+        self.max_body_size = max_body_size
+        self.consumed = False
 
-    def _fetch_body(self):
+    def _content_length(self):
         """
-        Fetches and returns the request body from the WSGI environment.
+        Returns the declared length of the request body.
 
         Returns:
-            bytes: The request body as bytes.
+            int: The value of CONTENT_LENGTH, or 0 if it is missing or invalid.
         """
         content_length_str = self.environ_data.get('CONTENT_LENGTH', '0')
         try:
-            content_length = int(content_length_str) if content_length_str else 0
+            return int(content_length_str) if content_length_str else 0
         except ValueError:
-            content_length = 0
+            return 0
 
+    def _begin_read(self):
+        """
+        Marks the body as consumed and checks the declared length against the limit.
+
+        Returns:
+            int: The declared length of the request body.
+
+        Raises:
+            RuntimeError: If the body has already been consumed.
+            PayloadTooLarge: If the declared length exceeds the maximum body size.
+        """
+        if self.consumed:
+            raise RuntimeError("Request body has already been consumed")
+        self.consumed = True
+
+        content_length = self._content_length()
+        if self.max_body_size is not None and content_length > self.max_body_size:
+            raise PayloadTooLarge(f"Request body exceeds {self.max_body_size} bytes")
+        return content_length
+
+    def stream_body(self, chunk_size: int = CHUNK_SIZE):
+        """
+        Yields the request body from the WSGI environment in chunks.
+
+        The body is read up to CONTENT_LENGTH, or until the end of the input when the
+        server marks it as terminated, and never past the maximum body size.
+
+        Args:
+            chunk_size (int, optional): Maximum number of bytes per chunk.
+
+        Yields:
+            bytes: The next chunk of the body.
+
+        Raises:
+            RuntimeError: If the body has already been consumed.
+            PayloadTooLarge: If the body exceeds the maximum body size.
+        """
+        content_length = self._begin_read()
         if content_length > 0:
-            body = self.environ_data['wsgi.input'].read(content_length)
+            remaining = content_length
+        elif self.environ_data.get('wsgi.input_terminated'):
+            remaining = None
         else:
-            body = b""
-        return body
+            return
+
+        stream = self.environ_data['wsgi.input']
+        received = 0
+        while remaining is None or remaining > 0:
+            chunk = stream.read(chunk_size if remaining is None else min(chunk_size, remaining))
+            if not chunk:
+                break
+            received += len(chunk)
+            if self.max_body_size is not None and received > self.max_body_size:
+                raise PayloadTooLarge(f"Request body exceeds {self.max_body_size} bytes")
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+    def _fetch_body(self):
+        """
+        Fetches and returns the request body from the WSGI environment.
+
+        Returns:
+            bytes: The request body as bytes.
+
+        Raises:
+            RuntimeError: If the body has already been consumed.
+            PayloadTooLarge: If the body exceeds the maximum body size.
+        """
+        if not self._content_length():
+            return b"".join(self.stream_body())
+
+        content_length = self._begin_read()
+        return self.environ_data['wsgi.input'].read(content_length)
 
     def _parse_cookies(self, cookies_string: str):
         """
@@ -200,49 +533,53 @@ class ParseRequestInput:
         content_type = self.environ_data.get('CONTENT_TYPE', '')
         if 'application/json' in content_type:
             try:
-                return json.loads(body.decode('utf-8'))
-            except json.JSONDecodeError:
+                return jsoncodec.loads(body)
+            except ValueError:
                 return None
         elif 'application/xml' in content_type or 'text/xml' in content_type:
             return body.decode('utf-8')
         elif 'multipart/form-data' in content_type:
-            fp = BytesIO(body)
-            env = {'REQUEST_METHOD': 'POST', 'CONTENT_TYPE': content_type}
-            form = cgi.FieldStorage(fp=fp, environ=env, keep_blank_values=True)
-            return {key: form[key].value for key in form.keys()}
+            return self._parse_multipart([body])
         elif 'application/x-www-form-urlencoded' in content_type:
             return parse_qs(body.decode('utf-8'))
         else:
             return body.decode('utf-8')  # Default case: plain text
 
+    def _parse_multipart(self, chunks):
+        """
+        Parses a multipart/form-data body incrementally.
+
+        Args:
+            chunks: Iterable yielding the body as bytes chunks.
+
+        Returns:
+            dict: Dictionary mapping field names to strings or UploadFile objects.
+        """
+        _, options = parse_options_header(self.environ_data.get('CONTENT_TYPE', ''))
+        return MultipartParser(chunks, options.get('boundary'), self.spool_size).parse()
+
+    def parse_body(self):
+        """
+        Reads and parses the request body.
+
+        Multipart bodies are parsed straight from 'wsgi.input' in chunks, with uploaded
+        files spooled to disk above the spool threshold, so they are never buffered whole.
+
+        Returns:
+            any: The parsed request body.
+        """
+        if 'multipart/form-data' in self.environ_data.get('CONTENT_TYPE', ''):
+            return self._parse_multipart(self.stream_body())
+        return self._parse_body(self._fetch_body())
+
     def parse(self):
         """
-        Parses the WSGI environment data into a Request object.
-
-        Returns:
-            Request: The parsed Request object.
-        """
-        body = self._fetch_body()
-        parsed_body = self._parse_body(body)
-
-        current_request = Request(
-            app=App(self.context),
-            path=self.environ_data.get("PATH_INFO"),
-            method=self.environ_data.get("REQUEST_METHOD"),
-            query_params=parse_qs(self.environ_data.get("QUERY_STRING", "")),
-            body=parsed_body,
-            content_type=self.environ_data.get("CONTENT_TYPE").split("boundary=")[0] if self.environ_data.get("CONTENT_TYPE") else None,
-            headers=self.environ_data.get("HTTP_USER_AGENT"),
-            cookies=self._parse_cookies(self.environ_data.get("HTTP_COOKIE")),
-            real_ip=self.environ_data.get("REMOTE_ADDR"),
-            user_agent=self.environ_data.get("HTTP_USER_AGENT"),
-            accept=self.environ_data.get("HTTP_ACCEPT"),
-            remote_host=self.environ_data.get("REMOTE_HOST"),
-            remote_addr=self.environ_data.get("REMOTE_ADDR"),
-            remote_port=self.environ_data.get("REMOTE_PORT"),
-            server_name=self.environ_data.get("SERVER_NAME"),
-            server_port=self.environ_data.get("SERVER_PORT"),
-            server_protocol=self.environ_data.get("SERVER_PROTOCOL"),
-            server_software=self.environ_data.get("SERVER_SOFTWARE")
-        )
-        return current_request
+        Wraps the WSGI environment data in a Request object.
+
+        Nothing is read or parsed here; the Request parses its body, query
+        parameters, cookies and headers on first access.
+
+        Returns:
+            Request: The Request object.
+        """
+        return Request(App(self.context), self.environ_data, self)
@@ -1,15 +1,33 @@
 from dataclasses import dataclass, field
-import json
+from contextvars import copy_context
+from queue import Queue, Empty, Full
+import asyncio
+import os
+import re
 import mimetypes
+import threading
+from email.utils import formatdate
 from http.cookies import SimpleCookie
+from . import jsoncodec
+from .templating import templates
+
+# Content-Type header tuples by content type, shared by every response of that type
+CONTENT_TYPE_HEADERS = {}
 
 class BaseResponse:
     """
     Base class for all response types, providing common functionality like cookie and header handling.
 
+    Headers start out as the class's 'default_headers', an immutable tuple shared by every
+    instance, and are only copied into a dictionary of their own when the response is
+    modified through 'headers'. Cookies are likewise only created when first used, so
+    responses that add neither cost no allocation.
+
     Attributes:
-        cookies (SimpleCookie): An instance of SimpleCookie for managing cookies.
-        headers (dict): A dictionary for managing HTTP headers.
+        cookies (SimpleCookie): The cookies sent as Set-Cookie headers, created on first access.
+        headers (dict): The HTTP headers besides Content-Type, copied from the defaults on first access.
+        default_headers (tuple): (name, value) pairs every response of the class carries.
+        accepts_ranges (bool): Whether the response supports HTTP Range requests through apply_range().
 
     Methods:
         set_cookie(key, value, **kwargs):
@@ -26,17 +44,51 @@ class BaseResponse:
 
         get_header(key):
             Retrieves the value of an HTTP header if it exists.
+
+        header_list(length=None):
+            Returns the headers to send, including Content-Type and Set-Cookie.
+
+        iter_content():
+            Returns the response body as an iterable of bytes.
     """
 
-    cookies: SimpleCookie = None
-    headers: dict = None
+    default_headers = ()
+    accepts_ranges = False
 
     def __init__(self):
         """
-        Initializes the BaseResponse with empty cookies and headers.
+        Initializes the BaseResponse with the class's default headers and no cookies.
+        """
+        self._headers = None
+        self._cookies = None
+
+    @property
+    def headers(self) -> dict:
+        """
+        The HTTP headers besides Content-Type, copied from the shared defaults on first access.
         """
-        self.cookies = SimpleCookie()
-        self.headers = {}
+        headers = self._headers
+        if headers.__class__ is not dict:
+            headers = self._headers = dict(self.default_headers if headers is None else headers)
+        return headers
+
+    @headers.setter
+    def headers(self, value: dict | tuple) -> None:
+        # Tuples of (name, value) pairs are kept as they are, shared until modified
+        self._headers = value
+
+    @property
+    def cookies(self) -> SimpleCookie:
+        """
+        The cookies sent as Set-Cookie headers, created on first access.
+        """
+        if self._cookies is None:
+            self._cookies = SimpleCookie()
+        return self._cookies
+
+    @cookies.setter
+    def cookies(self, value: SimpleCookie) -> None:
+        self._cookies = value
 
     def set_cookie(self, key, value, **kwargs):
         """
@@ -60,12 +112,12 @@ class BaseResponse:
             path (str, optional): The path from which the cookie will be removed. Defaults to '/'.
             domain (str, optional): The domain from which the cookie will be removed. If not specified, the cookie will only be removed from the domain of the current request.
         """
-        if key in self.cookies:
-            self.cookies[key] = ''
-            self.cookies[key]['path'] = path
-            if domain:
-                self.cookies[key]['domain'] = domain
-            self.cookies[key]['expires'] = 'Thu, 01 Jan 1970 00:00:00 GMT'
+        self.cookies[key] = ''
+        self.cookies[key]['path'] = path
+        if domain:
+            self.cookies[key]['domain'] = domain
+        self.cookies[key]['expires'] = 'Thu, 01 Jan 1970 00:00:00 GMT'
+        self.cookies[key]['max-age'] = 0
 
     def add_header(self, key, value):
         """
@@ -84,7 +136,7 @@ class BaseResponse:
         Args:
             key (str): The name of the header to remove.
         """
-        if key in self.headers:
+        if self.get_header(key) is not None:
             del self.headers[key]
 
     def get_header(self, key):
@@ -97,7 +149,68 @@ class BaseResponse:
         Returns:
             The value of the header if it exists, None otherwise.
         """
-        return self.headers.get(key)
+        headers = self._headers
+        if headers.__class__ is dict:
+            return headers.get(key)
+        for name, value in self.default_headers if headers is None else headers:
+            if name == key:
+                return value
+        return None
+
+    def header_list(self, length: int = None) -> list:
+        """
+        Returns the headers to send, as a new list the server may extend.
+
+        Content-Type comes first, followed by the response's headers and a Set-Cookie
+        header per cookie. When 'length' is given, a Content-Length header is added
+        unless the response already sets one.
+
+        Args:
+            length (int, optional): The size of the body in bytes, if known. Defaults to None.
+
+        Returns:
+            list: The (name, value) header tuples.
+        """
+        content_type = self.content_type
+        if content_type is None:
+            result = []
+        else:
+            header = CONTENT_TYPE_HEADERS.get(content_type)
+            if header is None:
+                header = CONTENT_TYPE_HEADERS.setdefault(content_type, ("Content-type", content_type))
+            result = [header]
+
+        headers = self._headers
+        if headers is None:
+            headers = self.default_headers
+        elif headers.__class__ is dict:
+            headers = headers.items()
+        if headers:
+            result.extend(headers)
+            if length is not None:
+                for name, _ in headers:
+                    if name.lower() == "content-length":
+                        length = None
+                        break
+        if length is not None:
+            result.append(("Content-Length", str(length)))
+
+        cookies = self._cookies
+        if cookies:
+            result.extend(("Set-Cookie", morsel.OutputString()) for morsel in cookies.values())
+        return result
+
+    def iter_content(self):
+        """
+        Returns the response body as an iterable of bytes, as handed to the WSGI server.
+
+        Returns:
+            iterable: The encoded response body.
+        """
+        content = self.content
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        return [content]
 
 @dataclass
 class PlainTextResponse(BaseResponse):
@@ -149,65 +262,309 @@ class HtmlResponse(BaseResponse):
         """
         super().__init__()
 
+MAX_RANGES = 16
+
+def parse_range_header(range_header: str, size: int):
+    """
+    Parses a 'Range: bytes=...' header against a resource size.
+
+    Args:
+        range_header (str): The value of the Range header.
+        size (int): The size of the resource in bytes.
+
+    Returns:
+        list: A list of inclusive (start, end) tuples, an empty list if no range is
+        satisfiable, or None if the header is malformed and should be ignored.
+    """
+    unit, _, ranges_spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or not ranges_spec:
+        return None
+
+    ranges = []
+    for spec in ranges_spec.split(","):
+        start, separator, end = spec.strip().partition("-")
+        if not separator:
+            return None
+        try:
+            if not start:
+                length = int(end)
+                if length <= 0:
+                    continue
+                start, end = max(size - length, 0), size - 1
+            else:
+                start = int(start)
+                end = int(end) if end else None
+        except ValueError:
+            return None
+        if start < 0 or (end is not None and end < start):
+            return None
+        if start >= size:
+            continue
+        if end is None:
+            end = size - 1
+        ranges.append((start, min(end, size - 1)))
+
+    if len(ranges) > MAX_RANGES:
+        return None
+    return ranges
+
+class FileIterator:
+    """
+    Iterates over an open file in chunks and closes it once the server is done with it.
+
+    Servers that provide 'wsgi.file_wrapper' are handed the underlying file instead,
+    letting them use zero-copy transfers such as sendfile.
+
+    Attributes:
+        file (any): The open binary file.
+        chunk_size (int): The number of bytes read per chunk.
+    """
+
+    __slots__ = ("file", "chunk_size")
+
+    def __init__(self, file: any, chunk_size: int) -> None:
+        """
+        Initializes a FileIterator.
+
+        Args:
+            file (any): The open binary file.
+            chunk_size (int): The number of bytes read per chunk.
+        """
+        self.file = file
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        """
+        Yields the file in chunks.
+        """
+        read = self.file.read
+        chunk_size = self.chunk_size
+        while True:
+            chunk = read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    def close(self) -> None:
+        """
+        Closes the file. Called by the WSGI server, including when the client disconnects.
+        """
+        self.file.close()
+
+class FileRangeIterator:
+    """
+    Iterates over byte ranges of a file, interleaved with literal byte segments.
+
+    Ranges are read with os.pread in fixed-size chunks, so memory use stays flat
+    regardless of the size of the ranges. Where os.pread is not available, such as on
+    Windows, each chunk is read with seek() and read() instead.
+
+    Attributes:
+        file (any): The open binary file.
+        segments (list): Items that are either bytes or inclusive (start, end) tuples.
+        chunk_size (int): The maximum number of bytes read per chunk.
+    """
+
+    __slots__ = ("file", "segments", "chunk_size")
+
+    def __init__(self, file: any, segments: list, chunk_size: int) -> None:
+        """
+        Initializes a FileRangeIterator.
+
+        Args:
+            file (any): The open binary file.
+            segments (list): Items that are either bytes or inclusive (start, end) tuples.
+            chunk_size (int): The maximum number of bytes read per chunk.
+        """
+        self.file = file
+        self.segments = segments
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        """
+        Yields the segments, reading file ranges in chunks.
+        """
+        fd = self.file.fileno() if hasattr(os, "pread") else None
+        for segment in self.segments:
+            if isinstance(segment, bytes):
+                yield segment
+                continue
+            offset, end = segment
+            while offset <= end:
+                size = min(self.chunk_size, end - offset + 1)
+                if fd is None:
+                    self.file.seek(offset)
+                    chunk = self.file.read(size)
+                else:
+                    chunk = os.pread(fd, size, offset)
+                if not chunk:
+                    return
+                offset += len(chunk)
+                yield chunk
+
+    def close(self) -> None:
+        """
+        Closes the file. Called by the WSGI server, including when the client disconnects.
+        """
+        self.file.close()
+
 @dataclass
 class FileResponse(BaseResponse):
     """
     A response that returns a file.
 
+    Files smaller than 'stream_threshold' are read into memory. Larger files are never
+    loaded: they are streamed from disk in chunks, or handed to the server's
+    'wsgi.file_wrapper' so it can use sendfile. Single and multiple byte ranges are
+    supported through the Range header, answered with '206 Partial Content'.
+
     Attributes:
         file_path (str): The path to the file to return.
         content_type (str): The detected content type of the file.
         status_code (str): The status code of the response. Default is '200 OK'.
-        content (bytes): The content of the file as bytes.
+        content (bytes): The content of the file as bytes, or None if the file is streamed.
+        size (int): The size of the file in bytes.
+        stream_threshold (int): Size in bytes from which the file is streamed instead of read.
+        chunk_size (int): The number of bytes read per chunk when streaming.
 
     Methods:
         __post_init__():
-            Initializes the FileResponse and reads the file content.
+            Initializes the FileResponse and reads small files into memory.
+
+        apply_range(range_header, if_range=None):
+            Restricts the response to the byte ranges requested by the client.
+
+        iter_content():
+            Returns the file, or the requested ranges of it, as an iterable of bytes.
     """
 
     file_path: str
     content_type: str = field(default=None, init=False)
     status_code: str = "200 OK"
     content: bytes = field(default=None, init=False)
+    size: int = field(default=None, init=False)
+
+    stream_threshold = 256 * 1024
+    chunk_size = 64 * 1024
+    accepts_ranges = True
+    default_headers = (('Accept-Ranges', 'bytes'),)
 
     def __post_init__(self):
         """
-        Initializes the FileResponse and reads the file content.
+        Initializes the FileResponse and reads the file content if it is small.
         Raises:
             FileNotFoundError: If the file is not found.
         """
         super().__init__()  # Initialize BaseResponse
 
         try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            raise FileNotFoundError("File was not found.")
+        if not stat.st_size:
+            raise FileNotFoundError("File was found, but no data was returned.")
+
+        self.size = stat.st_size
+        self.content_type = mimetypes.guess_type(self.file_path)[0] or 'application/octet-stream'
+        if self.size < self.stream_threshold:
             with open(self.file_path, "rb") as in_file:
                 self.content = in_file.read()
-                if self.content:
-                    self.content_type = mimetypes.guess_type(self.file_path)[0]
-                else:
-                    raise FileNotFoundError("File was found, but no data was returned.") 
-        except FileNotFoundError:
-            raise FileNotFoundError("File was not found.") 
+            self.size = len(self.content)
+
+        self._segments = None
+        self.add_header('Content-Length', str(self.size))
+        self.add_header('Last-Modified', formatdate(stat.st_mtime, usegmt=True))
+
+    def apply_range(self, range_header: str, if_range: str = None) -> None:
+        """
+        Restricts the response to the byte ranges requested by the client.
+
+        Malformed headers, and If-Range values that do not match the file, leave the full
+        file in place. Unsatisfiable ranges produce '416 Range Not Satisfiable'.
+
+        Args:
+            range_header (str): The value of the Range header.
+            if_range (str, optional): The value of the If-Range header.
+        """
+        if if_range and if_range not in (self.get_header('ETag'), self.get_header('Last-Modified')):
+            return
+        ranges = parse_range_header(range_header, self.size)
+        if ranges is None:
+            return
+
+        if not ranges:
+            self.status_code = "416 Range Not Satisfiable"
+            self.content = b""
+            self._segments = []
+            self.add_header('Content-Range', f"bytes */{self.size}")
+            self.add_header('Content-Length', '0')
+            return
+
+        self.status_code = "206 Partial Content"
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            self._segments = [(start, end)]
+            self.add_header('Content-Range', f"bytes {start}-{end}/{self.size}")
+            self.add_header('Content-Length', str(end - start + 1))
+            return
+
+        boundary = os.urandom(12).hex()
+        part_type = self.content_type
+        self.content_type = f"multipart/byteranges; boundary={boundary}"
+        segments = []
+        length = 0
+        for start, end in ranges:
+            head = f"--{boundary}\r\nContent-Type: {part_type}\r\nContent-Range: bytes {start}-{end}/{self.size}\r\n\r\n".encode()
+            segments.extend((head, (start, end), b"\r\n"))
+            length += len(head) + (end - start + 1) + 2
+        tail = f"--{boundary}--\r\n".encode()
+        segments.append(tail)
+        self._segments = segments
+        self.add_header('Content-Length', str(length + len(tail)))
+
+    def iter_content(self):
+        """
+        Returns the file, or the requested ranges of it, as an iterable of bytes.
+
+        Returns:
+            iterable: A list for in-memory content, otherwise a FileIterator or FileRangeIterator.
+        """
+        if self._segments is None:
+            if self.content is not None:
+                return [self.content]
+            return FileIterator(open(self.file_path, "rb"), self.chunk_size)
+
+        if self.content is not None:
+            return [
+                segment if isinstance(segment, bytes) else self.content[segment[0]:segment[1] + 1]
+                for segment in self._segments
+            ]
+        return FileRangeIterator(open(self.file_path, "rb"), self._segments, self.chunk_size)
 
 @dataclass
 class JSONResponse(BaseResponse):
     """
     A response that returns a JSON object.
 
+    The value is encoded straight to bytes by the JSON backend, see vortexkit.jsoncodec,
+    which also handles dataclasses, enums, datetimes and objects defining '__json__'.
+    Bytes are taken as already encoded JSON and sent unchanged.
+
     Attributes:
-        dictionary (dict): The dictionary to be converted to JSON.
+        dictionary (any): The value to be converted to JSON, or pre-encoded JSON bytes.
         content_type (str): The content type of the response ('application/json').
         status_code (str): The status code of the response. Default is '200 OK'.
-        content (str): The JSON content as a string.
+        content (bytes): The encoded JSON.
 
     Methods:
         __post_init__():
             Initializes the JSONResponse and converts the dictionary to JSON.
     """
 
-    dictionary: dict
+    dictionary: any
     content_type: str = field(default='application/json', init=False)
     status_code: str = "200 OK"
-    content: str = field(default=None, init=False)
+    content: bytes = field(default=None, init=False)
 
     def __post_init__(self):
         """
@@ -215,7 +572,11 @@ class JSONResponse(BaseResponse):
         """
         super().__init__()  # Initialize BaseResponse
 
-        self.content = json.dumps(self.dictionary)
+        value = self.dictionary
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            self.content = bytes(value)
+        else:
+            self.content = jsoncodec.dumps(value)
 
 @dataclass
 class RedirectResponse(BaseResponse):
@@ -251,6 +612,8 @@ class TemplateResponse(BaseResponse):
     """
     A response that renders a template file with the given variables.
 
+    Templates are compiled once and cached by path, see vortexkit.templating.
+
     Attributes:
         file_path (str): The path to the template file.
         variables (dict): A dictionary of variables to replace in the template file.
@@ -260,7 +623,7 @@ class TemplateResponse(BaseResponse):
 
     Methods:
         __post_init__():
-            Initializes the TemplateResponse and replaces variables in the template file.
+            Initializes the TemplateResponse and renders the cached template.
     """
 
     file_path: str
@@ -271,16 +634,138 @@ class TemplateResponse(BaseResponse):
 
     def __post_init__(self):
         """
-        Initializes the TemplateResponse and replaces variables in the template file.
+        Initializes the TemplateResponse and renders the cached template.
         """
         super().__init__()  # Initialize BaseResponse
 
-        with open(self.file_path) as f:
-            file_content = f.read()
-            for key, value in self.variables.items():
-                file_content = file_content.replace(f"(({key}))", value)
-                file_content = file_content.replace(f"(( {key} ))", value)
-            self.content = file_content
+        self.content = templates.get(self.file_path).render(self.variables)
+
+def iterate_async(iterable: any):
+    """
+    Drives an asynchronous iterable from synchronous code on a private event loop.
+
+    Args:
+        iterable (any): The asynchronous iterable, such as an async generator.
+
+    Yields:
+        any: Each item produced by the iterable.
+    """
+    loop = asyncio.new_event_loop()
+    iterator = iterable.__aiter__()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(iterator.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            loop.run_until_complete(aclose())
+        loop.close()
+
+class StreamingBody:
+    """
+    Wraps an iterable response body, encoding str chunks and forwarding close().
+
+    The iterable may also be asynchronous, such as an async generator. Under ASGI it is
+    consumed on the event loop with 'aiter_chunks', under WSGI it is driven on a
+    private event loop.
+
+    Attributes:
+        iterable (any): The iterable producing the body chunks.
+        is_async (bool): Whether the iterable is asynchronous.
+    """
+
+    __slots__ = ("iterable", "is_async")
+
+    def __init__(self, iterable: any) -> None:
+        """
+        Initializes a StreamingBody.
+
+        Args:
+            iterable (any): The iterable or asynchronous iterable producing the body chunks.
+        """
+        self.iterable = iterable
+        self.is_async = hasattr(iterable, "__aiter__")
+
+    def __iter__(self):
+        """
+        Yields each chunk of the wrapped iterable as bytes.
+        """
+        iterable = iterate_async(self.iterable) if self.is_async else self.iterable
+        for chunk in iterable:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if chunk:
+                yield chunk
+
+    async def aiter_chunks(self):
+        """
+        Yields each chunk of the wrapped asynchronous iterable as bytes.
+        """
+        async for chunk in self.iterable:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if chunk:
+                yield chunk
+
+    def close(self) -> None:
+        """
+        Closes the wrapped iterable, running any cleanup in a generator's finally blocks.
+        """
+        close = getattr(self.iterable, "close", None)
+        if close is not None:
+            close()
+
+    async def aclose(self) -> None:
+        """
+        Closes the wrapped asynchronous iterable, running any cleanup in its finally blocks.
+        """
+        aclose = getattr(self.iterable, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+@dataclass
+class StreamingResponse(BaseResponse):
+    """
+    A response that streams its body from an iterable, such as a generator.
+
+    Each chunk is sent to the client as soon as it is produced, so the body is never
+    held in memory as a whole. Handlers may also return a generator or async generator
+    directly, which is wrapped in a StreamingResponse.
+
+    Attributes:
+        content (any): An iterable or asynchronous iterable yielding bytes or str chunks.
+        content_type (str): The content type of the response. Default is 'application/octet-stream'.
+        status_code (str): The status code of the response. Default is '200 OK'.
+
+    Methods:
+        __post_init__():
+            Initializes the StreamingResponse.
+
+        iter_content():
+            Returns the body as an iterable that encodes and forwards close().
+    """
+
+    content: any
+    content_type: str = 'application/octet-stream'
+    status_code: str = "200 OK"
+
+    def __post_init__(self):
+        """
+        Initializes the StreamingResponse.
+        """
+        super().__init__()
+
+    def iter_content(self):
+        """
+        Returns the body as an iterable that encodes str chunks and forwards close().
+
+        Returns:
+            StreamingBody: The streamed response body.
+        """
+        return StreamingBody(self.content)
 
 @dataclass
 class FileStreamResponse(BaseResponse):
@@ -292,7 +777,7 @@ class FileStreamResponse(BaseResponse):
         chunk_size (int): The size of each chunk to stream. Default is 1024.
         content_type (str): The content type of the response.
         status_code (str): The status code of the response. Default is '200 OK'.
-        content (bytes): The content of the file as bytes.
+        content (bytes): Unused; the file is streamed rather than loaded.
 
     Methods:
         __post_init__():
@@ -300,6 +785,9 @@ class FileStreamResponse(BaseResponse):
         
         __iter__():
             Iterates over the file in chunks and yields each chunk.
+
+        iter_content():
+            Opens the file and returns a FileIterator over it.
     """
 
     file_path: str
@@ -313,7 +801,7 @@ class FileStreamResponse(BaseResponse):
         Initializes the FileStreamResponse and sets the content type.
         """
         super().__init__()
-        self.content_type = mimetypes.guess_type(self.file_path)[0]
+        self.content_type = mimetypes.guess_type(self.file_path)[0] or 'application/octet-stream'
 
     def __iter__(self):
         """
@@ -325,3 +813,406 @@ class FileStreamResponse(BaseResponse):
                 if not chunk:
                     break
                 yield chunk
+
+    def iter_content(self):
+        """
+        Opens the file and returns a FileIterator over it.
+
+        Returns:
+            FileIterator: The streamed file.
+        """
+        return FileIterator(open(self.file_path, "rb"), self.chunk_size)
+
+_HEARTBEAT = object()
+_LINE_BREAKS = re.compile(r"\r\n|\r|\n")
+
+def stream_items(source: any, encode: callable, prelude: bytes = b"", separator: bytes = b"", closing: bytes = b"", heartbeat: float = None, ping: bytes = b""):
+    """
+    Encodes the items of an iterable or asynchronous iterable one chunk per item.
+
+    'prelude' is sent right away, before the first item is produced, 'separator'
+    between items and 'closing' after the last one. With 'heartbeat', 'ping' is sent
+    whenever no item was produced for that many seconds; synchronous iterables are then
+    run in a thread of their own, so a blocked producer does not block the heartbeat.
+    That thread cannot be stopped while the iterable is blocked, so it outlives a
+    client that disconnects until the iterable produces its next item or finishes.
+
+    Args:
+        source (any): The iterable or asynchronous iterable producing the items.
+        encode (callable): Encodes an item into bytes.
+        prelude (bytes, optional): Sent before the first item. Defaults to nothing.
+        separator (bytes, optional): Sent between items. Defaults to nothing.
+        closing (bytes, optional): Sent after the last item. Defaults to nothing.
+        heartbeat (float, optional): Seconds without an item after which 'ping' is sent. Defaults to never.
+        ping (bytes, optional): The keep-alive chunk. Defaults to nothing.
+
+    Returns:
+        any: A generator, or an async generator when the source is asynchronous.
+    """
+    if hasattr(source, "__aiter__"):
+        return _stream_async_items(source, encode, prelude, separator, closing, heartbeat, ping)
+    return _stream_sync_items(source, encode, prelude, separator, closing, heartbeat, ping)
+
+def _stream_sync_items(source, encode, prelude, separator, closing, heartbeat, ping):
+    """
+    Synchronous implementation of stream_items.
+    """
+    items = iter(source) if heartbeat is None else _produce_in_thread(source, heartbeat)
+    try:
+        if prelude:
+            yield prelude
+        prefix = b""
+        for item in items:
+            if item is _HEARTBEAT:
+                yield ping
+                continue
+            yield prefix + encode(item)
+            prefix = separator
+        if closing:
+            yield closing
+    finally:
+        close = getattr(items, "close", None)
+        if close is not None:
+            close()
+
+async def _stream_async_items(source, encode, prelude, separator, closing, heartbeat, ping):
+    """
+    Asynchronous implementation of stream_items.
+    """
+    iterator = source.__aiter__()
+    pending = None
+    try:
+        if prelude:
+            yield prelude
+        prefix = b""
+        while True:
+            if heartbeat is None:
+                try:
+                    item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+            else:
+                # The pending step is kept across heartbeats rather than cancelled by a timeout
+                if pending is None:
+                    pending = asyncio.ensure_future(iterator.__anext__())
+                done, _ = await asyncio.wait((pending,), timeout=heartbeat)
+                if not done:
+                    yield ping
+                    continue
+                step, pending = pending, None
+                try:
+                    item = step.result()
+                except StopAsyncIteration:
+                    break
+            yield prefix + encode(item)
+            prefix = separator
+        if closing:
+            yield closing
+    finally:
+        if pending is not None:
+            pending.cancel()
+            await asyncio.wait((pending,))
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+def _produce_in_thread(source: any, interval: float):
+    """
+    Iterates over a synchronous iterable in a thread, yielding _HEARTBEAT while it is silent.
+
+    The producer thread runs in a copy of the caller's context, so it sees the current
+    request, and closes the iterable when the consumer stops early. A thread blocked
+    inside the iterable only notices this once the iterable returns control to it.
+
+    Args:
+        source (any): The iterable.
+        interval (float): Seconds without an item after which _HEARTBEAT is yielded.
+
+    Yields:
+        any: The items, interleaved with _HEARTBEAT.
+    """
+    queue = Queue(maxsize=64)
+    stopped = threading.Event()
+
+    def put(entry):
+        while not stopped.is_set():
+            try:
+                queue.put(entry, timeout=interval)
+                return True
+            except Full:
+                pass
+        return False
+
+    def produce():
+        iterator = iter(source)
+        try:
+            for item in iterator:
+                if not put((True, item)):
+                    return
+            put((False, None))
+        except BaseException as error:
+            put((False, error))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    context = copy_context()
+    threading.Thread(target=context.run, args=(produce,), name="vortexkit-stream", daemon=True).start()
+    try:
+        while True:
+            try:
+                more, item = queue.get(timeout=interval)
+            except Empty:
+                yield _HEARTBEAT
+                continue
+            if not more:
+                if item is not None:
+                    raise item
+                return
+            yield item
+    finally:
+        stopped.set()
+
+def encode_json_item(item: any) -> bytes:
+    """
+    Encodes a streamed item as JSON, passing pre-encoded bytes through.
+
+    Args:
+        item (any): The item.
+
+    Returns:
+        bytes: The JSON.
+    """
+    if isinstance(item, (bytes, bytearray, memoryview)):
+        return bytes(item)
+    return jsoncodec.dumps(item)
+
+def encode_json_line(item: any) -> bytes:
+    """
+    Encodes a streamed item as a line of newline-delimited JSON.
+
+    Args:
+        item (any): The item, or pre-encoded JSON bytes without the newline.
+
+    Returns:
+        bytes: The JSON followed by a newline.
+    """
+    return encode_json_item(item) + b"\n"
+
+@dataclass
+class NDJSONResponse(BaseResponse):
+    """
+    A response streaming newline-delimited JSON, one line per item.
+
+    Each item is encoded and sent as soon as the iterable produces it, so large results
+    are delivered at constant memory. Bytes are taken as already encoded JSON.
+
+    Attributes:
+        content (any): An iterable or asynchronous iterable producing the items.
+        content_type (str): The content type of the response ('application/x-ndjson').
+        status_code (str): The status code of the response. Default is '200 OK'.
+
+    Methods:
+        __post_init__():
+            Initializes the NDJSONResponse.
+
+        iter_content():
+            Returns the body as a stream of JSON lines.
+    """
+
+    content: any
+    content_type: str = field(default='application/x-ndjson', init=False)
+    status_code: str = "200 OK"
+
+    def __post_init__(self):
+        """
+        Initializes the NDJSONResponse.
+        """
+        super().__init__()
+
+    def iter_content(self):
+        """
+        Returns the body as a stream of JSON lines.
+
+        Returns:
+            StreamingBody: The streamed response body.
+        """
+        return StreamingBody(stream_items(self.content, encode_json_line))
+
+@dataclass
+class JSONArrayStreamResponse(BaseResponse):
+    """
+    A response streaming a JSON array, one element per item.
+
+    The opening bracket is sent immediately and each element as soon as the iterable
+    produces it, so clients expecting a plain JSON array can be served at constant
+    memory. Bytes are taken as already encoded JSON.
+
+    Attributes:
+        content (any): An iterable or asynchronous iterable producing the elements.
+        content_type (str): The content type of the response ('application/json').
+        status_code (str): The status code of the response. Default is '200 OK'.
+
+    Methods:
+        __post_init__():
+            Initializes the JSONArrayStreamResponse.
+
+        iter_content():
+            Returns the body as a stream of array elements.
+    """
+
+    content: any
+    content_type: str = field(default='application/json', init=False)
+    status_code: str = "200 OK"
+
+    def __post_init__(self):
+        """
+        Initializes the JSONArrayStreamResponse.
+        """
+        super().__init__()
+
+    def iter_content(self):
+        """
+        Returns the body as a stream of array elements.
+
+        Returns:
+            StreamingBody: The streamed response body.
+        """
+        return StreamingBody(stream_items(self.content, encode_json_item, b"[", b",", b"]"))
+
+class ServerSentEvent:
+    """
+    An event sent by SSEResponse.
+
+    Attributes:
+        data (any): The event data: str, bytes, or any other value sent as JSON.
+        event (str): The event type, or None for the default 'message'.
+        id (str): The event ID, reported back by reconnecting clients in Last-Event-ID.
+        retry (int): Milliseconds clients wait before reconnecting, or None.
+
+    Methods:
+        encode():
+            Serializes the event in the text/event-stream format.
+    """
+
+    __slots__ = ("data", "event", "id", "retry")
+
+    def __init__(self, data: any = None, event: str = None, id: str = None, retry: int = None) -> None:
+        """
+        Initializes a ServerSentEvent.
+
+        Args:
+            data (any, optional): The event data. Defaults to none.
+            event (str, optional): The event type. Defaults to 'message'.
+            id (str, optional): The event ID. Defaults to none.
+            retry (int, optional): Milliseconds clients wait before reconnecting. Defaults to none.
+
+        Raises:
+            ValueError: If the event type or ID contains a line break.
+        """
+        for value in (event, id):
+            if value is not None and _LINE_BREAKS.search(str(value)):
+                raise ValueError("Server-sent event types and IDs cannot contain line breaks")
+        self.data = data
+        self.event = event
+        self.id = id
+        self.retry = retry
+
+    def encode(self) -> bytes:
+        """
+        Serializes the event in the text/event-stream format.
+
+        Returns:
+            bytes: The event's fields followed by a blank line.
+        """
+        lines = []
+        if self.event is not None:
+            lines.append(f"event: {self.event}")
+        if self.id is not None:
+            lines.append(f"id: {self.id}")
+        if self.retry is not None:
+            lines.append(f"retry: {int(self.retry)}")
+        data = self.data
+        if data is not None:
+            if isinstance(data, (bytes, bytearray, memoryview)):
+                data = bytes(data).decode("utf-8")
+            elif not isinstance(data, str):
+                data = jsoncodec.dumps(data).decode("utf-8")
+            lines.extend("data: " + line for line in _LINE_BREAKS.split(data))
+        return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+    def __repr__(self):
+        return f"ServerSentEvent(data={self.data!r}, event={self.event!r}, id={self.id!r})"
+
+def encode_event(item: any) -> bytes:
+    """
+    Encodes a streamed item as a server-sent event.
+
+    Args:
+        item (any): A ServerSentEvent, or the data of an unnamed event.
+
+    Returns:
+        bytes: The serialized event.
+    """
+    if item.__class__ is not ServerSentEvent:
+        item = ServerSentEvent(item)
+    return item.encode()
+
+@dataclass
+class SSEResponse(BaseResponse):
+    """
+    A response streaming Server-Sent Events, one event per item.
+
+    Items are ServerSentEvent objects, or data sent as unnamed events. Each event is sent
+    as soon as the iterable produces it, and a comment line is sent every 'heartbeat'
+    seconds without events, so proxies and clients keep the connection open. 'retry'
+    is sent before the first event. Caching and proxy buffering are disabled.
+
+    Heartbeats are sent for asynchronous iterables. A synchronous iterable blocks the
+    thread writing the response, so it only gets heartbeats with 'heartbeat_thread',
+    which runs it in a thread of its own. That thread cannot be interrupted: when the
+    client disconnects while the iterable is blocked, it lingers until the iterable
+    produces its next item or finishes.
+
+    Attributes:
+        content (any): An iterable or asynchronous iterable producing the events.
+        content_type (str): The content type of the response ('text/event-stream; charset=utf-8').
+        status_code (str): The status code of the response. Default is '200 OK'.
+        retry (int): Milliseconds clients wait before reconnecting, or None to leave it to them.
+        heartbeat (float): Seconds without events after which a comment is sent, or None to never send one.
+        heartbeat_thread (bool): Whether a synchronous iterable is run in a thread so heartbeats are sent while it blocks.
+
+    Methods:
+        __post_init__():
+            Initializes the SSEResponse.
+
+        iter_content():
+            Returns the body as a stream of events.
+    """
+
+    content: any
+    content_type: str = field(default='text/event-stream; charset=utf-8', init=False)
+    status_code: str = "200 OK"
+    retry: int = None
+    heartbeat: float = 15.0
+    heartbeat_thread: bool = False
+
+    default_headers = (('Cache-Control', 'no-cache'), ('X-Accel-Buffering', 'no'))
+
+    def __post_init__(self):
+        """
+        Initializes the SSEResponse.
+        """
+        super().__init__()
+
+    def iter_content(self):
+        """
+        Returns the body as a stream of events and heartbeat comments.
+
+        Returns:
+            StreamingBody: The streamed response body.
+        """
+        prelude = f"retry: {int(self.retry)}\n\n".encode() if self.retry is not None else b""
+        heartbeat = self.heartbeat if self.heartbeat_thread or hasattr(self.content, "__aiter__") else None
+        return StreamingBody(stream_items(self.content, encode_event, prelude, heartbeat=heartbeat, ping=b": heartbeat\n\n"))
@@ -0,0 +1,452 @@
+import uuid
+
+
+class Converter:
+    """
+    Base class for path parameter converters.
+
+    A converter turns a single path segment into a Python value. Converters that
+    raise ValueError reject the segment, letting the router try the next candidate.
+
+    Attributes:
+        priority (int): Order in which sibling parameters are tried, lowest first.
+        greedy (bool): Whether the converter consumes the rest of the path.
+
+    Methods:
+        to_python(value):
+            Converts a raw path segment into a Python value.
+    """
+
+    priority: int = 50
+    greedy: bool = False
+
+    def to_python(self, value: str):
+        """
+        Converts a raw path segment into a Python value.
+
+        Args:
+            value (str): The raw path segment.
+
+        Returns:
+            any: The converted value.
+
+        Raises:
+            ValueError: If the segment is not valid for this converter.
+        """
+        if not value:
+            raise ValueError("Empty path segment")
+        return value
+
+class StringConverter(Converter):
+    """
+    Matches any non-empty path segment and passes it through as a string.
+    """
+
+    priority = 90
+
+class IntegerConverter(Converter):
+    """
+    Matches a path segment made up of digits and converts it to an int.
+    """
+
+    priority = 10
+
+    def to_python(self, value: str):
+        """
+        Converts the segment to an int.
+
+        Args:
+            value (str): The raw path segment.
+
+        Returns:
+            int: The converted value.
+
+        Raises:
+            ValueError: If the segment is not made up of digits.
+        """
+        if not value.isdigit():
+            raise ValueError("Not an integer")
+        return int(value)
+
+class FloatConverter(Converter):
+    """
+    Matches a path segment holding a decimal number and converts it to a float.
+    """
+
+    priority = 20
+
+    def to_python(self, value: str):
+        """
+        Converts the segment to a float.
+
+        Args:
+            value (str): The raw path segment.
+
+        Returns:
+            float: The converted value.
+
+        Raises:
+            ValueError: If the segment is not a plain decimal number.
+        """
+        if not value.replace(".", "", 1).isdigit():
+            raise ValueError("Not a float")
+        return float(value)
+
+class UUIDConverter(Converter):
+    """
+    Matches a path segment holding a UUID and converts it to a uuid.UUID.
+    """
+
+    priority = 30
+
+    def to_python(self, value: str):
+        """
+        Converts the segment to a UUID.
+
+        Args:
+            value (str): The raw path segment.
+
+        Returns:
+            uuid.UUID: The converted value.
+
+        Raises:
+            ValueError: If the segment is not a valid UUID.
+        """
+        if len(value) != 36:
+            raise ValueError("Not a UUID")
+        return uuid.UUID(value)
+
+class PathConverter(Converter):
+    """
+    Matches the remainder of the path, slashes included. Must be the last segment of a route.
+    """
+
+    priority = 100
+    greedy = True
+
+CONVERTERS = {
+    "str": StringConverter(),
+    "int": IntegerConverter(),
+    "float": FloatConverter(),
+    "uuid": UUIDConverter(),
+    "path": PathConverter(),
+}
+
+class Node:
+    """
+    A single node of the routing tree, representing one path segment.
+
+    Attributes:
+        static (dict): Child nodes keyed by literal segment.
+        params (list): Parameter children as (name, converter, node) tuples, sorted by converter priority.
+        catch_all (tuple): A (name, converter, route) tuple for a trailing greedy parameter, if any.
+        route (any): The route terminating at this node, if any.
+    """
+
+    __slots__ = ("static", "params", "catch_all", "route")
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty routing tree node.
+        """
+        self.static = {}
+        self.params = []
+        self.catch_all = None
+        self.route = None
+
+class Router:
+    """
+    Compiled router mapping path templates to routes.
+
+    Paths without parameters are stored in a flat dictionary and resolved with a single
+    lookup. Paths with parameters such as '/users/<int:id>' are compiled into a prefix
+    tree of segments, so matching costs one step per path segment regardless of how many
+    routes are registered.
+
+    Attributes:
+        static_routes (dict): Dictionary mapping literal paths to routes.
+        converters (dict): Dictionary mapping converter names to Converter instances.
+        root (Node): Root node of the dynamic routing tree.
+
+    Methods:
+        add(path, route):
+            Compiles a path template and registers the route under it.
+
+        match(path):
+            Resolves a request path into a route and its converted parameters.
+
+        add_converter(name, converter):
+            Registers a custom converter usable as '<name:param>'.
+
+        parameter_names(path):
+            Returns the names of the parameters captured by a path template.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes a new, empty Router.
+        """
+        self.static_routes = {}
+        self.converters = dict(CONVERTERS)
+        self.root = Node()
+
+    def add_converter(self, name: str, converter: Converter) -> None:
+        """
+        Registers a custom converter usable as '<name:param>'.
+
+        Args:
+            name (str): The name used in path templates.
+            converter (Converter): The converter instance.
+        """
+        self.converters[name] = converter
+
+    def _parse_segment(self, segment: str):
+        """
+        Parses a template segment into a (name, converter) tuple.
+
+        Args:
+            segment (str): A single segment of a path template.
+
+        Returns:
+            tuple: A (name, converter) tuple, or None for a literal segment.
+
+        Raises:
+            ValueError: If the segment is malformed or names an unknown converter.
+        """
+        if not segment.startswith("<"):
+            if "<" in segment or ">" in segment:
+                raise ValueError("Path parameters must span a whole segment")
+            return None
+        if not segment.endswith(">"):
+            raise ValueError("Path parameters must span a whole segment")
+
+        converter_name, _, name = segment[1:-1].rpartition(":")
+        converter_name = converter_name or "str"
+        if not name.isidentifier():
+            raise ValueError(f"Invalid path parameter name '{name}'")
+        if converter_name not in self.converters:
+            raise ValueError(f"Unknown path converter '{converter_name}'")
+        return name, self.converters[converter_name]
+
+    def parameter_names(self, path: str) -> tuple:
+        """
+        Returns the names of the parameters captured by a path template.
+
+        Args:
+            path (str): The path template, e.g. '/users/<int:id>'.
+
+        Returns:
+            tuple: The parameter names in order of appearance.
+
+        Raises:
+            ValueError: If the template is malformed or names an unknown converter.
+        """
+        if "<" not in path:
+            return ()
+        names = []
+        for segment in path[1:].split("/"):
+            parsed = self._parse_segment(segment)
+            if parsed is not None:
+                names.append(parsed[0])
+        return tuple(names)
+
+    def add(self, path: str, route: any) -> None:
+        """
+        Compiles a path template and registers the route under it.
+
+        Args:
+            path (str): The path template, e.g. '/users/<int:id>'.
+            route (any): The route to return when the path matches.
+
+        Raises:
+            ValueError: If the template is malformed or the route already exists.
+        """
+        if "<" not in path:
+            if path in self.static_routes:
+                raise ValueError("Route already exists")
+            self.static_routes[path] = route
+            return
+
+        segments = path[1:].split("/")
+        names = set()
+        node = self.root
+        for index, segment in enumerate(segments):
+            parsed = self._parse_segment(segment)
+            if parsed is None:
+                node = node.static.setdefault(segment, Node())
+                continue
+
+            name, converter = parsed
+            if name in names:
+                raise ValueError(f"Duplicate path parameter '{name}'")
+            names.add(name)
+
+            if converter.greedy:
+                if index != len(segments) - 1:
+                    raise ValueError("Greedy path parameters must be the last segment")
+                if node.catch_all is not None:
+                    raise ValueError("Route already exists")
+                node.catch_all = (name, converter, route)
+                return
+
+            for param_name, param_converter, child in node.params:
+                if param_converter is converter:
+                    if param_name != name:
+                        raise ValueError("Conflicting path parameter names for the same segment")
+                    node = child
+                    break
+            else:
+                child = Node()
+                node.params.append((name, converter, child))
+                node.params.sort(key=lambda param: param[1].priority)
+                node = child
+
+        if node.route is not None:
+            raise ValueError("Route already exists")
+        node.route = route
+
+    def _match(self, node: Node, segments: list, index: int, params: dict):
+        """
+        Walks the routing tree from the given node.
+
+        Args:
+            node (Node): The node to continue matching from.
+            segments (list): The request path split into segments.
+            index (int): The index of the segment to match next.
+            params (dict): Dictionary receiving the converted parameters.
+
+        Returns:
+            any: The matched route, or None.
+        """
+        if index == len(segments):
+            return node.route
+
+        segment = segments[index]
+        child = node.static.get(segment)
+        if child is not None:
+            route = self._match(child, segments, index + 1, params)
+            if route is not None:
+                return route
+
+        for name, converter, child in node.params:
+            try:
+                value = converter.to_python(segment)
+            except ValueError:
+                continue
+            route = self._match(child, segments, index + 1, params)
+            if route is not None:
+                params[name] = value
+                return route
+
+        if node.catch_all is not None:
+            name, converter, route = node.catch_all
+            try:
+                params[name] = converter.to_python("/".join(segments[index:]))
+            except ValueError:
+                return None
+            return route
+        return None
+
+    def match(self, path: str):
+        """
+        Resolves a request path into a route and its converted parameters.
+
+        Args:
+            path (str): The request path.
+
+        Returns:
+            tuple: A (route, params) tuple. The route is None when nothing matches.
+        """
+        route = self.static_routes.get(path)
+        if route is not None:
+            return route, {}
+        if not path or not path.startswith("/"):
+            return None, {}
+
+        params = {}
+        route = self._match(self.root, path[1:].split("/"), 0, params)
+        if route is None:
+            return None, {}
+        return route, params
+
+class MethodTable:
+    """
+    Per-path table mapping HTTP methods to routes.
+
+    The table is built when routes are registered, so the responses for disallowed
+    methods and OPTIONS requests are precomputed and never call into user code.
+    GET routes automatically answer HEAD requests unless HEAD is registered explicitly.
+
+    Attributes:
+        path (str): The path template the table belongs to.
+        handlers (dict): Dictionary mapping upper-case method names to routes. The key '*' matches any method.
+        explicit (set): Methods registered explicitly, as opposed to the implied HEAD.
+        allow (str): The value of the 'Allow' header for this path.
+        allow_headers (list): Precomputed headers for 405 and OPTIONS responses.
+
+    Methods:
+        add(route, methods):
+            Registers a route for the given methods.
+
+        get(method):
+            Returns the route registered for a method, or None.
+    """
+
+    __slots__ = ("path", "handlers", "explicit", "allow", "allow_headers")
+
+    def __init__(self, path: str) -> None:
+        """
+        Initializes an empty MethodTable.
+
+        Args:
+            path (str): The path template the table belongs to.
+        """
+        self.path = path
+        self.handlers = {}
+        self.explicit = set()
+        self.allow = ""
+        self.allow_headers = []
+
+    def add(self, route: any, methods: list = None) -> None:
+        """
+        Registers a route for the given methods.
+
+        Args:
+            route (any): The route to register.
+            methods (list, optional): HTTP methods the route accepts. None accepts every method.
+
+        Raises:
+            ValueError: If one of the methods is already registered for this path.
+        """
+        methods = ["*"] if methods is None else [method.upper() for method in methods]
+        if not methods:
+            raise ValueError("At least one method must be specified")
+        for method in methods:
+            if method in self.explicit:
+                raise ValueError("Route already exists")
+
+        for method in methods:
+            self.explicit.add(method)
+            self.handlers[method] = route
+        if "GET" in self.handlers and "HEAD" not in self.explicit:
+            self.handlers["HEAD"] = self.handlers["GET"]
+
+        allowed = set(self.handlers) - {"*"}
+        allowed.add("OPTIONS")
+        self.allow = ", ".join(sorted(allowed))
+        self.allow_headers = [("Allow", self.allow), ("Content-Length", "0")]
+
+    def get(self, method: str):
+        """
+        Returns the route registered for a method, falling back to the '*' route.
+
+        Args:
+            method (str): The upper-case HTTP method.
+
+        Returns:
+            any: The matching route, or None.
+        """
+        route = self.handlers.get(method)
+        if route is None:
+            return self.handlers.get("*")
+        return route
@@ -0,0 +1,1477 @@
+import asyncio
+import os
+import re
+import selectors
+import signal
+import socket
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from http import HTTPStatus
+from urllib.parse import unquote
+from wsgiref import simple_server
+from .accesslog import close_all as close_access_logs
+from .metrics import close_all as close_metrics
+
+STATUS_LINES = {status.value: f"HTTP/1.1 {status.value} {status.phrase}\r\n".encode("latin-1") for status in HTTPStatus}
+MAX_LINE_SIZE = 16 * 1024
+NO_BODY_STATUSES = (204, 304)
+CHUNK_SIZE_PATTERN = re.compile(rb"[0-9A-Fa-f]{1,16}")
+HEADER_NAME_PATTERN = re.compile(r"[!#$%&'*+\-.^_`|~0-9A-Za-z]+")
+
+def parse_chunk_size(line: bytes) -> int:
+    """
+    Parses the size of a chunk from its size line, ignoring chunk extensions.
+
+    Args:
+        line (bytes): The chunk size line.
+
+    Returns:
+        int: The size of the chunk.
+
+    Raises:
+        ValueError: If the size is not 1 to 16 hexadecimal digits.
+    """
+    size = line.split(b";", 1)[0].rstrip(b" \t\r\n")
+    if CHUNK_SIZE_PATTERN.fullmatch(size) is None:
+        raise ValueError("Malformed chunk size")
+    return int(size, 16)
+
+class QuietWSGIRequestHandler(simple_server.WSGIRequestHandler):
+    """
+    WSGIRequestHandler that does not write a log line to stderr for every request.
+    """
+
+    def log_message(self, format, *args):
+        """
+        Discards the per-request log message.
+        """
+        pass
+
+class LimitedInput:
+    """
+    Request body reader stopping at the end of a body of known length.
+
+    Used as 'wsgi.input' on persistent connections, so an application reading to the
+    end of its input never consumes the next request.
+
+    Attributes:
+        rfile: The connection's buffered reader.
+        remaining (int): Number of body bytes not read yet.
+    """
+
+    def __init__(self, rfile, length: int) -> None:
+        """
+        Initializes a LimitedInput.
+
+        Args:
+            rfile: The connection's buffered reader.
+            length (int): The length of the body.
+        """
+        self.rfile = rfile
+        self.remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Reads up to 'size' bytes of the body, or the rest of it.
+
+        Args:
+            size (int, optional): Maximum number of bytes to read. Defaults to the rest of the body.
+
+        Returns:
+            bytes: The data read, empty at the end of the body.
+        """
+        if self.remaining <= 0:
+            return b""
+        data = self.rfile.read(self.remaining if size is None or size < 0 else min(size, self.remaining))
+        self.remaining = self.remaining - len(data) if data else 0
+        return data
+
+    def readline(self, size: int = -1) -> bytes:
+        """
+        Reads a line of the body.
+
+        Args:
+            size (int, optional): Maximum number of bytes to read.
+
+        Returns:
+            bytes: The line, empty at the end of the body.
+        """
+        if self.remaining <= 0:
+            return b""
+        data = self.rfile.readline(self.remaining if size is None or size < 0 else min(size, self.remaining))
+        self.remaining = self.remaining - len(data) if data else 0
+        return data
+
+    def __iter__(self):
+        return iter(self.readline, b"")
+
+    def drain(self, limit: int) -> bool:
+        """
+        Discards the unread part of the body so the next request can be read.
+
+        Args:
+            limit (int): Maximum number of bytes to discard.
+
+        Returns:
+            bool: True if the whole body has been consumed.
+        """
+        while 0 < self.remaining <= limit:
+            limit -= len(self.read(min(self.remaining, 64 * 1024)))
+        return self.remaining <= 0
+
+class ChunkedInput(LimitedInput):
+    """
+    Request body reader decoding 'Transfer-Encoding: chunked'.
+
+    Attributes:
+        rfile: The connection's buffered reader.
+        remaining (int): Number of bytes left in the current chunk.
+        done (bool): Whether the last chunk and trailers have been read.
+        malformed (bool): Whether the chunk framing was found to be malformed.
+    """
+
+    def __init__(self, rfile) -> None:
+        """
+        Initializes a ChunkedInput.
+
+        Args:
+            rfile: The connection's buffered reader.
+        """
+        super().__init__(rfile, 0)
+        self.done = False
+        self.malformed = False
+
+    def _next_chunk(self) -> None:
+        """
+        Reads the next chunk size line, and the trailers after the last chunk.
+
+        Raises:
+            ValueError: If the chunk framing is malformed.
+        """
+        line = self.rfile.readline(MAX_LINE_SIZE)
+        try:
+            if not line.endswith(b"\n"):
+                raise ValueError("Malformed chunked request body")
+            self.remaining = parse_chunk_size(line)
+        except ValueError:
+            self.malformed = True
+            raise
+        if self.remaining == 0:
+            while self.rfile.readline(MAX_LINE_SIZE) not in (b"\r\n", b"\n", b""):
+                pass
+            self.done = True
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Reads up to 'size' bytes of the decoded body, or the rest of it.
+
+        Args:
+            size (int, optional): Maximum number of bytes to read. Defaults to the rest of the body.
+
+        Returns:
+            bytes: The data read, empty at the end of the body.
+
+        Raises:
+            ValueError: If the chunk framing is malformed or the body is truncated.
+        """
+        if size is None:
+            size = -1
+        chunks = []
+        while not self.done and size != 0:
+            if self.remaining == 0:
+                self._next_chunk()
+                continue
+            data = self.rfile.read(self.remaining if size < 0 else min(size, self.remaining))
+            if not data:
+                raise ValueError("Truncated chunked request body")
+            chunks.append(data)
+            self.remaining -= len(data)
+            if size > 0:
+                size -= len(data)
+            if self.remaining == 0:
+                self.rfile.readline(MAX_LINE_SIZE)
+        return b"".join(chunks)
+
+    def readline(self, size: int = -1) -> bytes:
+        """
+        Reads a line of the decoded body.
+
+        Args:
+            size (int, optional): Maximum number of bytes to read.
+
+        Returns:
+            bytes: The line, empty at the end of the body.
+        """
+        line = bytearray()
+        while size is None or size < 0 or len(line) < size:
+            byte = self.read(1)
+            if not byte:
+                break
+            line += byte
+            if byte == b"\n":
+                break
+        return bytes(line)
+
+    def drain(self, limit: int) -> bool:
+        """
+        Discards the unread part of the body so the next request can be read.
+
+        Args:
+            limit (int): Maximum number of bytes to discard.
+
+        Returns:
+            bool: True if the whole body has been consumed.
+        """
+        try:
+            while not self.done and limit > 0:
+                limit -= len(self.read(min(limit, 64 * 1024))) or 1
+        except ValueError:
+            return False
+        return self.done
+
+class KeepAliveServerHandler(simple_server.ServerHandler):
+    """
+    ServerHandler speaking HTTP/1.1 on a persistent connection.
+
+    Bodies of known total length get a Content-Length header, other bodies are sent
+    with chunked transfer encoding to HTTP/1.1 clients, and files handed to
+    'wsgi.file_wrapper' are sent with socket.sendfile. Writes register the handler in the
+    server's 'writers' while they block and record its 'last_progress' when they
+    complete, so a worker streaming long responses is not mistaken for a hung one.
+
+    Attributes:
+        keep_alive (bool): Whether the connection can carry another request after this one.
+        chunked (bool): Whether the response body is sent with chunked transfer encoding.
+    """
+
+    http_version = "1.1"
+    keep_alive = True
+    chunked = False
+
+    def set_content_length(self) -> None:
+        """
+        Sets Content-Length for bodies given as a list or tuple of byte strings.
+
+        HEAD responses are left alone, as their empty body says nothing about the length.
+        """
+        if self.environ["REQUEST_METHOD"] == "HEAD":
+            return
+        if isinstance(self.result, (list, tuple)):
+            self.headers["Content-Length"] = str(sum(map(len, self.result)))
+            return
+        super().set_content_length()
+
+    def cleanup_headers(self) -> None:
+        """
+        Chooses how the body is delimited and sets the Connection header.
+        """
+        super().cleanup_headers()
+        status = int(self.status[:3])
+        has_body = self.environ["REQUEST_METHOD"] != "HEAD" and status >= 200 and status not in NO_BODY_STATUSES
+        if "Content-Length" not in self.headers and has_body:
+            if self.environ["SERVER_PROTOCOL"] == "HTTP/1.1":
+                self.headers["Transfer-Encoding"] = "chunked"
+                self.chunked = True
+            else:
+                self.keep_alive = False
+
+        if not self.keep_alive:
+            self.headers["Connection"] = "close"
+        elif self.environ["SERVER_PROTOCOL"] != "HTTP/1.1":
+            self.headers["Connection"] = "keep-alive"
+
+    def write(self, data: bytes) -> None:
+        """
+        Writes a piece of the body, framing it as a chunk when needed.
+
+        Args:
+            data (bytes): The data to write.
+        """
+        if not self.status:
+            raise AssertionError("write() before start_response()")
+        if not self.headers_sent:
+            self.bytes_sent = len(data)
+            self.send_headers()
+        else:
+            self.bytes_sent += len(data)
+
+        server = self.request_handler.server
+        server.writers.add(self)
+        try:
+            if self.chunked:
+                if data:
+                    self._write(b"%x\r\n%b\r\n" % (len(data), data))
+            else:
+                self._write(data)
+            self._flush()
+        finally:
+            server.writers.discard(self)
+        server.last_progress = time.monotonic()
+
+    def finish_content(self) -> None:
+        """
+        Ensures the headers were sent and terminates a chunked body.
+        """
+        if not self.headers_sent and self.environ["REQUEST_METHOD"] == "HEAD":
+            self.send_headers()
+        else:
+            super().finish_content()
+        if self.chunked:
+            self._write(b"0\r\n\r\n")
+            self._flush()
+
+    def sendfile(self) -> bool:
+        """
+        Sends a wrapped file with socket.sendfile when its length is known.
+
+        Returns:
+            bool: True if the file was sent.
+        """
+        file = self.result.filelike
+        length = self.headers.get("Content-Length")
+        if length is None or not length.isdigit():
+            return False
+        try:
+            file.fileno()
+        except (AttributeError, OSError):
+            return False
+
+        if not self.headers_sent:
+            self.bytes_sent = int(length)
+            self.send_headers()
+        if self.environ["REQUEST_METHOD"] != "HEAD":
+            server = self.request_handler.server
+            server.writers.add(self)
+            try:
+                self.request_handler.connection.sendfile(file, file.tell(), int(length))
+            finally:
+                server.writers.discard(self)
+            server.last_progress = time.monotonic()
+        return True
+
+    def handle_error(self) -> None:
+        """
+        Closes the connection after an application error.
+
+        An error caused by malformed chunk framing in the request body is answered
+        with '400 Bad Request' instead of being logged as an application error.
+        """
+        self.keep_alive = False
+        if not getattr(self.stdin, "malformed", False):
+            super().handle_error()
+        elif not self.headers_sent:
+            self.error_status = "400 Bad Request"
+            self.error_body = b""
+            self.result = self.error_output(self.environ, self.start_response)
+            self.finish_response()
+
+class KeepAliveWSGIRequestHandler(QuietWSGIRequestHandler):
+    """
+    WSGIRequestHandler serving several HTTP/1.1 requests over a persistent connection.
+
+    'handle' serves the requests already waiting on the connection and returns with
+    'keep_alive' set when the connection should be kept open, so the server can wait
+    for the next request without tying up a thread. Nagle's algorithm is disabled, as the
+    response head is written in several small writes that would otherwise wait for the
+    client's delayed acknowledgement on every request.
+
+    Attributes:
+        requests_handled (int): The number of requests served on the connection.
+        keep_alive (bool): Whether the connection is waiting for another request.
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    max_drain = 64 * 1024
+
+    def setup(self) -> None:
+        """
+        Applies the server's idle timeout to the connection and resets its counters.
+        """
+        self.timeout = self.server.keepalive_timeout
+        super().setup()
+        self.requests_handled = 0
+        self.keep_alive = False
+
+    def handle(self) -> None:
+        """
+        Serves the requests already waiting on the connection.
+        """
+        while True:
+            self.keep_alive = self._handle_one()
+            self.requests_handled += 1
+            if self.requests_handled >= self.server.max_keepalive_requests:
+                self.keep_alive = False
+            if not self.keep_alive or not self._has_buffered_input():
+                return
+
+    def _has_buffered_input(self) -> bool:
+        """
+        Checks without blocking whether the client has already sent another request.
+
+        Returns:
+            bool: True if more data is waiting.
+        """
+        self.connection.setblocking(False)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def _handle_one(self) -> bool:
+        """
+        Reads one request, runs the application and writes its response.
+
+        Returns:
+            bool: True if the connection can carry another request.
+        """
+        try:
+            self.raw_requestline = self.rfile.readline(65537)
+        except OSError:
+            return False
+        if not self.raw_requestline:
+            return False
+        if len(self.raw_requestline) > 65536:
+            self.requestline = ""
+            self.request_version = ""
+            self.command = ""
+            self.send_error(414)
+            return False
+        if not self.parse_request():
+            return False
+
+        self.server.last_progress = time.monotonic()
+        # Lines the header parser could not read, such as a name followed by whitespace, end up as defects
+        if self.headers.defects:
+            self.send_error(400, "Malformed header")
+            return False
+        lengths = self.headers.get_all("Content-Length", [])
+        transfer_encoding = ", ".join(self.headers.get_all("Transfer-Encoding", [])).lower()
+        # Ambiguous framing could desynchronise the connection from a proxy in front of it (RFC 9112 6.3)
+        if len(lengths) > 1 or (lengths and transfer_encoding):
+            self.send_error(400, "Ambiguous request framing")
+            return False
+        environ = self.get_environ()
+        if transfer_encoding:
+            if transfer_encoding != "chunked":
+                self.send_error(501, "Unsupported Transfer-Encoding")
+                return False
+            body = ChunkedInput(self.rfile)
+            environ.pop("CONTENT_LENGTH", None)
+        else:
+            length = environ.get("CONTENT_LENGTH") or "0"
+            if not length.isdigit():
+                self.send_error(400, "Invalid Content-Length")
+                return False
+            body = LimitedInput(self.rfile, int(length))
+        environ["wsgi.input_terminated"] = True
+
+        handler = KeepAliveServerHandler(body, self.wfile, self.get_stderr(), environ)
+        handler.request_handler = self
+        # The last request allowed on the connection announces the close in its response
+        handler.keep_alive = not self.close_connection and self.requests_handled + 1 < self.server.max_keepalive_requests
+        handler.run(self.server.get_app())
+        return handler.keep_alive and body.drain(self.max_drain)
+
+    def finish(self) -> None:
+        """
+        Closes the connection's streams unless it is kept open for another request.
+        """
+        if not self.keep_alive:
+            super().finish()
+
+    def close(self) -> None:
+        """
+        Closes the connection's streams.
+        """
+        self.keep_alive = False
+        super().finish()
+
+class ThreadPoolWSGIServer(simple_server.WSGIServer):
+    """
+    WSGI server handling connections on a bounded pool of threads.
+
+    When every thread is busy the accept loop waits, leaving new connections in the
+    kernel backlog where another worker process sharing the socket can pick them up.
+
+    Connections are persistent: after a response, an idle connection is handed to a
+    selector thread rather than holding a pool thread, and returns to the pool when the
+    client sends its next request. Idle connections are closed after 'keepalive_timeout'
+    seconds and every connection after 'max_keepalive_requests' requests.
+
+    Attributes:
+        threads (int): The number of threads handling connections.
+        max_requests (int): Number of requests after which the server stops, or 0 for no limit.
+        reuse_port (bool): Whether the socket is bound with SO_REUSEPORT.
+        keepalive_timeout (float): Seconds an idle connection is kept open.
+        max_keepalive_requests (int): Maximum number of requests served on one connection.
+        handled (int): The number of requests handled so far.
+        last_progress (float): time.monotonic() of the latest request started or body data written.
+        writers (set): Handlers currently writing response data, bounded by the connection's timeout.
+        pool (ThreadPoolExecutor): The pool running the connections.
+
+    Methods:
+        process_request(request, client_address):
+            Hands an accepted connection to the thread pool.
+
+        probe(callback):
+            Calls a function on a pool thread as soon as one is free.
+    """
+
+    request_queue_size = 1024
+    allow_reuse_address = True
+
+    def __init__(self, server_address: tuple, app: callable, threads: int = 8, max_requests: int = 0, listen_socket: socket.socket = None, reuse_port: bool = False, handler_class: type = KeepAliveWSGIRequestHandler, keepalive_timeout: float = 5, max_keepalive_requests: int = 100) -> None:
+        """
+        Initializes the server, binding a new socket or adopting an already listening one.
+
+        Args:
+            server_address (tuple): The (host, port) to listen on.
+            app (callable): The WSGI application.
+            threads (int, optional): The number of threads handling connections. Defaults to 8.
+            max_requests (int, optional): Number of requests after which the server stops. Defaults to no limit.
+            listen_socket (socket.socket, optional): An already listening socket to serve from.
+            reuse_port (bool, optional): Whether to bind the socket with SO_REUSEPORT.
+            handler_class (type, optional): The request handler class.
+            keepalive_timeout (float, optional): Seconds an idle connection is kept open. Defaults to 5.
+            max_keepalive_requests (int, optional): Maximum number of requests served on one connection. Defaults to 100.
+        """
+        self.threads = threads
+        self.max_requests = max_requests
+        self.reuse_port = reuse_port
+        self.keepalive_timeout = keepalive_timeout
+        self.max_keepalive_requests = max_keepalive_requests
+        self.handled = 0
+        self.last_progress = time.monotonic()
+        self.writers = set()
+        self._count_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(threads)
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="vortexkit")
+        self._selector = selectors.DefaultSelector()
+        self._parked = []
+        self._park_lock = threading.Lock()
+        self._wakeup, self._wakeup_writer = socket.socketpair()
+        self._wakeup.setblocking(False)
+        self._selector.register(self._wakeup, selectors.EVENT_READ)
+        self._closing = False
+        self._poller = threading.Thread(target=self._poll_idle, name="vortexkit-keepalive", daemon=True)
+        self._poller.start()
+        super().__init__(server_address, handler_class, bind_and_activate=listen_socket is None)
+
+        if listen_socket is not None:
+            self.socket.close()
+            self.socket = listen_socket
+            self.server_address = listen_socket.getsockname()
+            host, port = self.server_address[:2]
+            self.server_name = socket.getfqdn(host)
+            self.server_port = port
+            self.setup_environ()
+        self.set_app(app)
+
+    def server_bind(self) -> None:
+        """
+        Binds the socket, enabling SO_REUSEPORT first if requested.
+        """
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+    def process_request(self, request, client_address) -> None:
+        """
+        Hands an accepted connection to the thread pool, waiting for a free thread.
+
+        Args:
+            request: The accepted connection.
+            client_address: The address of the client.
+        """
+        self._slots.acquire()
+        self.pool.submit(self._process_request, request, client_address)
+
+    def probe(self, callback: callable) -> None:
+        """
+        Calls a function on a pool thread as soon as one is free.
+
+        The call waits behind the queued connections, so it does not happen while every
+        thread is busy, which the Arbiter's heartbeat relies on together with 'last_progress'.
+
+        Args:
+            callback (callable): The function, called without arguments.
+        """
+        try:
+            self.pool.submit(callback)
+        except RuntimeError:
+            pass
+
+    def finish_request(self, request, client_address):
+        """
+        Serves the first requests of a connection.
+
+        Args:
+            request: The accepted connection.
+            client_address: The address of the client.
+
+        Returns:
+            KeepAliveWSGIRequestHandler: The connection's handler.
+        """
+        return self.RequestHandlerClass(request, client_address, self)
+
+    def _process_request(self, request, client_address, handler=None) -> None:
+        """
+        Serves a connection on a pool thread, then parks or closes it.
+
+        Args:
+            request: The connection.
+            client_address: The address of the client.
+            handler (KeepAliveWSGIRequestHandler, optional): The handler of a connection returning from the selector.
+        """
+        resumed = handler is not None
+        served = handler.requests_handled if resumed else 0
+        keep_alive = False
+        try:
+            if resumed:
+                handler.handle()
+            else:
+                handler = self.finish_request(request, client_address)
+            keep_alive = getattr(handler, "keep_alive", False) and not self._closing
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            if keep_alive:
+                self._park(request, handler)
+            else:
+                if handler is not None and hasattr(handler, "close"):
+                    handler.close()
+                self.shutdown_request(request)
+            if not resumed:
+                self._slots.release()
+            if self.max_requests:
+                requests = getattr(handler, "requests_handled", 1) - served if handler is not None else 1
+                with self._count_lock:
+                    recycle = self.handled < self.max_requests <= self.handled + requests
+                    self.handled += requests
+                if recycle:
+                    threading.Thread(target=self.shutdown, daemon=True).start()
+
+    def _park(self, request, handler) -> None:
+        """
+        Hands an idle connection to the selector thread.
+
+        Args:
+            request: The connection.
+            handler (KeepAliveWSGIRequestHandler): The connection's handler.
+        """
+        with self._park_lock:
+            self._parked.append((request, handler))
+        self._wakeup_writer.send(b"\0")
+
+    def _poll_idle(self) -> None:
+        """
+        Waits for idle connections to send their next request, closing them after the idle timeout.
+        """
+        idle = {}
+        while not self._closing:
+            events = self._selector.select(timeout=min(1.0, self.keepalive_timeout))
+            now = time.monotonic()
+            for key, _ in events:
+                if key.fileobj is self._wakeup:
+                    try:
+                        self._wakeup.recv(4096)
+                    except BlockingIOError:
+                        pass
+                    with self._park_lock:
+                        parked, self._parked = self._parked, []
+                    for request, handler in parked:
+                        idle[request] = (handler, now + self.keepalive_timeout)
+                        self._selector.register(request, selectors.EVENT_READ)
+                    continue
+                request = key.fileobj
+                self._selector.unregister(request)
+                handler, _ = idle.pop(request)
+                try:
+                    self.pool.submit(self._process_request, request, handler.client_address, handler)
+                except RuntimeError:
+                    handler.close()
+                    self.shutdown_request(request)
+
+            for request, (handler, deadline) in list(idle.items()):
+                if deadline <= now:
+                    del idle[request]
+                    self._selector.unregister(request)
+                    handler.close()
+                    self.shutdown_request(request)
+
+        for request, (handler, _) in idle.items():
+            handler.close()
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        """
+        Closes the socket, waits for in-flight requests and closes idle connections.
+        """
+        super().server_close()
+        self._closing = True
+        self._wakeup_writer.send(b"\0")
+        self.pool.shutdown(wait=True)
+        self._poller.join()
+        with self._park_lock:
+            parked, self._parked = self._parked, []
+        for request, handler in parked:
+            handler.close()
+            self.shutdown_request(request)
+        self._selector.close()
+        self._wakeup.close()
+        self._wakeup_writer.close()
+
+class AsyncHTTPServer:
+    """
+    HTTP/1.1 server running an ASGI application on an asyncio event loop.
+
+    Every connection is handled by a task rather than a thread, so an application whose
+    handlers await their I/O can keep thousands of requests in flight in one process.
+    Connections are persistent, closed after 'keepalive_timeout' idle seconds or
+    'max_keepalive_requests' requests. Chunked request bodies are decoded, and responses
+    of unknown length are sent with chunked transfer encoding. WebSocket upgrades are handed to the
+    application as 'websocket' scopes whose 'vortexkit.websocket' extension holds the
+    connection's (reader, writer) streams, so it can speak the protocol directly, and
+    are closed with 'going away' on shutdown. The server offers the same
+    'serve_forever', 'shutdown' and 'server_close' methods as the socketserver based
+    servers, so it can also run inside Arbiter workers.
+
+    Attributes:
+        server_address (tuple): The (host, port) to listen on.
+        app (callable): The ASGI application.
+        max_requests (int): Number of requests after which the server stops, or 0 for no limit.
+        reuse_port (bool): Whether the socket is bound with SO_REUSEPORT.
+        keepalive_timeout (float): Seconds an idle connection is kept open.
+        max_keepalive_requests (int): Maximum number of requests served on one connection.
+        handled (int): The number of requests handled so far.
+        last_progress (float): time.monotonic() of the latest request started.
+
+    Methods:
+        serve_forever(poll_interval=0.5):
+            Runs the event loop and serves requests until shutdown() is called.
+
+        shutdown():
+            Stops the server from any thread, letting in-flight requests finish.
+
+        server_close():
+            Closes the listening socket.
+
+        probe(callback):
+            Calls a function on the event loop.
+    """
+
+    request_queue_size = 1024
+    max_line_size = MAX_LINE_SIZE
+    max_header_count = 100
+    max_drain = 64 * 1024
+    chunk_size = 64 * 1024
+
+    def __init__(self, server_address: tuple, app: callable, max_requests: int = 0, listen_socket: socket.socket = None, reuse_port: bool = False, keepalive_timeout: float = 5, max_keepalive_requests: int = 100) -> None:
+        """
+        Initializes the server, binding a new socket or adopting an already listening one.
+
+        Args:
+            server_address (tuple): The (host, port) to listen on.
+            app (callable): The ASGI application.
+            max_requests (int, optional): Number of requests after which the server stops. Defaults to no limit.
+            listen_socket (socket.socket, optional): An already listening socket to serve from.
+            reuse_port (bool, optional): Whether to bind the socket with SO_REUSEPORT.
+            keepalive_timeout (float, optional): Seconds an idle connection is kept open. Defaults to 5.
+            max_keepalive_requests (int, optional): Maximum number of requests served on one connection. Defaults to 100.
+        """
+        self.server_address = server_address
+        self.app = app
+        self.max_requests = max_requests
+        self.reuse_port = reuse_port
+        self.keepalive_timeout = keepalive_timeout
+        self.max_keepalive_requests = max_keepalive_requests
+        self.handled = 0
+        self.last_progress = time.monotonic()
+        if listen_socket is None:
+            listen_socket = socket.create_server(server_address, backlog=self.request_queue_size, reuse_port=reuse_port)
+        self.socket = listen_socket
+        self.server_address = listen_socket.getsockname()[:2]
+        self._loop = None
+        self._stopping = None
+        self._shutdown_requested = False
+        self._tasks = set()
+        self._idle_tasks = set()
+        self._websocket_tasks = set()
+
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        """
+        Runs the event loop and serves requests until shutdown() is called.
+
+        Args:
+            poll_interval (float, optional): Unused, accepted for compatibility with socketserver.
+        """
+        asyncio.run(self._serve())
+
+    def shutdown(self) -> None:
+        """
+        Stops the server from any thread, letting in-flight requests finish.
+        """
+        self._shutdown_requested = True
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+
+    def server_close(self) -> None:
+        """
+        Closes the listening socket.
+        """
+        self.socket.close()
+
+    def probe(self, callback: callable) -> None:
+        """
+        Calls a function on the event loop, from any thread.
+
+        The call does not happen while the loop is blocked, which is what the Arbiter's
+        heartbeat relies on. Before the loop starts, the function is called directly.
+
+        Args:
+            callback (callable): The function, called without arguments.
+        """
+        if self._loop is None:
+            callback()
+            return
+        try:
+            self._loop.call_soon_threadsafe(callback)
+        except RuntimeError:
+            pass
+
+    async def _serve(self) -> None:
+        """
+        Accepts connections until shutdown, then waits for in-flight connections.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        if self._shutdown_requested:
+            return
+        server = await asyncio.start_server(self._connection, sock=self.socket, limit=self.max_line_size)
+        async with server:
+            await self._stopping.wait()
+        for task in self._idle_tasks | self._websocket_tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.wait(self._tasks)
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serves requests on a connection until it closes, idles out or reaches its request limit.
+
+        Args:
+            reader (asyncio.StreamReader): The connection's read side.
+            writer (asyncio.StreamWriter): The connection's write side.
+        """
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            served = 0
+            keep_alive = True
+            while keep_alive and served < self.max_keepalive_requests and not self._stopping.is_set():
+                self._idle_tasks.add(task)
+                try:
+                    head = await asyncio.wait_for(self._read_head(reader, writer), self.keepalive_timeout)
+                except asyncio.TimeoutError:
+                    return
+                finally:
+                    self._idle_tasks.discard(task)
+                if head is None:
+                    return
+                served += 1
+                self.last_progress = time.monotonic()
+                keep_alive = await self._handle(reader, writer, *head, last=served >= self.max_keepalive_requests)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._tasks.discard(task)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    def _error(self, writer: asyncio.StreamWriter, status: int) -> None:
+        """
+        Writes an empty error response.
+
+        Args:
+            writer (asyncio.StreamWriter): The connection's write side.
+            status (int): The status code.
+        """
+        writer.write(STATUS_LINES[status] + b"Content-Length: 0\r\nConnection: close\r\n\r\n")
+
+    async def _read_head(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Reads and parses the request line and headers.
+
+        Args:
+            reader (asyncio.StreamReader): The connection's read side.
+            writer (asyncio.StreamWriter): The connection's write side.
+
+        Returns:
+            tuple: The method, target, HTTP version and list of (name, value) header tuples,
+            or None if the connection closed or an error response was written.
+        """
+        try:
+            line = await reader.readline()
+            if not line:
+                return None
+            try:
+                method, target, version = line.decode("latin-1").rstrip("\r\n").split(" ")
+            except ValueError:
+                self._error(writer, 400)
+                return None
+            if not version.startswith("HTTP/"):
+                self._error(writer, 400)
+                return None
+
+            headers = []
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return None
+                if line in (b"\r\n", b"\n"):
+                    break
+                if len(headers) >= self.max_header_count:
+                    self._error(writer, 431)
+                    return None
+                name, separator, value = line.decode("latin-1").partition(":")
+                if not separator or HEADER_NAME_PATTERN.fullmatch(name) is None:
+                    self._error(writer, 400)
+                    return None
+                headers.append((name.lower().encode("latin-1"), value.strip().encode("latin-1")))
+        except ValueError:
+            self._error(writer, 431)
+            return None
+        return method.upper(), target, version[5:], headers
+
+    async def _fixed_body(self, reader: asyncio.StreamReader, length: int):
+        """
+        Yields a request body of known length in chunks.
+
+        Args:
+            reader (asyncio.StreamReader): The connection's read side.
+            length (int): The length of the body.
+
+        Yields:
+            bytes: The next chunk of the body.
+        """
+        while length:
+            chunk = await reader.read(min(length, self.chunk_size))
+            if not chunk:
+                raise ConnectionError("Client disconnected")
+            length -= len(chunk)
+            yield chunk
+
+    async def _chunked_body(self, reader: asyncio.StreamReader):
+        """
+        Yields a request body sent with chunked transfer encoding, decoded.
+
+        Args:
+            reader (asyncio.StreamReader): The connection's read side.
+
+        Yields:
+            bytes: The next piece of the body.
+
+        Raises:
+            ValueError: If the chunk framing is malformed.
+        """
+        while True:
+            line = await reader.readline()
+            if not line.endswith(b"\n"):
+                raise ConnectionError("Client disconnected")
+            size = parse_chunk_size(line)
+            if size == 0:
+                while await reader.readline() not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            while size:
+                chunk = await reader.read(min(size, self.chunk_size))
+                if not chunk:
+                    raise ConnectionError("Client disconnected")
+                size -= len(chunk)
+                yield chunk
+            await reader.readline()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, method: str, target: str, version: str, headers: list, last: bool = False) -> bool:
+        """
+        Runs the application for a parsed request and writes its response.
+
+        Args:
+            reader (asyncio.StreamReader): The connection's read side.
+            writer (asyncio.StreamWriter): The connection's write side.
+            method (str): The request method.
+            target (str): The request target.
+            version (str): The HTTP version, such as '1.1'.
+            headers (list): List of (name, value) header tuples.
+            last (bool, optional): Whether this is the last request allowed on the connection. Defaults to False.
+
+        Returns:
+            bool: True if the connection can carry another request.
+        """
+        content_length = None
+        chunked = upgrade = False
+        connection = b""
+        for name, value in headers:
+            if name == b"upgrade":
+                upgrade = value.lower() == b"websocket"
+            elif name == b"content-length":
+                if not value.isdigit() or content_length is not None:
+                    self._error(writer, 400)
+                    return False
+                content_length = int(value)
+            elif name == b"transfer-encoding":
+                if value.lower() != b"chunked" or chunked:
+                    self._error(writer, 501)
+                    return False
+                chunked = True
+            elif name == b"connection":
+                connection = value.lower()
+        # Ambiguous framing could desynchronise the connection from a proxy in front of it (RFC 9112 6.3)
+        if chunked and content_length is not None:
+            self._error(writer, 400)
+            return False
+        keep_alive = not last and (b"close" not in connection if version == "1.1" else b"keep-alive" in connection)
+
+        path, _, query = target.partition("?")
+        if upgrade and method == "GET":
+            await self._websocket(reader, writer, version, path, query, headers)
+            return False
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": version,
+            "method": method,
+            "scheme": "http",
+            "path": unquote(path),
+            "raw_path": path.encode("latin-1"),
+            "query_string": query.encode("latin-1"),
+            "root_path": "",
+            "headers": headers,
+            "client": writer.get_extra_info("peername")[:2],
+            "server": self.server_address,
+        }
+
+        body = self._chunked_body(reader) if chunked else self._fixed_body(reader, content_length or 0)
+        body_complete = malformed = False
+        response_done = asyncio.Event()
+        response = {"start": None, "sent": False, "chunked": False}
+
+        async def receive():
+            nonlocal body_complete, keep_alive, malformed
+            if body_complete:
+                await response_done.wait()
+                return {"type": "http.disconnect"}
+            try:
+                chunk = await body.__anext__()
+            except StopAsyncIteration:
+                body_complete = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            except (ConnectionError, asyncio.IncompleteReadError):
+                body_complete = True
+                keep_alive = False
+                return {"type": "http.disconnect"}
+            except ValueError:
+                # Malformed chunk framing, answered with 400 once the application returns
+                body_complete = malformed = True
+                keep_alive = False
+                return {"type": "http.disconnect"}
+            return {"type": "http.request", "body": chunk, "more_body": True}
+
+        async def send(message):
+            nonlocal keep_alive
+            if message["type"] == "http.response.start":
+                response["start"] = message
+                return
+            if message["type"] != "http.response.body" or response_done.is_set():
+                return
+            data = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if not response["sent"]:
+                head, response["chunked"], keep_alive = self._response_head(response["start"], method, version, keep_alive, None if more_body else len(data))
+                writer.write(head)
+                response["sent"] = True
+            if data and method != "HEAD":
+                writer.write(b"%x\r\n%b\r\n" % (len(data), data) if response["chunked"] else data)
+            if not more_body:
+                if response["chunked"]:
+                    writer.write(b"0\r\n\r\n")
+                response_done.set()
+            await writer.drain()
+
+        try:
+            await self.app(scope, receive, send)
+        except Exception:
+            traceback.print_exc()
+            keep_alive = False
+            if not response["sent"]:
+                self._error(writer, 400 if malformed else 500)
+        else:
+            if not response_done.is_set():
+                keep_alive = False
+                if malformed and not response["sent"]:
+                    self._error(writer, 400)
+                if not response["sent"]:
+                    self._error(writer, 500)
+        finally:
+            response_done.set()
+            await writer.drain()
+            if self.max_requests:
+                self.handled += 1
+                if self.handled == self.max_requests:
+                    self._stopping.set()
+
+        if keep_alive and not body_complete:
+            drained = 0
+            try:
+                async for chunk in body:
+                    drained += len(chunk)
+                    if drained > self.max_drain:
+                        return False
+            except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+                return False
+        return keep_alive
+
+    async def _websocket(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, version: str, path: str, query: str, headers: list) -> None:
+        """
+        Hands a WebSocket upgrade request to the application.
+
+        Args:
+            reader (asyncio.StreamReader): The connection's read side.
+            writer (asyncio.StreamWriter): The connection's write side.
+            version (str): The HTTP version of the request.
+            path (str): The raw request path.
+            query (str): The raw query string.
+            headers (list): List of (name, value) header tuples.
+        """
+        subprotocols = []
+        for name, value in headers:
+            if name == b"sec-websocket-protocol":
+                subprotocols.extend(protocol.strip() for protocol in value.decode("latin-1").split(",") if protocol.strip())
+        scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": version,
+            "scheme": "ws",
+            "path": unquote(path),
+            "raw_path": path.encode("latin-1"),
+            "query_string": query.encode("latin-1"),
+            "root_path": "",
+            "headers": headers,
+            "client": writer.get_extra_info("peername")[:2],
+            "server": self.server_address,
+            "subprotocols": subprotocols,
+            "extensions": {"vortexkit.websocket": (reader, writer)},
+        }
+        connected = False
+
+        async def receive():
+            nonlocal connected
+            if not connected:
+                connected = True
+                return {"type": "websocket.connect"}
+            return {"type": "websocket.disconnect", "code": 1006}
+
+        async def send(message):
+            pass
+
+        task = asyncio.current_task()
+        self._websocket_tasks.add(task)
+        try:
+            await self.app(scope, receive, send)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            traceback.print_exc()
+        finally:
+            self._websocket_tasks.discard(task)
+            if self.max_requests:
+                self.handled += 1
+                if self.handled == self.max_requests:
+                    self._stopping.set()
+
+    def _response_head(self, start: dict, method: str, version: str, keep_alive: bool, length: int = None) -> tuple:
+        """
+        Serializes the status line and headers of a response and chooses how its body is delimited.
+
+        Args:
+            start (dict): The 'http.response.start' message.
+            method (str): The request method.
+            version (str): The HTTP version of the request.
+            keep_alive (bool): Whether the client allows the connection to be reused.
+            length (int, optional): The size of the complete body, if it was sent in one message.
+
+        Returns:
+            tuple: The response head ending with the blank line, whether the body is chunked,
+            and whether the connection can carry another request.
+        """
+        status = start["status"]
+        head = [STATUS_LINES.get(status) or f"HTTP/1.1 {status} Unknown\r\n".encode("latin-1")]
+        has_length = has_date = False
+        for name, value in start.get("headers", ()):
+            lower = name.lower()
+            if lower == b"content-length":
+                has_length = True
+            elif lower == b"date":
+                has_date = True
+            elif lower in (b"connection", b"transfer-encoding", b"keep-alive"):
+                continue
+            head.append(b"%s: %s\r\n" % (name, value))
+        if not has_date:
+            head.append(b"Date: %s\r\n" % formatdate(usegmt=True).encode("latin-1"))
+
+        chunked = False
+        has_body = method != "HEAD" and status >= 200 and status not in NO_BODY_STATUSES
+        if not has_length and has_body:
+            if length is not None:
+                head.append(b"Content-Length: %d\r\n" % length)
+            elif version == "1.1":
+                head.append(b"Transfer-Encoding: chunked\r\n")
+                chunked = True
+            else:
+                keep_alive = False
+
+        if not keep_alive:
+            head.append(b"Connection: close\r\n")
+        elif version != "1.1":
+            head.append(b"Connection: keep-alive\r\n")
+        head.append(b"\r\n")
+        return b"".join(head), chunked, keep_alive
+
+class Arbiter:
+    """
+    Pre-fork process manager running the application on several worker processes.
+
+    The arbiter binds the listening socket once and forks the workers, which share it.
+    With 'reuse_port', each worker binds its own socket with SO_REUSEPORT instead, and
+    the kernel balances connections between them. Workers that exit, whether they
+    crashed or were recycled after 'max_requests', are replaced, and workers whose
+    heartbeat stops for longer than 'timeout' seconds are killed and replaced. The
+    heartbeat is sent when the server made progress, starting a request or writing
+    response data, while a thread is writing to a client, whose socket timeout bounds
+    the write, or else from a pool thread, or from the event loop in 'async' mode. It
+    stops when every thread is stuck in a handler or deadlocked, or the loop is
+    blocked, and not only when the whole process is frozen. Threads busy with long
+    responses keep it going as long as they write: a worker whose threads are all
+    inside handlers that send nothing for 'timeout' seconds, such as event streams
+    with a longer heartbeat interval, is treated as hung.
+
+    In 'async' mode each worker runs an AsyncHTTPServer instead of a thread pool, and
+    'app' is called as an ASGI application.
+
+    Attributes:
+        app (callable): The WSGI application, or the ASGI application in 'async' mode.
+        host (str): Host address to listen on.
+        port (int): Port number to listen on.
+        workers (int): The number of worker processes.
+        threads (int): The number of threads per worker.
+        max_requests (int): Number of requests after which a worker is recycled, or 0 for no limit.
+        reuse_port (bool): Whether each worker binds its own socket with SO_REUSEPORT.
+        timeout (float): Seconds without a heartbeat after which a worker is killed.
+        mode (str): 'threaded' or 'async', the kind of server run by each worker.
+        keepalive_timeout (float): Seconds an idle connection is kept open.
+        max_keepalive_requests (int): Maximum number of requests served on one connection.
+        children (dict): Dictionary mapping worker pids to their heartbeat files.
+
+    Methods:
+        run():
+            Starts the workers and supervises them until interrupted.
+    """
+
+    def __init__(self, app: callable, host: str, port: int, workers: int, threads: int = 8, max_requests: int = 0, reuse_port: bool = False, timeout: float = 30, mode: str = "threaded", keepalive_timeout: float = 5, max_keepalive_requests: int = 100) -> None:
+        """
+        Initializes the Arbiter.
+
+        Args:
+            app (callable): The WSGI application, or the ASGI application in 'async' mode.
+            host (str): Host address to listen on.
+            port (int): Port number to listen on.
+            workers (int): The number of worker processes.
+            threads (int, optional): The number of threads per worker. Defaults to 8.
+            max_requests (int, optional): Number of requests after which a worker is recycled. Defaults to no limit.
+            reuse_port (bool, optional): Whether each worker binds its own socket with SO_REUSEPORT.
+            timeout (float, optional): Seconds without a heartbeat after which a worker is killed. Defaults to 30.
+            mode (str, optional): 'threaded' or 'async', the kind of server run by each worker. Defaults to 'threaded'.
+            keepalive_timeout (float, optional): Seconds an idle connection is kept open. Defaults to 5.
+            max_keepalive_requests (int, optional): Maximum number of requests served on one connection. Defaults to 100.
+
+        Raises:
+            ValueError: If the platform cannot fork worker processes.
+        """
+        if not hasattr(os, "fork"):
+            raise ValueError("Multiple worker processes require a platform supporting os.fork")
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.threads = threads
+        self.max_requests = max_requests
+        self.reuse_port = reuse_port
+        self.timeout = timeout
+        self.mode = mode
+        self.keepalive_timeout = keepalive_timeout
+        self.max_keepalive_requests = max_keepalive_requests
+        self.children = {}
+        self.socket = None
+        self._stopping = False
+
+    def _make_server(self):
+        """
+        Creates the server run by a worker process.
+
+        Returns:
+            ThreadPoolWSGIServer|AsyncHTTPServer: The worker's server.
+        """
+        if self.mode == "async":
+            return AsyncHTTPServer((self.host, self.port), self.app, self.max_requests, self.socket, self.reuse_port, self.keepalive_timeout, self.max_keepalive_requests)
+        return ThreadPoolWSGIServer((self.host, self.port), self.app, self.threads, self.max_requests, self.socket, self.reuse_port, keepalive_timeout=self.keepalive_timeout, max_keepalive_requests=self.max_keepalive_requests)
+
+    def _run_worker(self, heartbeat) -> None:
+        """
+        Runs the server inside a worker process until it is stopped or recycled.
+
+        Args:
+            heartbeat: The file whose modification time signals the worker is alive.
+        """
+        server = self._make_server()
+        stop = threading.Event()
+
+        def terminate(signum, frame):
+            stop.set()
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, terminate)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        answered = threading.Event()
+        answered.set()
+
+        def touch():
+            os.utime(heartbeat.fileno())
+            answered.set()
+
+        def beat():
+            seen = server.last_progress
+            writers = getattr(server, "writers", ())
+            while not stop.wait(self.timeout / 4):
+                progress = server.last_progress
+                if progress != seen or writers:
+                    # Serving moves on even if every thread is busy with a long response
+                    seen = progress
+                    os.utime(heartbeat.fileno())
+                elif answered.is_set():
+                    # One probe at a time: a stuck server leaves it unanswered and the heartbeat ages
+                    answered.clear()
+                    server.probe(touch)
+
+        threading.Thread(target=beat, daemon=True).start()
+        try:
+            server.serve_forever(poll_interval=0.5)
+        finally:
+            stop.set()
+            server.server_close()
+
+    def _spawn(self) -> None:
+        """
+        Forks a new worker process.
+        """
+        heartbeat = tempfile.TemporaryFile()
+        pid = os.fork()
+        if pid:
+            self.children[pid] = heartbeat
+            return
+
+        for sibling in self.children.values():
+            sibling.close()
+        self.children.clear()
+        status = 0
+        try:
+            self._run_worker(heartbeat)
+        except BaseException:
+            status = 1
+        finally:
+            close_access_logs()
+            close_metrics()
+            os._exit(status)
+
+    def _reap(self) -> None:
+        """
+        Collects exited workers and forgets them.
+        """
+        while True:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            heartbeat = self.children.pop(pid, None)
+            if heartbeat is not None:
+                heartbeat.close()
+
+    def _check_heartbeats(self) -> None:
+        """
+        Kills workers whose heartbeat is older than the timeout.
+        """
+        now = time.time()
+        for pid, heartbeat in list(self.children.items()):
+            if now - os.fstat(heartbeat.fileno()).st_mtime > self.timeout:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+
+    def _stop(self, signum, frame) -> None:
+        """
+        Signal handler requesting a graceful shutdown.
+        """
+        self._stopping = True
+
+    def run(self) -> None:
+        """
+        Starts the workers and supervises them until interrupted.
+        """
+        if not self.reuse_port:
+            self.socket = socket.create_server((self.host, self.port), backlog=ThreadPoolWSGIServer.request_queue_size)
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        try:
+            while not self._stopping:
+                self._reap()
+                self._check_heartbeats()
+                while len(self.children) < self.workers and not self._stopping:
+                    self._spawn()
+                time.sleep(0.5)
+        finally:
+            for pid in list(self.children):
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+            deadline = time.monotonic() + self.timeout
+            while self.children and time.monotonic() < deadline:
+                self._reap()
+                time.sleep(0.1)
+            for pid, heartbeat in list(self.children.items()):
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                    os.waitpid(pid, 0)
+                except (ProcessLookupError, ChildProcessError):
+                    pass
+                heartbeat.close()
+            self.children.clear()
+            if self.socket is not None:
+                self.socket.close()
@@ -0,0 +1,293 @@
+import os
+import mimetypes
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from .enums import StatusCode
+from .responses import BaseResponse, FileResponse
+from .request import NotFound
+
+@dataclass
+class StaticFileResponse(BaseResponse):
+    """
+    A response serving a static file from the StaticFiles cache.
+
+    Attributes:
+        content (bytes): The file content, empty for '304 Not Modified' responses.
+        content_type (str): The content type of the file.
+        status_code (str): The status code of the response. Default is '200 OK'.
+    """
+
+    content: bytes
+    content_type: str
+    status_code: str = "200 OK"
+
+    def __post_init__(self):
+        """
+        Initializes the StaticFileResponse.
+        """
+        super().__init__()
+
+class StaticFile:
+    """
+    Cached metadata, headers and optionally the content of a single static file.
+
+    Attributes:
+        path (str): The absolute path of the file.
+        size (int): The size of the file in bytes.
+        mtime_ns (int): The modification time of the file in nanoseconds.
+        content_type (str): The guessed content type of the file.
+        etag (str): The entity tag derived from the modification time and size.
+        last_modified (float): The modification time truncated to whole seconds.
+        headers (tuple): Precomputed ETag, Last-Modified and Cache-Control headers, shared by the responses serving the file.
+        content (bytes): The file content, or None if the file is too large to cache.
+        checked (float): Monotonic time at which the file was last checked on disk.
+    """
+
+    __slots__ = ("path", "size", "mtime_ns", "content_type", "etag", "last_modified", "headers", "content", "checked")
+
+    def __init__(self, path: str, stat: os.stat_result, cache_control: str, content: bytes = None) -> None:
+        """
+        Initializes a StaticFile from the result of os.stat.
+
+        Args:
+            path (str): The absolute path of the file.
+            stat (os.stat_result): The stat result of the file.
+            cache_control (str): The value of the Cache-Control header, or None to omit it.
+            content (bytes, optional): The file content, if it is to be cached.
+        """
+        self.path = path
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.etag = f'"{self.mtime_ns:x}-{self.size:x}"'
+        self.last_modified = float(int(stat.st_mtime))
+        headers = [("ETag", self.etag), ("Last-Modified", formatdate(self.last_modified, usegmt=True))]
+        if cache_control:
+            headers.append(("Cache-Control", cache_control))
+        self.headers = tuple(headers)
+        self.content = content
+        self.checked = time.monotonic()
+
+class StaticFiles:
+    """
+    Serves files from a directory tree with an in-memory cache and conditional requests.
+
+    File contents up to 'max_file_size' are kept in a byte-bounded LRU cache, larger files
+    are served as a FileResponse, streamed from disk with Range support. Each cached entry
+    carries precomputed ETag, Last-Modified and Cache-Control headers, and is revalidated
+    against the file's modification time at most once every 'check_interval' seconds, so
+    repeated requests and '304 Not Modified' answers do not touch the disk in between.
+    Missing files raise NotFound, so the application's 404 handling answers them.
+
+    Attributes:
+        folder (str): The absolute path of the directory being served.
+        max_cache_size (int): Maximum total size in bytes of cached file contents.
+        max_file_size (int): Maximum size in bytes of a single file kept in the cache.
+        cache_control (str): The value of the Cache-Control header sent with every file.
+        check_interval (float): Seconds between checks of a cached file on disk.
+        chunk_size (int): Chunk size used when streaming files that are not cached.
+        cached_size (int): Total size in bytes of the cached file contents.
+
+    Methods:
+        __call__(request, filename):
+            Serves the requested file.
+
+        clear():
+            Empties the cache.
+    """
+
+    def __init__(self, folder: str, max_cache_size: int = 64 * 1024 * 1024, max_file_size: int = 1024 * 1024, cache_control: str = "public, max-age=3600", check_interval: float = 1.0, chunk_size: int = 64 * 1024) -> None:
+        """
+        Initializes StaticFiles for a directory.
+
+        Args:
+            folder (str): Local folder path containing static files.
+            max_cache_size (int, optional): Maximum total size in bytes of cached file contents. Defaults to 64 MiB.
+            max_file_size (int, optional): Maximum size in bytes of a single cached file. Defaults to 1 MiB.
+            cache_control (str, optional): The Cache-Control header sent with every file. Defaults to 'public, max-age=3600'.
+            check_interval (float, optional): Seconds between checks of a cached file on disk. Defaults to 1 second.
+            chunk_size (int, optional): Chunk size used when streaming files that are not cached. Defaults to 64 KiB.
+
+        Raises:
+            ValueError: If the folder does not exist.
+        """
+        if not os.path.isdir(folder):
+            raise ValueError(f"Static folder '{folder}' does not exist")
+        self.folder = os.path.realpath(folder)
+        self.max_cache_size = max_cache_size
+        self.max_file_size = max_file_size
+        self.cache_control = cache_control
+        self.check_interval = check_interval
+        self.chunk_size = chunk_size
+        self.cached_size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _resolve(self, filename: str):
+        """
+        Maps a requested filename to an absolute path inside the folder.
+
+        Args:
+            filename (str): The requested path relative to the folder.
+
+        Returns:
+            str: The absolute path, or None if it escapes the folder.
+        """
+        path = os.path.realpath(os.path.join(self.folder, filename))
+        if path != self.folder and not path.startswith(self.folder + os.sep):
+            return None
+        return path
+
+    def _load(self, filename: str):
+        """
+        Stats a file and reads it into a new cache entry.
+
+        Args:
+            filename (str): The requested path relative to the folder.
+
+        Returns:
+            StaticFile: The new entry, or None if the file does not exist.
+        """
+        path = self._resolve(filename)
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        content = None
+        if stat.st_size <= self.max_file_size:
+            with open(path, "rb") as file:
+                content = file.read()
+        return StaticFile(path, stat, self.cache_control, content)
+
+    def _store(self, filename: str, entry: StaticFile) -> None:
+        """
+        Adds an entry to the cache, evicting the least recently used entries as needed.
+
+        Args:
+            filename (str): The requested path relative to the folder.
+            entry (StaticFile): The entry to store.
+        """
+        size = len(entry.content) if entry.content is not None else 0
+        with self._lock:
+            previous = self._entries.pop(filename, None)
+            if previous is not None and previous.content is not None:
+                self.cached_size -= len(previous.content)
+            if size > self.max_cache_size:
+                return
+            self._entries[filename] = entry
+            self.cached_size += size
+            while self.cached_size > self.max_cache_size:
+                _, evicted = self._entries.popitem(last=False)
+                if evicted.content is not None:
+                    self.cached_size -= len(evicted.content)
+
+    def _lookup(self, filename: str):
+        """
+        Returns the cache entry for a file, loading or revalidating it if needed.
+
+        Args:
+            filename (str): The requested path relative to the folder.
+
+        Returns:
+            StaticFile: The entry, or None if the file does not exist.
+        """
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry is not None:
+                self._entries.move_to_end(filename)
+
+        if entry is not None:
+            now = time.monotonic()
+            if now - entry.checked < self.check_interval:
+                return entry
+            try:
+                stat = os.stat(entry.path)
+            except OSError:
+                stat = None
+            if stat is not None and stat.st_mtime_ns == entry.mtime_ns and stat.st_size == entry.size:
+                entry.checked = now
+                return entry
+
+        entry = self._load(filename)
+        if entry is None:
+            with self._lock:
+                removed = self._entries.pop(filename, None)
+                if removed is not None and removed.content is not None:
+                    self.cached_size -= len(removed.content)
+            return None
+        self._store(filename, entry)
+        return entry
+
+    def _not_modified(self, environ: dict, entry: StaticFile) -> bool:
+        """
+        Checks the request's conditional headers against an entry.
+
+        Args:
+            environ (dict): The WSGI environment of the request.
+            entry (StaticFile): The cache entry of the requested file.
+
+        Returns:
+            bool: True if the client's copy is still valid.
+        """
+        if_none_match = environ.get("HTTP_IF_NONE_MATCH")
+        if if_none_match:
+            for tag in if_none_match.split(","):
+                tag = tag.strip()
+                if tag == "*" or tag.removeprefix("W/") == entry.etag:
+                    return True
+            return False
+
+        if_modified_since = environ.get("HTTP_IF_MODIFIED_SINCE")
+        if if_modified_since:
+            try:
+                return entry.last_modified <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def clear(self) -> None:
+        """
+        Empties the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.cached_size = 0
+
+    def __call__(self, request, filename: str):
+        """
+        Serves the requested file.
+
+        Args:
+            request (Request): The current request.
+            filename (str): The requested path relative to the folder.
+
+        Returns:
+            BaseResponse: The file or a '304 Not Modified' response.
+
+        Raises:
+            NotFound: If the file does not exist, so the application's 404 handling answers.
+        """
+        entry = self._lookup(filename)
+        if entry is None:
+            raise NotFound(filename)
+
+        if self._not_modified(request.environ, entry):
+            response = StaticFileResponse(b"", entry.content_type, StatusCode.NOT_MODIFIED)
+        elif entry.content is not None:
+            response = StaticFileResponse(entry.content, entry.content_type)
+        else:
+            response = FileResponse(entry.path)
+            response.content_type = entry.content_type
+            response.chunk_size = self.chunk_size
+            response.headers.update(entry.headers)
+            return response
+        response.headers = entry.headers
+        return response
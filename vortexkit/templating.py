@@ -0,0 +1,170 @@
+import os
+import re
+import threading
+import time
+
+PLACEHOLDER = re.compile(r"\(\((?P<space> ?)(?P<name>[^()\s]+)(?P=space)\)\)")
+
+class Template:
+    """
+    A template compiled into a list of literal text and variable slots.
+
+    Placeholders are written as '((name))' or '(( name ))'. Rendering fills the slots and
+    joins the parts once, so the cost is linear in the template size no matter how many
+    variables it uses. Placeholders without a matching variable are left untouched.
+
+    Attributes:
+        parts (list): Literal text and, at each slot, the placeholder's original text.
+        slots (list): (index, name) tuples giving the position of each variable in parts.
+
+    Methods:
+        render(variables):
+            Renders the template with the given variables.
+    """
+
+    __slots__ = ("parts", "slots")
+
+    def __init__(self, source: str) -> None:
+        """
+        Compiles a template from its source.
+
+        Args:
+            source (str): The template text.
+        """
+        parts = []
+        slots = []
+        position = 0
+        for match in PLACEHOLDER.finditer(source):
+            if match.start() > position:
+                parts.append(source[position:match.start()])
+            slots.append((len(parts), match.group("name")))
+            parts.append(match.group(0))
+            position = match.end()
+        if position < len(source):
+            parts.append(source[position:])
+        self.parts = parts
+        self.slots = slots
+
+    def render(self, variables: dict) -> str:
+        """
+        Renders the template with the given variables.
+
+        Args:
+            variables (dict): A dictionary of variables to substitute.
+
+        Returns:
+            str: The rendered template.
+        """
+        parts = self.parts.copy()
+        for index, name in self.slots:
+            value = variables.get(name)
+            if value is not None:
+                parts[index] = value if isinstance(value, str) else str(value)
+        return "".join(parts)
+
+class TemplateCache:
+    """
+    Cache of compiled templates keyed by path.
+
+    Each template is read and compiled once. Entries are revalidated against the file's
+    modification time at most once every 'check_interval' seconds and recompiled when
+    the file changes.
+
+    Attributes:
+        check_interval (float): Seconds between checks of a cached template on disk.
+
+    Methods:
+        get(file_path):
+            Returns the compiled template for a file.
+
+        precompile(folder, extensions):
+            Compiles every template in a folder and its subfolders.
+
+        clear():
+            Empties the cache.
+    """
+
+    def __init__(self, check_interval: float = 1.0) -> None:
+        """
+        Initializes an empty TemplateCache.
+
+        Args:
+            check_interval (float, optional): Seconds between checks of a cached template on disk. Defaults to 1 second.
+        """
+        self.check_interval = check_interval
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def _compile(self, file_path: str) -> Template:
+        """
+        Reads, compiles and caches a template file.
+
+        Args:
+            file_path (str): The path to the template file.
+
+        Returns:
+            Template: The compiled template.
+        """
+        with self._lock:
+            mtime_ns = os.stat(file_path).st_mtime_ns
+            with open(file_path, encoding="utf-8") as f:
+                template = Template(f.read())
+            self._templates[file_path] = (template, mtime_ns, time.monotonic())
+        return template
+
+    def get(self, file_path: str) -> Template:
+        """
+        Returns the compiled template for a file, compiling it if needed.
+
+        Args:
+            file_path (str): The path to the template file.
+
+        Returns:
+            Template: The compiled template.
+
+        Raises:
+            FileNotFoundError: If the template file does not exist.
+        """
+        entry = self._templates.get(file_path)
+        if entry is None:
+            entry = self._templates.get(os.path.normpath(file_path))
+            if entry is None:
+                return self._compile(file_path)
+            self._templates[file_path] = entry
+
+        template, mtime_ns, checked = entry
+        now = time.monotonic()
+        if now - checked < self.check_interval:
+            return template
+        if os.stat(file_path).st_mtime_ns != mtime_ns:
+            return self._compile(file_path)
+        self._templates[file_path] = (template, mtime_ns, now)
+        return template
+
+    def precompile(self, folder: str, extensions: tuple = (".html", ".htm", ".txt", ".xml")) -> int:
+        """
+        Compiles every template in a folder and its subfolders.
+
+        Args:
+            folder (str): The folder containing the templates.
+            extensions (tuple, optional): File extensions treated as templates.
+
+        Returns:
+            int: The number of templates compiled.
+        """
+        count = 0
+        for root, _, files in os.walk(folder):
+            for name in files:
+                if name.endswith(extensions):
+                    self._compile(os.path.normpath(os.path.join(root, name)))
+                    count += 1
+        return count
+
+    def clear(self) -> None:
+        """
+        Empties the cache.
+        """
+        with self._lock:
+            self._templates.clear()
+
+templates = TemplateCache()
@@ -0,0 +1,642 @@
+import argparse
+import http.client
+import io
+import itertools
+import json
+import multiprocessing
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+_json_dumps = json.dumps
+
+class TestResponse:
+    """
+    A response captured by TestClient.
+
+    Attributes:
+        status (str): The status line, such as '200 OK'.
+        status_code (int): The numeric status code.
+        headers (list): The (name, value) header tuples, in the order they were sent.
+        chunks (list): The body chunks, in the order the application produced them.
+        body (bytes): The whole body.
+
+    Methods:
+        header(name, default=None):
+            Returns the first value of a header.
+
+        text:
+            The body decoded as UTF-8.
+
+        json():
+            Parses the body as JSON.
+    """
+
+    __test__ = False
+
+    def __init__(self, status: str, headers: list, chunks: list) -> None:
+        """
+        Initializes a TestResponse.
+
+        Args:
+            status (str): The status line.
+            headers (list): The (name, value) header tuples.
+            chunks (list): The body chunks.
+        """
+        self.status = status
+        self.status_code = int(status[:3])
+        self.headers = headers
+        self.chunks = chunks
+        self.body = b"".join(chunks)
+
+    def header(self, name: str, default: str = None) -> str:
+        """
+        Returns the first value of a header.
+
+        Args:
+            name (str): The header name, matched case-insensitively.
+            default (str, optional): Returned when the header is missing. Defaults to None.
+
+        Returns:
+            str: The header value.
+        """
+        name = name.lower()
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return default
+
+    @property
+    def text(self) -> str:
+        """
+        The body decoded as UTF-8.
+        """
+        return self.body.decode("utf-8")
+
+    def json(self) -> any:
+        """
+        Parses the body as JSON.
+
+        Returns:
+            any: The decoded value.
+        """
+        return json.loads(self.body)
+
+    def __repr__(self):
+        return f"TestResponse(status={self.status!r}, length={len(self.body)})"
+
+class TestClient:
+    """
+    Calls an application's WSGI handler in-process, without a server or sockets.
+
+    Requests are turned into WSGI environments and passed to App.handler; the status,
+    headers and every body chunk are captured, and streamed bodies are consumed and
+    closed as a server would. Exceptions raised by the application propagate to the
+    caller. Cookies set by responses are stored and sent with later requests.
+
+    Attributes:
+        app (App): The application under test.
+        base_url (str): Scheme and host the requests are addressed to.
+        cookies (dict): The cookies sent with every request.
+
+    Methods:
+        request(method, path, ...):
+            Sends a request and returns the captured response.
+
+        get(path, **options), post(path, **options), put(path, **options),
+        patch(path, **options), delete(path, **options), head(path, **options),
+        options(path, **options):
+            Shortcuts for request() with the corresponding method.
+    """
+
+    __test__ = False
+
+    def __init__(self, app, base_url: str = "http://testserver", remote_addr: str = "127.0.0.1") -> None:
+        """
+        Initializes a TestClient.
+
+        Args:
+            app (App): The application under test.
+            base_url (str, optional): Scheme and host the requests are addressed to. Defaults to 'http://testserver'.
+            remote_addr (str, optional): The client address seen by the application. Defaults to '127.0.0.1'.
+        """
+        url = urlsplit(base_url)
+        self.app = app
+        self.base_url = base_url
+        self.cookies = {}
+        self._scheme = url.scheme or "http"
+        self._host = url.hostname or "testserver"
+        self._port = str(url.port or (443 if self._scheme == "https" else 80))
+        self._remote_addr = remote_addr
+
+    def build_environ(self, method: str, path: str, body: bytes = b"", headers: dict = None, query: dict = None) -> dict:
+        """
+        Builds the WSGI environment of a request.
+
+        Args:
+            method (str): The request method.
+            path (str): The request path, optionally with a query string.
+            body (bytes, optional): The encoded body. Defaults to no body.
+            headers (dict, optional): The request headers. Defaults to none.
+            query (dict, optional): Query parameters added to those in the path. Defaults to none.
+
+        Returns:
+            dict: The WSGI environment.
+        """
+        path, _, query_string = path.partition("?")
+        if query:
+            query_string = "&".join(filter(None, (query_string, urlencode(query, doseq=True))))
+        environ = {
+            "REQUEST_METHOD": method.upper(),
+            "SCRIPT_NAME": "",
+            "PATH_INFO": path or "/",
+            "QUERY_STRING": query_string,
+            "SERVER_NAME": self._host,
+            "SERVER_PORT": self._port,
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "REMOTE_ADDR": self._remote_addr,
+            "HTTP_HOST": self._host,
+            "CONTENT_LENGTH": str(len(body)) if body else "",
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": self._scheme,
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": False,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        if self.cookies:
+            environ["HTTP_COOKIE"] = "; ".join(f"{name}={value}" for name, value in self.cookies.items())
+        for name, value in (headers or {}).items():
+            key = name.upper().replace("-", "_")
+            if key in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                environ[key] = value
+            else:
+                environ["HTTP_" + key] = value
+        return environ
+
+    def request(self, method: str, path: str, body: bytes | str = None, json: any = None, data: dict = None, files: dict = None, headers: dict = None, query: dict = None) -> TestResponse:
+        """
+        Sends a request and returns the captured response.
+
+        At most one of 'body', 'json' and 'data' or 'files' is used to build the body;
+        'data' alone is form-encoded, and together with 'files' multipart-encoded.
+
+        Args:
+            method (str): The request method.
+            path (str): The request path, optionally with a query string.
+            body (bytes | str, optional): A raw body. Defaults to none.
+            json (any, optional): A value sent as a JSON body. Defaults to none.
+            data (dict, optional): Form fields. Defaults to none.
+            files (dict, optional): Files by field name, as (filename, content) or (filename, content, content_type) tuples. Defaults to none.
+            headers (dict, optional): The request headers. Defaults to none.
+            query (dict, optional): Query parameters added to those in the path. Defaults to none.
+
+        Returns:
+            TestResponse: The captured response.
+
+        Raises:
+            ValueError: If several kinds of body are given.
+        """
+        if sum(value is not None for value in (body, json, data if files is None else files)) > 1:
+            raise ValueError("Pass only one of 'body', 'json' and 'data'/'files'")
+        headers = dict(headers or {})
+        if json is not None:
+            body = _json_dumps(json).encode("utf-8")
+            headers.setdefault("Content-Type", "application/json")
+        elif files is not None:
+            body, content_type = encode_multipart(data or {}, files)
+            headers.setdefault("Content-Type", content_type)
+        elif data is not None:
+            body = urlencode(data, doseq=True).encode("utf-8")
+            headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+        elif isinstance(body, str):
+            body = body.encode("utf-8")
+
+        environ = self.build_environ(method, path, body or b"", headers, query)
+        captured = []
+
+        def start_response(status, response_headers, exc_info=None):
+            if exc_info is not None and captured:
+                raise exc_info[1].with_traceback(exc_info[2])
+            captured[:] = (status, response_headers)
+            return lambda chunk: chunks.append(chunk)
+
+        chunks = []
+        result = self.app.handler(environ, start_response)
+        try:
+            for chunk in result:
+                if chunk:
+                    chunks.append(chunk)
+        finally:
+            close = getattr(result, "close", None)
+            if close is not None:
+                close()
+
+        response = TestResponse(captured[0], list(captured[1]), chunks)
+        self._store_cookies(response)
+        return response
+
+    def _store_cookies(self, response: TestResponse) -> None:
+        """
+        Stores the cookies set by a response, forgetting those it expires.
+
+        Args:
+            response (TestResponse): The response.
+        """
+        for name, value in response.headers:
+            if name.lower() != "set-cookie":
+                continue
+            cookie = SimpleCookie()
+            cookie.load(value)
+            for key, morsel in cookie.items():
+                expires = morsel["expires"]
+                if morsel["max-age"] in ("0", 0) or (expires and expires.endswith("1970 00:00:00 GMT")):
+                    self.cookies.pop(key, None)
+                else:
+                    self.cookies[key] = morsel.value
+
+    def get(self, path: str, **options) -> TestResponse:
+        """
+        Sends a GET request, see request().
+        """
+        return self.request("GET", path, **options)
+
+    def post(self, path: str, **options) -> TestResponse:
+        """
+        Sends a POST request, see request().
+        """
+        return self.request("POST", path, **options)
+
+    def put(self, path: str, **options) -> TestResponse:
+        """
+        Sends a PUT request, see request().
+        """
+        return self.request("PUT", path, **options)
+
+    def patch(self, path: str, **options) -> TestResponse:
+        """
+        Sends a PATCH request, see request().
+        """
+        return self.request("PATCH", path, **options)
+
+    def delete(self, path: str, **options) -> TestResponse:
+        """
+        Sends a DELETE request, see request().
+        """
+        return self.request("DELETE", path, **options)
+
+    def head(self, path: str, **options) -> TestResponse:
+        """
+        Sends a HEAD request, see request().
+        """
+        return self.request("HEAD", path, **options)
+
+    def options(self, path: str, **options) -> TestResponse:
+        """
+        Sends a OPTIONS request, see request().
+        """
+        return self.request("OPTIONS", path, **options)
+
+def encode_multipart(fields: dict, files: dict) -> tuple:
+    """
+    Encodes form fields and files as a multipart/form-data body.
+
+    Args:
+        fields (dict): The text fields by name.
+        files (dict): Files by field name, as (filename, content) or (filename, content, content_type) tuples.
+
+    Returns:
+        tuple: The body as bytes and its Content-Type with the boundary.
+    """
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8"))
+    for name, file in files.items():
+        filename, content = file[0], file[1]
+        content_type = file[2] if len(file) > 2 else "application/octet-stream"
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'.encode("utf-8") + content + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+class LoadReport:
+    """
+    Throughput and latency of a load test.
+
+    Attributes:
+        requests (int): Number of requests completed.
+        errors (int): Number of requests that raised, or answered with a 5xx status.
+        duration (float): Wall-clock seconds the test ran for.
+        latencies (list): The latency of every request in seconds, sorted.
+        statuses (Counter): Number of responses per status code, 0 counting exceptions.
+
+    Methods:
+        rps:
+            Requests completed per second.
+
+        percentile(percent):
+            Returns a latency percentile in seconds.
+
+        as_dict():
+            Returns the summary as a JSON-compatible dictionary.
+    """
+
+    def __init__(self, latencies: list, statuses: Counter, duration: float) -> None:
+        """
+        Initializes a LoadReport.
+
+        Args:
+            latencies (list): The latency of every request in seconds.
+            statuses (Counter): Number of responses per status code.
+            duration (float): Wall-clock seconds the test ran for.
+        """
+        self.latencies = sorted(latencies)
+        self.statuses = statuses
+        self.duration = duration
+        self.requests = len(self.latencies)
+        self.errors = sum(count for status, count in statuses.items() if status == 0 or status >= 500)
+
+    @property
+    def rps(self) -> float:
+        """
+        Requests completed per second.
+        """
+        return self.requests / self.duration if self.duration else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """
+        Returns a latency percentile, using the nearest-rank method.
+
+        Args:
+            percent (float): The percentile, between 0 and 100.
+
+        Returns:
+            float: The latency in seconds, or 0 if no request completed.
+        """
+        if not self.latencies:
+            return 0.0
+        rank = max(1, -(-len(self.latencies) * percent // 100))
+        return self.latencies[min(int(rank), len(self.latencies)) - 1]
+
+    def as_dict(self) -> dict:
+        """
+        Returns the summary as a JSON-compatible dictionary.
+
+        Returns:
+            dict: The counts, throughput and latencies in milliseconds.
+        """
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "duration": round(self.duration, 3),
+            "rps": round(self.rps, 1),
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p95_ms": round(self.percentile(95) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(self.latencies[-1] * 1000, 3) if self.latencies else 0.0,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+        }
+
+    def __str__(self):
+        summary = self.as_dict()
+        return (
+            f"{summary['requests']} requests in {summary['duration']:.2f}s, {summary['errors']} errors\n"
+            f"Requests/sec: {summary['rps']:.1f}\n"
+            f"Latency p50 {summary['p50_ms']:.3f} ms, p95 {summary['p95_ms']:.3f} ms, "
+            f"p99 {summary['p99_ms']:.3f} ms, max {summary['max_ms']:.3f} ms"
+        )
+
+def _client_sender(app, method: str, path: str, body: bytes, headers: dict) -> callable:
+    """
+    Returns a callable sending a request to an application in-process.
+
+    Args:
+        app (App): The application.
+        method (str): The request method.
+        path (str): The request path.
+        body (bytes): The request body.
+        headers (dict): The request headers.
+
+    Returns:
+        callable: A callable returning the status code.
+    """
+    client = TestClient(app)
+    return lambda: client.request(method, path, body=body, headers=headers).status_code
+
+def _http_sender(url: str, method: str, path: str, body: bytes, headers: dict) -> callable:
+    """
+    Returns a callable sending a request to a server over a persistent connection.
+
+    The connection is reopened transparently when the server closes it.
+
+    Args:
+        url (str): The server's base URL, such as 'http://127.0.0.1:8080'.
+        method (str): The request method.
+        path (str): The request path.
+        body (bytes): The request body.
+        headers (dict): The request headers.
+
+    Returns:
+        callable: A callable returning the status code.
+    """
+    target = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if target.scheme == "https" else http.client.HTTPConnection
+    connection = connection_class(target.hostname, target.port, timeout=30)
+    path = (target.path.rstrip("/") + path) if target.path else path
+
+    def send():
+        try:
+            connection.request(method, path, body, headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            raise
+
+    return send
+
+def _run_threads(target: any, method: str, path: str, body: bytes, headers: dict, threads: int, requests: int, duration: float) -> tuple:
+    """
+    Sends requests from several threads until a request count or a duration is reached.
+
+    Args:
+        target (any): An App, or the base URL of a server.
+        method (str): The request method.
+        path (str): The request path.
+        body (bytes): The request body.
+        headers (dict): The request headers.
+        threads (int): Number of threads.
+        requests (int): Number of requests to send, or None to run for 'duration'.
+        duration (float): Seconds to run for when 'requests' is None.
+
+    Returns:
+        tuple: The latencies in seconds and the Counter of status codes.
+    """
+    make_sender = _http_sender if isinstance(target, str) else _client_sender
+    remaining = itertools.count() if requests is not None else None
+    deadline = time.perf_counter() + duration
+    results = []
+    start = threading.Barrier(threads)
+
+    def worker():
+        send = make_sender(target, method, path, body, headers)
+        latencies = []
+        statuses = Counter()
+        perf_counter = time.perf_counter
+        start.wait()
+        while True:
+            if remaining is not None:
+                if next(remaining) >= requests:
+                    break
+            elif perf_counter() >= deadline:
+                break
+            began = perf_counter()
+            try:
+                status = send()
+            except Exception:
+                status = 0
+            latencies.append(perf_counter() - began)
+            statuses[status] += 1
+        results.append((latencies, statuses))
+
+    workers = [threading.Thread(target=worker, name=f"vortexkit-load-{index}", daemon=True) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    latencies = []
+    statuses = Counter()
+    for thread_latencies, thread_statuses in results:
+        latencies.extend(thread_latencies)
+        statuses.update(thread_statuses)
+    return latencies, statuses
+
+_fork_target = None
+
+def _process_worker(arguments: tuple) -> tuple:
+    """
+    Runs the threads of one load generator process.
+
+    Args:
+        arguments (tuple): The arguments of _run_threads, with None standing for an App
+            target inherited from the parent through fork.
+
+    Returns:
+        tuple: The latencies in seconds and the Counter of status codes.
+    """
+    target, *rest = arguments
+    return _run_threads(_fork_target if target is None else target, *rest)
+
+def run_load(target: any, path: str = "/", method: str = "GET", body: bytes = b"", headers: dict = None, threads: int = 1, processes: int = 1, requests: int = None, duration: float = 10.0) -> LoadReport:
+    """
+    Generates load against an application and measures throughput and latency.
+
+    The target is either an App, called in-process through TestClient, or the base URL
+    of a running server such as one started with App.run, reached over keep-alive
+    connections. Every thread sends requests back to back. With several processes the
+    threads run in each of them, which sidesteps the GIL of the load generator; App
+    targets then require the 'fork' start method.
+
+    Args:
+        target (any): An App, or a base URL such as 'http://127.0.0.1:8080'.
+        path (str, optional): The request path, optionally with a query string. Defaults to '/'.
+        method (str, optional): The request method. Defaults to 'GET'.
+        body (bytes, optional): The request body. Defaults to no body.
+        headers (dict, optional): The request headers. Defaults to none.
+        threads (int, optional): Number of threads per process. Defaults to 1.
+        processes (int, optional): Number of processes. Defaults to 1, the calling process.
+        requests (int, optional): Total number of requests to send. Defaults to running for 'duration'.
+        duration (float, optional): Seconds to run for when 'requests' is not given. Defaults to 10.
+
+    Returns:
+        LoadReport: The throughput and latency report.
+
+    Raises:
+        ValueError: If the counts are not positive, or an App target needs processes on a platform without fork.
+    """
+    global _fork_target
+    if threads < 1 or processes < 1 or (requests is not None and requests < 1):
+        raise ValueError("Load tests need at least one thread, one process and one request")
+    headers = dict(headers or {})
+    if isinstance(target, str) and body:
+        headers.setdefault("Content-Length", str(len(body)))
+
+    started = time.perf_counter()
+    if processes == 1:
+        latencies, statuses = _run_threads(target, method, path, body, headers, threads, requests, duration)
+        return LoadReport(latencies, statuses, time.perf_counter() - started)
+
+    if not isinstance(target, str) and "fork" not in multiprocessing.get_all_start_methods():
+        raise ValueError("Load testing an App from several processes requires the 'fork' start method; run a server and pass its URL instead")
+    context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+    shares = [None] * processes
+    if requests is not None:
+        shares = [requests // processes + (index < requests % processes) for index in range(processes)]
+    jobs = [
+        (target if isinstance(target, str) else None, method, path, body, headers, threads, share, duration)
+        for share in shares if share is None or share > 0
+    ]
+    _fork_target = None if isinstance(target, str) else target
+    started = time.perf_counter()
+    try:
+        with context.Pool(len(jobs)) as pool:
+            results = pool.map(_process_worker, jobs)
+    finally:
+        _fork_target = None
+
+    latencies = []
+    statuses = Counter()
+    for process_latencies, process_statuses in results:
+        latencies.extend(process_latencies)
+        statuses.update(process_statuses)
+    return LoadReport(latencies, statuses, time.perf_counter() - started)
+
+def main(argv: list = None) -> int:
+    """
+    Runs a load test against a server from the command line.
+
+        python -m vortexkit.testing http://127.0.0.1:8080/items -t 8 -p 2 -d 10
+
+    Args:
+        argv (list, optional): The arguments. Defaults to sys.argv.
+
+    Returns:
+        int: The exit status, 1 if any request failed.
+    """
+    parser = argparse.ArgumentParser(prog="python -m vortexkit.testing", description="Generates load against a running server.")
+    parser.add_argument("url", help="the URL to request, such as http://127.0.0.1:8080/")
+    parser.add_argument("-X", "--method", default="GET", help="the request method (default: GET)")
+    parser.add_argument("-t", "--threads", type=int, default=4, help="threads per process (default: 4)")
+    parser.add_argument("-p", "--processes", type=int, default=1, help="number of processes (default: 1)")
+    parser.add_argument("-n", "--requests", type=int, help="total number of requests; defaults to running for --duration")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="seconds to run for (default: 10)")
+    parser.add_argument("-H", "--header", action="append", default=[], help="a request header as 'Name: value', repeatable")
+    parser.add_argument("--body", default="", help="the request body")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    url = urlsplit(args.url)
+    path = (url.path or "/") + (f"?{url.query}" if url.query else "")
+    headers = dict(header.split(":", 1) for header in args.header)
+    headers = {name.strip(): value.strip() for name, value in headers.items()}
+    report = run_load(
+        f"{url.scheme}://{url.netloc}", path, args.method, args.body.encode("utf-8"), headers,
+        args.threads, args.processes, args.requests, args.duration,
+    )
+    print(json.dumps(report.as_dict(), indent=2) if args.json else report)
+    return 1 if report.errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,892 @@
+import asyncio
+import base64
+import hashlib
+import zlib
+from . import jsoncodec
+
+GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC11B85"
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+CONNECTING = "connecting"
+OPEN = "open"
+CLOSED = "closed"
+
+DEFLATE_RESPONSE = "permessage-deflate; server_no_context_takeover; client_no_context_takeover"
+
+class WebSocketDisconnect(Exception):
+    """
+    Raised when a WebSocket connection is closed while receiving.
+
+    Attributes:
+        code (int): The close code, 1006 if the connection was lost without a close frame.
+        reason (str): The close reason sent by the peer.
+    """
+
+    def __init__(self, code: int = 1000, reason: str = "") -> None:
+        """
+        Initializes a WebSocketDisconnect.
+
+        Args:
+            code (int, optional): The close code. Defaults to 1000.
+            reason (str, optional): The close reason. Defaults to ''.
+        """
+        super().__init__(code, reason)
+        self.code = code
+        self.reason = reason
+
+def accept_key(key: str) -> str:
+    """
+    Computes the Sec-WebSocket-Accept value for a handshake key.
+
+    Args:
+        key (str): The client's Sec-WebSocket-Key header.
+
+    Returns:
+        str: The value of the Sec-WebSocket-Accept header.
+    """
+    return base64.b64encode(hashlib.sha1(key.encode("latin-1") + GUID).digest()).decode("latin-1")
+
+def negotiate_deflate(header: str) -> bool:
+    """
+    Checks whether a Sec-WebSocket-Extensions offer allows permessage-deflate.
+
+    Messages are always compressed and decompressed without context takeover, so a
+    broadcast can be compressed once for every client and idle connections hold no
+    compressor state. Offers restricting the server's window size are declined.
+
+    Args:
+        header (str): The client's Sec-WebSocket-Extensions header.
+
+    Returns:
+        bool: True if permessage-deflate is accepted.
+    """
+    for offer in (header or "").split(","):
+        name, *params = [part.strip() for part in offer.split(";")]
+        if name.lower() != "permessage-deflate":
+            continue
+        options = dict(param.partition("=")[::2] for param in params if param)
+        window = options.get("server_max_window_bits", "15").strip('"')
+        if window == "15":
+            return True
+    return False
+
+def build_frame(opcode: int, payload: bytes, compressed: bool = False) -> bytes:
+    """
+    Builds an unmasked, unfragmented server frame.
+
+    Args:
+        opcode (int): The frame opcode.
+        payload (bytes): The frame payload.
+        compressed (bool, optional): Whether the payload is deflated, setting RSV1.
+
+    Returns:
+        bytes: The encoded frame.
+    """
+    first = 0x80 | opcode | (0x40 if compressed else 0)
+    length = len(payload)
+    if length < 126:
+        return bytes((first, length)) + payload
+    if length < 65536:
+        return bytes((first, 126)) + length.to_bytes(2, "big") + payload
+    return bytes((first, 127)) + length.to_bytes(8, "big") + payload
+
+def unmask(payload: bytes, mask: bytes) -> bytes:
+    """
+    Removes the client's masking from a frame payload.
+
+    Args:
+        payload (bytes): The masked payload.
+        mask (bytes): The 4-byte masking key.
+
+    Returns:
+        bytes: The unmasked payload.
+    """
+    length = len(payload)
+    key = int.from_bytes(mask * (length // 4) + mask[:length % 4], "little")
+    return (int.from_bytes(payload, "little") ^ key).to_bytes(length, "little")
+
+def deflate(payload: bytes) -> bytes:
+    """
+    Compresses a message payload for permessage-deflate without context takeover.
+
+    Args:
+        payload (bytes): The message payload.
+
+    Returns:
+        bytes: The compressed payload, without the trailing empty block.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+    data = compressor.compress(payload) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    return data[:-4] if data.endswith(b"\x00\x00\xff\xff") else data
+
+def inflate(payload: bytes, max_size: int) -> bytes:
+    """
+    Decompresses a permessage-deflate message payload.
+
+    Args:
+        payload (bytes): The compressed payload.
+        max_size (int): Maximum size in bytes of the decompressed message.
+
+    Returns:
+        bytes: The decompressed payload.
+
+    Raises:
+        ValueError: If the decompressed message exceeds the maximum size.
+        zlib.error: If the payload is not valid deflate data.
+    """
+    data = zlib.decompressobj(-zlib.MAX_WBITS).decompress(payload + b"\x00\x00\xff\xff", max_size + 1)
+    if len(data) > max_size:
+        raise ValueError("Message too big")
+    return data
+
+def encode_message(message: any) -> tuple:
+    """
+    Serializes a message into an opcode and payload.
+
+    Strings are sent as text, bytes as binary and anything else as JSON text.
+
+    Args:
+        message (any): The message to send.
+
+    Returns:
+        tuple: The opcode and payload bytes.
+    """
+    if isinstance(message, str):
+        return OP_TEXT, message.encode("utf-8")
+    if isinstance(message, (bytes, bytearray, memoryview)):
+        return OP_BINARY, bytes(message)
+    return OP_TEXT, jsoncodec.dumps(message)
+
+class OutgoingMessage:
+    """
+    A serialized message whose frames are built once and shared by every recipient.
+
+    Attributes:
+        opcode (int): The message opcode.
+        payload (bytes): The serialized message.
+        compression_threshold (int): Size in bytes from which the payload is compressed.
+    """
+
+    __slots__ = ("opcode", "payload", "compression_threshold", "_frame", "_compressed_frame")
+
+    def __init__(self, message: any, compression_threshold: int = 256) -> None:
+        """
+        Serializes a message.
+
+        Args:
+            message (any): The message to send, as str, bytes or a JSON-serializable object.
+            compression_threshold (int, optional): Size in bytes from which the payload is compressed.
+        """
+        self.opcode, self.payload = encode_message(message)
+        self.compression_threshold = compression_threshold
+        self._frame = None
+        self._compressed_frame = None
+
+    def frame(self, compress: bool = False) -> bytes:
+        """
+        Returns the encoded frame, building it on first use.
+
+        Args:
+            compress (bool, optional): Whether the recipient negotiated permessage-deflate.
+
+        Returns:
+            bytes: The frame.
+        """
+        if compress and len(self.payload) >= self.compression_threshold:
+            if self._compressed_frame is None:
+                self._compressed_frame = build_frame(self.opcode, deflate(self.payload), True)
+            return self._compressed_frame
+        if self._frame is None:
+            self._frame = build_frame(self.opcode, self.payload)
+        return self._frame
+
+class WebSocket:
+    """
+    A WebSocket connection, passed to handlers registered with App.websocket.
+
+    The connection is served directly on the asyncio server's stream: frames are parsed
+    and built here, pings are answered, fragmented and compressed messages are
+    reassembled, and the transport's write buffer is the send queue. 'send' waits while
+    the buffer is above 'max_queue' bytes, and a broadcast that would overflow it drops
+    the connection instead of stalling the other recipients.
+
+    Attributes of the handshake request, such as headers, query_params or cookies, are
+    available directly on the WebSocket.
+
+    Attributes:
+        request (Request): The handshake request.
+        path_params (dict): The converted path parameters.
+        hub (WebSocketHub): The hub tracking connections and broadcast groups.
+        state (str): 'connecting', 'open' or 'closed'.
+        subprotocol (str): The subprotocol selected when accepting, if any.
+        deflate (bool): Whether permessage-deflate is in use.
+        groups (set): Names of the broadcast groups the connection belongs to.
+        max_size (int): Maximum size in bytes of a received message.
+        max_queue (int): Maximum number of bytes waiting to be written.
+        close_code (int): The close code, once the connection is closed.
+
+    Methods:
+        accept(subprotocol=None):
+            Completes the handshake.
+
+        receive():
+            Waits for the next message.
+
+        receive_json():
+            Waits for the next message and decodes it as JSON.
+
+        send(message):
+            Sends a message.
+
+        ping(data=b""):
+            Sends a ping.
+
+        close(code=1000, reason=""):
+            Closes the connection.
+
+        join(group):
+            Adds the connection to a broadcast group.
+
+        leave(group):
+            Removes the connection from a broadcast group.
+    """
+
+    __slots__ = ("request", "path_params", "hub", "state", "subprotocol", "deflate", "groups", "max_size", "max_queue", "close_code", "awaiting_pong", "_reader", "_writer")
+
+    def __init__(self, request, hub: "WebSocketHub", reader: asyncio.StreamReader = None, writer: asyncio.StreamWriter = None, max_size: int = 1024 * 1024, max_queue: int = 1024 * 1024) -> None:
+        """
+        Initializes a WebSocket for an upgrade request.
+
+        Args:
+            request (Request): The handshake request.
+            hub (WebSocketHub): The hub tracking connections and broadcast groups.
+            reader (asyncio.StreamReader, optional): The connection's read side.
+            writer (asyncio.StreamWriter, optional): The connection's write side.
+            max_size (int, optional): Maximum size in bytes of a received message. Defaults to 1 MiB.
+            max_queue (int, optional): Maximum number of bytes waiting to be written. Defaults to 1 MiB.
+        """
+        self.request = request
+        self.path_params = request.path_params
+        self.hub = hub
+        self.state = CONNECTING
+        self.subprotocol = None
+        self.deflate = False
+        self.groups = set()
+        self.max_size = max_size
+        self.max_queue = max_queue
+        self.close_code = None
+        self.awaiting_pong = False
+        self._reader = reader
+        self._writer = writer
+
+    def __getattr__(self, name: str) -> any:
+        return getattr(self.request, name)
+
+    @property
+    def subprotocols(self) -> list:
+        """
+        The subprotocols offered by the client, in order of preference.
+        """
+        header = self.request.environ.get("HTTP_SEC_WEBSOCKET_PROTOCOL", "")
+        return [protocol.strip() for protocol in header.split(",") if protocol.strip()]
+
+    def handshake_error(self):
+        """
+        Validates the upgrade request.
+
+        Returns:
+            tuple: A (status, headers) rejection, or None if the handshake is valid.
+        """
+        environ = self.request.environ
+        if environ.get("HTTP_SEC_WEBSOCKET_VERSION") != "13":
+            return "426 Upgrade Required", [("Sec-WebSocket-Version", "13")]
+        key = environ.get("HTTP_SEC_WEBSOCKET_KEY", "")
+        try:
+            if len(base64.b64decode(key, validate=True)) != 16:
+                raise ValueError("Invalid key")
+        except ValueError:
+            return "400 Bad Request", []
+        return None
+
+    async def reject(self, status: str = "403 Forbidden", headers: list = ()) -> None:
+        """
+        Refuses the handshake with an HTTP response.
+
+        Args:
+            status (str, optional): The status line. Defaults to '403 Forbidden'.
+            headers (list, optional): Additional (name, value) header tuples.
+        """
+        if self.state != CONNECTING:
+            return
+        self.state = CLOSED
+        lines = [f"HTTP/1.1 {status}", "Content-Length: 0", "Connection: close"]
+        lines.extend(f"{name}: {value}" for name, value in headers)
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await self._drain()
+
+    async def accept(self, subprotocol: str = None) -> None:
+        """
+        Completes the handshake, negotiating permessage-deflate if the client offers it.
+
+        Args:
+            subprotocol (str, optional): The subprotocol to select, one of 'subprotocols'.
+        """
+        if self.state != CONNECTING:
+            raise RuntimeError("WebSocket is not waiting for a handshake")
+        environ = self.request.environ
+        self.subprotocol = subprotocol
+        self.deflate = negotiate_deflate(environ.get("HTTP_SEC_WEBSOCKET_EXTENSIONS"))
+        lines = [
+            "HTTP/1.1 101 Switching Protocols",
+            "Upgrade: websocket",
+            "Connection: Upgrade",
+            f"Sec-WebSocket-Accept: {accept_key(environ['HTTP_SEC_WEBSOCKET_KEY'])}",
+        ]
+        if subprotocol:
+            lines.append(f"Sec-WebSocket-Protocol: {subprotocol}")
+        if self.deflate:
+            lines.append(f"Sec-WebSocket-Extensions: {DEFLATE_RESPONSE}")
+        self._writer.transport.set_write_buffer_limits(high=self.max_queue)
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        self.state = OPEN
+        self.hub.add(self)
+
+    async def _read_frame(self) -> tuple:
+        """
+        Reads one frame from the client.
+
+        Returns:
+            tuple: The FIN flag, RSV1 flag, opcode and unmasked payload.
+        """
+        first, second = await self._reader.readexactly(2)
+        if first & 0x30 or (first & 0x40 and not self.deflate) or not second & 0x80:
+            await self._fail(1002)
+        length = second & 0x7F
+        if length == 126:
+            length = int.from_bytes(await self._reader.readexactly(2), "big")
+        elif length == 127:
+            length = int.from_bytes(await self._reader.readexactly(8), "big")
+        if length > self.max_size:
+            await self._fail(1009)
+        mask = await self._reader.readexactly(4)
+        payload = unmask(await self._reader.readexactly(length), mask) if length else b""
+        return first & 0x80, first & 0x40, first & 0x0F, payload
+
+    async def _fail(self, code: int) -> None:
+        """
+        Closes the connection after a protocol violation.
+
+        Args:
+            code (int): The close code.
+
+        Raises:
+            WebSocketDisconnect: Always.
+        """
+        await self.close(code)
+        raise WebSocketDisconnect(code)
+
+    async def receive(self) -> str|bytes:
+        """
+        Waits for the next message, answering pings and close frames in the meantime.
+
+        Returns:
+            str|bytes: The message, as str for text messages and bytes for binary messages.
+
+        Raises:
+            WebSocketDisconnect: If the connection is or becomes closed.
+        """
+        if self.state != OPEN:
+            raise WebSocketDisconnect(self.close_code or 1006)
+
+        fragments = []
+        message_opcode = None
+        compressed = False
+        size = 0
+        while True:
+            try:
+                fin, rsv1, opcode, payload = await self._read_frame()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                self._closed(1006)
+                raise WebSocketDisconnect(1006)
+            self.awaiting_pong = False
+
+            if opcode >= OP_CLOSE:
+                if not fin or len(payload) > 125:
+                    await self._fail(1002)
+                if opcode == OP_PING:
+                    self._write(build_frame(OP_PONG, payload))
+                elif opcode == OP_CLOSE:
+                    code = int.from_bytes(payload[:2], "big") if len(payload) >= 2 else 1005
+                    reason = payload[2:].decode("utf-8", "replace")
+                    await self.close(code if code != 1005 else 1000)
+                    self.close_code = code
+                    raise WebSocketDisconnect(code, reason)
+                elif opcode != OP_PONG:
+                    await self._fail(1002)
+                continue
+
+            if opcode == OP_CONTINUATION:
+                if message_opcode is None:
+                    await self._fail(1002)
+            elif opcode in (OP_TEXT, OP_BINARY) and message_opcode is None:
+                message_opcode = opcode
+                compressed = bool(rsv1)
+            else:
+                await self._fail(1002)
+
+            size += len(payload)
+            if size > self.max_size:
+                await self._fail(1009)
+            fragments.append(payload)
+            if fin:
+                break
+
+        data = fragments[0] if len(fragments) == 1 else b"".join(fragments)
+        if compressed:
+            try:
+                data = inflate(data, self.max_size)
+            except ValueError:
+                await self._fail(1009)
+            except zlib.error:
+                await self._fail(1007)
+        if message_opcode == OP_TEXT:
+            try:
+                return data.decode("utf-8")
+            except UnicodeDecodeError:
+                await self._fail(1007)
+        return data
+
+    async def receive_json(self) -> any:
+        """
+        Waits for the next message and decodes it as JSON.
+
+        Returns:
+            any: The decoded message.
+        """
+        return jsoncodec.loads(await self.receive())
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        """
+        Yields messages until the connection is closed.
+        """
+        try:
+            while True:
+                yield await self.receive()
+        except WebSocketDisconnect:
+            return
+
+    def _write(self, data: bytes) -> None:
+        """
+        Writes bytes to the transport if the connection is still open.
+
+        Args:
+            data (bytes): The data to write.
+        """
+        if self._writer.transport.is_closing():
+            return
+        self._writer.write(data)
+
+    async def _drain(self) -> None:
+        """
+        Waits until the write buffer is below 'max_queue'.
+        """
+        try:
+            await self._writer.drain()
+        except ConnectionError:
+            self._closed(1006)
+
+    async def send(self, message: any) -> None:
+        """
+        Sends a message, waiting while the send queue is full.
+
+        Args:
+            message (any): The message, as str for text, bytes for binary or any JSON-serializable object.
+
+        Raises:
+            WebSocketDisconnect: If the connection is closed.
+        """
+        if self.state != OPEN:
+            raise WebSocketDisconnect(self.close_code or 1006)
+        outgoing = message if isinstance(message, OutgoingMessage) else OutgoingMessage(message, self.hub.compression_threshold)
+        self._write(outgoing.frame(self.deflate))
+        await self._drain()
+
+    def deliver(self, message: OutgoingMessage) -> bool:
+        """
+        Queues a shared message without waiting, dropping the connection if its queue is full.
+
+        Args:
+            message (OutgoingMessage): The message to send.
+
+        Returns:
+            bool: True if the message was queued.
+        """
+        if self.state != OPEN:
+            return False
+        transport = self._writer.transport
+        if transport.get_write_buffer_size() > self.max_queue:
+            transport.abort()
+            self._closed(1006)
+            return False
+        self._write(message.frame(self.deflate))
+        return True
+
+    async def ping(self, data: bytes = b"") -> None:
+        """
+        Sends a ping.
+
+        Args:
+            data (bytes, optional): Up to 125 bytes of application data.
+        """
+        if self.state == OPEN:
+            self._write(build_frame(OP_PING, data))
+            await self._drain()
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        """
+        Sends a close frame and marks the connection as closed.
+
+        Args:
+            code (int, optional): The close code. Defaults to 1000.
+            reason (str, optional): The close reason.
+        """
+        if self.state != OPEN:
+            return
+        self._write(build_frame(OP_CLOSE, code.to_bytes(2, "big") + reason.encode("utf-8")[:123]))
+        self._closed(code)
+        await self._drain()
+
+    def _closed(self, code: int) -> None:
+        """
+        Marks the connection as closed and removes it from the hub.
+
+        Args:
+            code (int): The close code.
+        """
+        if self.state == CLOSED:
+            return
+        self.state = CLOSED
+        self.close_code = code
+        self.hub.discard(self)
+
+    def join(self, group: str) -> None:
+        """
+        Adds the connection to a broadcast group. It is removed when the connection closes.
+
+        Args:
+            group (str): The name of the group.
+        """
+        self.hub.join(self, group)
+
+    def leave(self, group: str) -> None:
+        """
+        Removes the connection from a broadcast group.
+
+        Args:
+            group (str): The name of the group.
+        """
+        self.hub.leave(self, group)
+
+    def __repr__(self):
+        return f"WebSocket(path={self.request.path}, state={self.state}, groups={sorted(self.groups)})"
+
+class ASGIWebSocket(WebSocket):
+    """
+    A WebSocket connection served through ASGI 'websocket' messages.
+
+    Used when the application runs under an ASGI server other than the built-in one,
+    which handles framing and compression itself. Broadcasts are sent to each such
+    connection with a separate task.
+    """
+
+    __slots__ = ("_receive", "_send", "_tasks")
+
+    def __init__(self, request, hub: "WebSocketHub", receive: callable, send: callable, max_size: int = 1024 * 1024, max_queue: int = 1024 * 1024) -> None:
+        """
+        Initializes an ASGIWebSocket.
+
+        Args:
+            request (Request): The handshake request.
+            hub (WebSocketHub): The hub tracking connections and broadcast groups.
+            receive (callable): The ASGI receive function.
+            send (callable): The ASGI send function.
+            max_size (int, optional): Maximum size in bytes of a received message.
+            max_queue (int, optional): Maximum number of broadcasts waiting to be sent, counted in bytes.
+        """
+        super().__init__(request, hub, max_size=max_size, max_queue=max_queue)
+        self._receive = receive
+        self._send = send
+        self._tasks = set()
+
+    def handshake_error(self):
+        """
+        Returns None, as the ASGI server validates the handshake.
+        """
+        return None
+
+    async def reject(self, status: str = "403 Forbidden", headers: list = ()) -> None:
+        """
+        Refuses the handshake, which the ASGI server answers with '403 Forbidden'.
+        """
+        if self.state == CONNECTING:
+            self.state = CLOSED
+            await self._send({"type": "websocket.close", "code": 1000})
+
+    async def accept(self, subprotocol: str = None) -> None:
+        """
+        Completes the handshake.
+
+        Args:
+            subprotocol (str, optional): The subprotocol to select.
+        """
+        if self.state != CONNECTING:
+            raise RuntimeError("WebSocket is not waiting for a handshake")
+        message = await self._receive()
+        if message["type"] != "websocket.connect":
+            self._closed(1006)
+            raise WebSocketDisconnect(1006)
+        self.subprotocol = subprotocol
+        await self._send({"type": "websocket.accept", "subprotocol": subprotocol})
+        self.state = OPEN
+        self.hub.add(self)
+
+    async def receive(self) -> str|bytes:
+        """
+        Waits for the next message.
+
+        Returns:
+            str|bytes: The message.
+
+        Raises:
+            WebSocketDisconnect: If the connection is or becomes closed.
+        """
+        if self.state != OPEN:
+            raise WebSocketDisconnect(self.close_code or 1006)
+        message = await self._receive()
+        if message["type"] == "websocket.disconnect":
+            self._closed(message.get("code", 1000))
+            raise WebSocketDisconnect(self.close_code, message.get("reason") or "")
+        if message.get("text") is not None:
+            return message["text"]
+        return message.get("bytes") or b""
+
+    async def _send_message(self, message: OutgoingMessage) -> None:
+        """
+        Sends a serialized message as an ASGI 'websocket.send' event.
+
+        Args:
+            message (OutgoingMessage): The message.
+        """
+        if message.opcode == OP_TEXT:
+            await self._send({"type": "websocket.send", "text": message.payload.decode("utf-8")})
+        else:
+            await self._send({"type": "websocket.send", "bytes": message.payload})
+
+    async def send(self, message: any) -> None:
+        """
+        Sends a message.
+
+        Args:
+            message (any): The message, as str for text, bytes for binary or any JSON-serializable object.
+
+        Raises:
+            WebSocketDisconnect: If the connection is closed.
+        """
+        if self.state != OPEN:
+            raise WebSocketDisconnect(self.close_code or 1006)
+        await self._send_message(message if isinstance(message, OutgoingMessage) else OutgoingMessage(message))
+
+    def deliver(self, message: OutgoingMessage) -> bool:
+        """
+        Sends a shared message from a separate task, dropping it if too many are pending.
+
+        Args:
+            message (OutgoingMessage): The message to send.
+
+        Returns:
+            bool: True if the message was queued.
+        """
+        if self.state != OPEN or len(self._tasks) * len(message.payload) > self.max_queue:
+            return False
+        task = asyncio.get_running_loop().create_task(self._send_message(message))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def ping(self, data: bytes = b"") -> None:
+        """
+        Does nothing, as the ASGI server keeps the connection alive.
+        """
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        """
+        Closes the connection.
+
+        Args:
+            code (int, optional): The close code. Defaults to 1000.
+            reason (str, optional): The close reason.
+        """
+        if self.state != OPEN:
+            return
+        self._closed(code)
+        await self._send({"type": "websocket.close", "code": code, "reason": reason})
+
+class WebSocketHub:
+    """
+    Tracks open WebSocket connections and their broadcast groups.
+
+    A broadcast serializes and, when compressed, deflates the message once, then queues
+    the same frame on every member of the group. Open connections are pinged every
+    'ping_interval' seconds by a single task, and those that have not answered by the
+    next round are dropped.
+
+    Attributes:
+        groups (dict): Dictionary mapping group names to sets of connections.
+        connections (set): The open connections.
+        ping_interval (float): Seconds between keepalive pings, or None to disable them.
+        compression_threshold (int): Size in bytes from which compressed connections receive deflated messages.
+
+    Methods:
+        broadcast(group, message, exclude=None):
+            Sends a message to every connection in a group.
+
+        join(websocket, group):
+            Adds a connection to a group.
+
+        leave(websocket, group):
+            Removes a connection from a group.
+    """
+
+    def __init__(self, ping_interval: float = 20, compression_threshold: int = 256) -> None:
+        """
+        Initializes an empty WebSocketHub.
+
+        Args:
+            ping_interval (float, optional): Seconds between keepalive pings, or None to disable them. Defaults to 20.
+            compression_threshold (int, optional): Size in bytes from which messages are compressed. Defaults to 256.
+        """
+        self.groups = {}
+        self.connections = set()
+        self.ping_interval = ping_interval
+        self.compression_threshold = compression_threshold
+        self._loop = None
+        self._heartbeat = None
+
+    def add(self, websocket: WebSocket) -> None:
+        """
+        Registers an accepted connection, starting the keepalive task if needed.
+
+        Args:
+            websocket (WebSocket): The connection.
+        """
+        self.connections.add(websocket)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._heartbeat = None
+        if self._heartbeat is None and self.ping_interval:
+            self._heartbeat = loop.create_task(self._keepalive())
+
+    def discard(self, websocket: WebSocket) -> None:
+        """
+        Forgets a closed connection and removes it from its groups.
+
+        Args:
+            websocket (WebSocket): The connection.
+        """
+        self.connections.discard(websocket)
+        for group in websocket.groups:
+            members = self.groups.get(group)
+            if members is not None:
+                members.discard(websocket)
+                if not members:
+                    del self.groups[group]
+        websocket.groups.clear()
+
+    def join(self, websocket: WebSocket, group: str) -> None:
+        """
+        Adds a connection to a group.
+
+        Args:
+            websocket (WebSocket): The connection.
+            group (str): The name of the group.
+        """
+        if websocket.state == CLOSED:
+            return
+        self.groups.setdefault(group, set()).add(websocket)
+        websocket.groups.add(group)
+
+    def leave(self, websocket: WebSocket, group: str) -> None:
+        """
+        Removes a connection from a group.
+
+        Args:
+            websocket (WebSocket): The connection.
+            group (str): The name of the group.
+        """
+        members = self.groups.get(group)
+        if members is not None:
+            members.discard(websocket)
+            if not members:
+                del self.groups[group]
+        websocket.groups.discard(group)
+
+    def broadcast(self, group: str, message: any, exclude: WebSocket = None) -> int:
+        """
+        Sends a message to every connection in a group.
+
+        The message is serialized and compressed once. Connections whose send queue is
+        full are dropped rather than slowing down the broadcast. When called from
+        another thread, such as a synchronous handler, the broadcast is scheduled on the
+        event loop serving the connections.
+
+        Args:
+            group (str): The name of the group.
+            message (any): The message, as str for text, bytes for binary or any JSON-serializable object.
+            exclude (WebSocket, optional): A connection to skip, such as the sender.
+
+        Returns:
+            int: The number of connections the message was queued on, or 0 when scheduled from another thread.
+        """
+        outgoing = message if isinstance(message, OutgoingMessage) else OutgoingMessage(message, self.compression_threshold)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not self._loop:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self.broadcast, group, outgoing, exclude)
+            return 0
+
+        delivered = 0
+        for websocket in list(self.groups.get(group, ())):
+            if websocket is not exclude and websocket.deliver(outgoing):
+                delivered += 1
+        return delivered
+
+    async def _keepalive(self) -> None:
+        """
+        Pings open connections and drops those that did not answer the previous ping.
+        """
+        ping = build_frame(OP_PING, b"")
+        while self.connections:
+            await asyncio.sleep(self.ping_interval)
+            for websocket in list(self.connections):
+                if websocket._writer is None:
+                    continue
+                if websocket.awaiting_pong:
+                    websocket._writer.transport.abort()
+                    websocket._closed(1006)
+                    continue
+                websocket.awaiting_pong = True
+                websocket._write(ping)
+        self._heartbeat = None